@@ -1,11 +1,49 @@
 from django.utils.deprecation import MiddlewareMixin
 import jwt
 import logging
+import time
 from django.conf import settings
+from apps.utils.cache import TTLCache, token_digest
 
 SECRET_KEY = settings.SECRET_KEY
 logger = logging.getLogger(__name__)
 
+# Verified JWT claims keyed by the digest of the raw token.
+token_cache = TTLCache(
+    maxsize=getattr(settings, "JWT_CACHE_MAXSIZE", 4096),
+    ttl=getattr(settings, "JWT_CACHE_TTL", 300),
+)
+
+
+def decode_app_token(app_token):
+    """
+    Verify and decode an application JWT, reusing previously verified tokens.
+
+    Successfully verified claims are cached under the SHA-256 digest of the token
+    for at most ``JWT_CACHE_TTL`` seconds and never beyond the token's ``exp``.
+    Tokens carrying a future ``nbf`` are not cached. The cache is bypassed when
+    ``JWT_CACHE_ENABLED`` is False.
+
+    Raises:
+        - jwt.InvalidTokenError: If the token cannot be verified.
+    """
+    if not getattr(settings, "JWT_CACHE_ENABLED", True):
+        return jwt.decode(app_token, SECRET_KEY, algorithms=["HS256"])
+
+    key = token_digest(app_token)
+    decoded_data = token_cache.get(key)
+    if decoded_data is not None:
+        return decoded_data
+
+    decoded_data = jwt.decode(app_token, SECRET_KEY, algorithms=["HS256"])
+    now = time.time()
+    if decoded_data.get("nbf", now) <= now:
+        ttl = None
+        if "exp" in decoded_data:
+            ttl = decoded_data["exp"] - now
+        token_cache.set(key, decoded_data, ttl=ttl)
+    return decoded_data
+
 
 class DecodeTokenMiddleware(MiddlewareMixin):
     """
@@ -15,10 +53,14 @@ class DecodeTokenMiddleware(MiddlewareMixin):
     This middleware looks for a JWT in the Authorization header of incoming requests,
     decodes the token using the secret key, and extracts the Personal Access Token.
     It logs warnings for expired or invalid tokens and errors for unexpected issues.
+    Verified tokens are cached, see `decode_app_token`.
 
     Request Header:
         - Authorization (str): The JWT token prefixed with "Bearer ".
 
+    Query Parameters:
+        - token (str): The JWT token, only for views with ``accepts_query_token = True``.
+
     Request Attributes:
         - personal_access_token (str): The decoded Personal Access Token, if available.
     """
@@ -47,15 +89,31 @@ class DecodeTokenMiddleware(MiddlewareMixin):
         else:
             app_token = auth_header
 
+        self.attach_personal_access_token(request, app_token)
+        return None
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """
+        Accept the JWT from the `token` query parameter for views that opt in with
+        ``accepts_query_token = True``, e.g. image and video streams loaded by
+        ``<img>`` / ``<video>`` elements, which cannot send an Authorization header.
+        """
+        if hasattr(request, "personal_access_token"):
+            return None
+        view_class = getattr(view_func, "view_class", None)
+        app_token = request.GET.get("token")
+        if app_token and getattr(view_class, "accepts_query_token", False):
+            self.attach_personal_access_token(request, app_token)
+        return None
+
+    @staticmethod
+    def attach_personal_access_token(request, app_token):
         try:
-            decoded_data = jwt.decode(app_token, SECRET_KEY, algorithms=["HS256"])
+            decoded_data = decode_app_token(app_token)
             request.personal_access_token = decoded_data.get("personal_access_token")
         except jwt.ExpiredSignatureError:
             logger.warning("Expired token")
-            return None
         except jwt.InvalidTokenError:
             logger.warning("Invalid token")
-            return None
         except Exception as e:
             logger.error(f"Unexpected error: {e}")
-            return None
@@ -0,0 +1,48 @@
+from django.conf import settings
+
+from apps.utils.cache import TTLCache, token_digest
+from apps.utils.singleflight import SingleFlight
+from apps.utils.upstream import client
+from core.settings import ANGEL_CAM_BASE_URL
+
+# Digests of Personal Access Tokens that AngelCam accepted recently. A token
+# revoked upstream keeps logging in for at most PAT_CACHE_TTL seconds.
+verified_tokens = TTLCache(
+    maxsize=getattr(settings, "PAT_CACHE_MAXSIZE", 4096),
+    ttl=getattr(settings, "PAT_CACHE_TTL", 60),
+)
+verifications = SingleFlight()
+
+
+def fetch_token_validity(personal_access_token):
+    response = client.get(
+        f"{ANGEL_CAM_BASE_URL}/v1/me/", personal_access_token=personal_access_token
+    )
+    return response.status_code == 200
+
+
+def verify_personal_access_token(personal_access_token):
+    """
+    Check a Personal Access Token against AngelCam's `/v1/me/` endpoint.
+
+    Accepted tokens are remembered by digest for ``PAT_CACHE_TTL`` seconds, and
+    concurrent checks of the same token share a single upstream call. Rejections
+    are never cached.
+
+    Parameters:
+        - personal_access_token (str): The token to verify.
+
+    Returns:
+        - bool: True if the token is valid.
+    """
+    key = token_digest(personal_access_token)
+    if verified_tokens.get(key):
+        return True
+
+    def verify():
+        valid = fetch_token_validity(personal_access_token)
+        if valid:
+            verified_tokens.set(key, True)
+        return valid
+
+    return verifications.do(key, verify)
@@ -0,0 +1,61 @@
+import time
+import jwt
+from unittest.mock import patch
+from django.test import RequestFactory, override_settings
+from apps.accounts.middleware.decode_token import DecodeTokenMiddleware, token_cache
+from core.settings import SECRET_KEY
+
+
+def decode_request(app_token):
+    request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {app_token}")
+    DecodeTokenMiddleware(lambda request: None).process_request(request)
+    return request
+
+
+def test_verified_token_is_decoded_once(valid_token, expected_jwt_token):
+    hits = token_cache.stats()["hits"]
+    with patch("jwt.decode", wraps=jwt.decode) as mock_decode:
+        first = decode_request(expected_jwt_token)
+        second = decode_request(expected_jwt_token)
+
+    assert first.personal_access_token == second.personal_access_token == valid_token
+    assert mock_decode.call_count == 1
+    assert token_cache.stats()["hits"] == hits + 1
+
+
+def test_cached_token_expires_with_exp_claim(valid_token):
+    app_token = jwt.encode(
+        {"personal_access_token": valid_token, "exp": int(time.time()) + 5},
+        SECRET_KEY,
+        algorithm="HS256",
+    )
+    assert decode_request(app_token).personal_access_token == valid_token
+
+    with patch("apps.utils.cache.time.monotonic", return_value=time.monotonic() + 10):
+        with patch("jwt.decode", side_effect=jwt.ExpiredSignatureError):
+            request = decode_request(app_token)
+
+    assert not hasattr(request, "personal_access_token")
+
+
+def test_token_not_yet_valid_is_rejected(valid_token):
+    app_token = jwt.encode(
+        {"personal_access_token": valid_token, "nbf": int(time.time()) + 60},
+        SECRET_KEY,
+        algorithm="HS256",
+    )
+
+    request = decode_request(app_token)
+
+    assert not hasattr(request, "personal_access_token")
+    assert len(token_cache) == 0
+
+
+@override_settings(JWT_CACHE_ENABLED=False)
+def test_cache_can_be_disabled(expected_jwt_token):
+    with patch("jwt.decode", wraps=jwt.decode) as mock_decode:
+        decode_request(expected_jwt_token)
+        decode_request(expected_jwt_token)
+
+    assert mock_decode.call_count == 2
+    assert len(token_cache) == 0
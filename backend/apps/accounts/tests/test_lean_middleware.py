@@ -0,0 +1,55 @@
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from apps.utils.middleware import (
+    RouteAwareAuthenticationMiddleware,
+    RouteAwareCsrfViewMiddleware,
+    RouteAwareSessionMiddleware,
+    RouteAwareXFrameOptionsMiddleware,
+)
+
+
+def view(request):
+    return HttpResponse("ok")
+
+
+def pipeline():
+    return RouteAwareSessionMiddleware(
+        RouteAwareAuthenticationMiddleware(RouteAwareXFrameOptionsMiddleware(view))
+    )
+
+
+def test_api_requests_skip_session_and_auth():
+    request = RequestFactory().get("/api/cameras/")
+    response = pipeline()(request)
+
+    assert response.status_code == 200
+    assert not hasattr(request, "session")
+    assert not hasattr(request, "user")
+    assert "X-Frame-Options" not in response
+
+
+def test_admin_requests_keep_full_pipeline():
+    request = RequestFactory().get("/admin/login/")
+    response = pipeline()(request)
+
+    assert hasattr(request, "session")
+    assert hasattr(request, "user")
+    assert response["X-Frame-Options"] == "DENY"
+
+
+def test_csrf_is_only_enforced_outside_lean_prefixes():
+    middleware = RouteAwareCsrfViewMiddleware(view)
+    api_request = RequestFactory().post("/api/accounts/login")
+    admin_request = RequestFactory().post("/admin/login/")
+
+    assert middleware.process_view(api_request, view, (), {}) is None
+    assert middleware.process_view(admin_request, view, (), {}).status_code == 403
+
+
+@override_settings(LEAN_MIDDLEWARE_PREFIXES=[])
+def test_lean_prefixes_are_configurable():
+    request = RequestFactory().get("/api/cameras/")
+    pipeline()(request)
+
+    assert hasattr(request, "session")
+    assert hasattr(request, "user")
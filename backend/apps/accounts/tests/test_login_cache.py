@@ -0,0 +1,86 @@
+import threading
+import time
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from unittest.mock import patch
+from apps.accounts.services import verifications, verify_personal_access_token
+from apps.utils.singleflight import SingleFlight
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_verified_token_is_not_checked_again(mock_get, api_client, valid_token):
+    mock_get.return_value.status_code = 200
+    url = reverse("login")
+
+    for _ in range(3):
+        response = api_client.post(
+            url, {"personal_access_token": valid_token}, format="json"
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+    assert mock_get.call_count == 1
+
+
+@patch("requests.Session.request")
+def test_rejected_token_is_not_cached(mock_get, invalid_token):
+    mock_get.return_value.status_code = 401
+
+    assert not verify_personal_access_token(invalid_token)
+    assert not verify_personal_access_token(invalid_token)
+    assert mock_get.call_count == 2
+
+
+@patch("requests.Session.request")
+def test_revoked_token_is_detected_after_ttl(mock_get, valid_token):
+    mock_get.return_value.status_code = 200
+    assert verify_personal_access_token(valid_token)
+
+    mock_get.return_value.status_code = 401
+    with patch("apps.utils.cache.time.monotonic", return_value=time.monotonic() + 3600):
+        assert not verify_personal_access_token(valid_token)
+
+
+def test_concurrent_verifications_share_one_upstream_call(valid_token):
+    release = threading.Event()
+    calls = []
+
+    def slow_validity(token):
+        calls.append(token)
+        release.wait(5)
+        return True
+
+    collapsed = verifications.stats()["collapsed"]
+    with patch(
+        "apps.accounts.services.fetch_token_validity", side_effect=slow_validity
+    ):
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(verify_personal_access_token(valid_token))
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        while verifications.stats()["collapsed"] < collapsed + 4:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+    assert results == [True] * 5
+    assert len(calls) == 1
+
+
+def test_single_flight_releases_key_after_error():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+    assert flight.stats()["in_flight"] == 0
+    assert flight.do("key", lambda: 1) == 1
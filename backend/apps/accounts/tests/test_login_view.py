@@ -10,7 +10,7 @@ SECRET_KEY = settings.SECRET_KEY
 
 
 @pytest.mark.django_db
-@patch("requests.get")
+@patch("requests.Session.request")
 def test_login_with_valid_token(mock_get, api_client, valid_token, expected_jwt_token):
     """Test login with a valid personal access token."""
     mock_get.return_value.status_code = 200
@@ -26,7 +26,7 @@ def test_login_with_valid_token(mock_get, api_client, valid_token, expected_jwt_
 
 
 @pytest.mark.django_db
-@patch("requests.get")
+@patch("requests.Session.request")
 def test_login_with_invalid_token(mock_get, api_client, invalid_token):
     """Test login with an invalid personal access token."""
     mock_get.return_value.status_code = 401
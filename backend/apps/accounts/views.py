@@ -2,11 +2,10 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 import jwt
-import requests
 from core.settings import SECRET_KEY
 from rest_framework.permissions import AllowAny
 from .serializers import LoginSerializer
-from core.settings import ANGEL_CAM_BASE_URL
+from .services import verify_personal_access_token
 
 
 class LoginView(APIView):
@@ -33,6 +32,7 @@ class LoginView(APIView):
         Handle POST requests to authenticate a user and issue a JWT.
 
         Validates the incoming Personal Access Token, checks its authenticity, and generates a JWT if the token is valid.
+        Recently verified tokens are not re-checked upstream, see `verify_personal_access_token`.
 
         Parameters:
             - request (Request): The HTTP request object containing the Personal Access Token.
@@ -45,9 +45,7 @@ class LoginView(APIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         personal_access_token = serializer.validated_data["personal_access_token"]
-        headers = {"Authorization": f"PersonalAccessToken {personal_access_token}"}
-        response = requests.get(f"{ANGEL_CAM_BASE_URL}/v1/me/", headers=headers)
-        if response.status_code != 200:
+        if not verify_personal_access_token(personal_access_token):
             return Response(
                 {"error": "Invalid Personal Access Token"},
                 status=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,228 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from rest_framework import status
+
+from apps.utils.auth import require_personal_access_token
+from apps.utils.upstream import async_client
+from core.settings import ANGEL_CAM_BASE_URL
+from .prefetch import prefetcher
+from .services import (
+    all_camera_list_data,
+    async_camera_data,
+    async_camera_list_data,
+    async_recording_data,
+    async_stream_camera_list_data,
+)
+from .views import (
+    MISSING_STREAM_PARAMS,
+    data_response,
+    parse_speed,
+    playback_control_response,
+    recording_timeline_response,
+    stream_params,
+    stream_response,
+)
+from .warmer import warmer
+
+
+class AsyncView(View):
+    """
+    Base class for the ASGI-native camera views.
+
+    `dispatch` is a coroutine so that `require_personal_access_token` can be
+    applied with `method_decorator(..., name="dispatch")` exactly like on the
+    sync views. Each subclass mirrors the sync view of the same name in
+    `views.py` and returns an identical response, built by the same helpers.
+    Upstream calls are awaited through `async_client` instead of blocking a
+    worker thread, except where a subclass documents that it runs the shared
+    sync code in a thread.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        return await super().dispatch(request, *args, **kwargs)
+
+
+@method_decorator(require_personal_access_token, name="dispatch")
+class AsyncCameraListView(AsyncView):
+    """
+    Async variant of `CameraListView`.
+
+    Endpoint:
+        GET /async/cameras/
+
+    With ``all=true`` the pages are fetched by `services.all_camera_list_data`
+    in a worker thread. ``stream=true`` streams the list through an async
+    iterator, see `services.async_stream_camera_list_data`.
+    """
+
+    async def get(self, request):
+        if request.GET.get("stream") == "true":
+            chunks, error_response = await async_stream_camera_list_data(
+                request.personal_access_token,
+                all_pages=request.GET.get("all") == "true",
+            )
+            if error_response is not None:
+                return error_response
+            return StreamingHttpResponse(chunks, content_type="application/json")
+        if request.GET.get("all") == "true":
+            kind = "all-cameras"
+            data, error_response = await sync_to_async(
+                all_camera_list_data, thread_sensitive=False
+            )(request.personal_access_token)
+        else:
+            kind = "camera-list"
+            data, error_response = await async_camera_list_data(
+                request.personal_access_token
+            )
+        if error_response is None:
+            warmer.touch(request.personal_access_token, kind)
+        return data_response(data, error_response, request=request)
+
+
+@method_decorator(require_personal_access_token, name="dispatch")
+class AsyncCameraView(AsyncView):
+    """
+    Async variant of `CameraView`.
+
+    Endpoint:
+        GET /async/camera/<camera_id>
+    """
+
+    async def get(self, request, camera_id):
+        data, error_response = await async_camera_data(
+            request.personal_access_token, camera_id
+        )
+        if error_response is None:
+            warmer.touch(request.personal_access_token, "camera", camera_id)
+        return data_response(data, error_response, request=request)
+
+
+@method_decorator(require_personal_access_token, name="dispatch")
+class AsyncCamerasRecordingTimeLineView(AsyncView):
+    """
+    Async variant of `CamerasRecordingTimeLineView`.
+
+    Endpoint:
+        GET /async/camera/<camera_id>/recording/timeline/
+
+    The per-camera timeline cache is guarded by thread locks, so the response
+    is built by `views.recording_timeline_response` in a worker thread.
+    """
+
+    async def get(self, request, camera_id):
+        return await sync_to_async(recording_timeline_response, thread_sensitive=False)(
+            request, camera_id
+        )
+
+
+@method_decorator(require_personal_access_token, name="dispatch")
+class AsyncStreamView(AsyncView):
+    """
+    Async variant of `StreamView`.
+
+    Endpoint:
+        GET /async/camera/<camera_id>/recording/stream
+    """
+
+    async def get(self, request, camera_id):
+        params = stream_params(request)
+        if params is None:
+            return JsonResponse(
+                MISSING_STREAM_PARAMS, status=status.HTTP_400_BAD_REQUEST
+            )
+        response = await async_client.get(
+            f"{ANGEL_CAM_BASE_URL}/v1/shared-cameras/{camera_id}/recording/stream/",
+            personal_access_token=request.personal_access_token,
+            params=params,
+        )
+        return stream_response(request, response)
+
+
+@method_decorator(require_personal_access_token, name="dispatch")
+class AsyncRecordingView(AsyncView):
+    """
+    Async variant of `RecordingView`.
+
+    Endpoint:
+        GET /async/camera/<camera_id>/recording/info
+    """
+
+    async def get(self, request, camera_id):
+        data, error_response = await async_recording_data(
+            request.personal_access_token, camera_id
+        )
+        if error_response is None:
+            warmer.touch(request.personal_access_token, "recording", camera_id)
+        return data_response(data, error_response, request=request)
+
+
+@method_decorator(require_personal_access_token, name="dispatch")
+class AsyncPlayRecordingView(AsyncView):
+    """
+    Async variant of `PlayRecordingView`.
+
+    Endpoint:
+        GET /async/recording/<domain>/<stream_id>/play
+    """
+
+    async def get(self, request, domain, stream_id):
+        response = await async_client.post(
+            f"https://{domain}/recording/streams/{stream_id}/play/",
+            personal_access_token=request.personal_access_token,
+        )
+        if response.status_code == 204:
+            prefetcher.resume(request.personal_access_token, domain, stream_id)
+        return playback_control_response(
+            response, 204, {"status": "playing"}, "Failed to play the recording"
+        )
+
+
+@method_decorator(require_personal_access_token, name="dispatch")
+class AsyncPauseRecordingView(AsyncView):
+    """
+    Async variant of `PauseRecordingView`.
+
+    Endpoint:
+        GET /async/recording/<domain>/<stream_id>/pause
+    """
+
+    async def get(self, request, domain, stream_id):
+        response = await async_client.post(
+            f"https://{domain}/recording/streams/{stream_id}/pause/",
+            personal_access_token=request.personal_access_token,
+        )
+        if response.status_code == 204:
+            prefetcher.pause(request.personal_access_token, domain, stream_id)
+        return playback_control_response(
+            response, 204, {"status": "paused"}, "Failed to pause the recording"
+        )
+
+
+@method_decorator(require_personal_access_token, name="dispatch")
+class AsyncSpeedRecordingView(AsyncView):
+    """
+    Async variant of `SpeedRecordingView`.
+
+    Endpoint:
+        GET /async/recording/<domain>/<stream_id>/speed
+    """
+
+    async def get(self, request, domain, stream_id):
+        data, error_response = parse_speed(request)
+        if error_response is not None:
+            return error_response
+
+        response = await async_client.get(
+            f"https://{domain}/recording/streams/{stream_id}/speed/",
+            personal_access_token=request.personal_access_token,
+            json=data,
+        )
+        if response.status_code == 200:
+            prefetcher.set_speed(
+                request.personal_access_token, domain, stream_id, data["speed"]
+            )
+        return playback_control_response(
+            response, 200, {"success": "true"}, "Failed to update the playback speed"
+        )
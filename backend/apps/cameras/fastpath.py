@@ -0,0 +1,184 @@
+import re
+from datetime import datetime, timezone as dt_timezone
+
+from rest_framework import serializers
+
+# Strict subsets of Django's URLValidator / EmailValidator: anything these accept
+# is also accepted by the DRF fields, anything else goes through the slow path.
+FAST_URL_RE = re.compile(
+    r"^https?://"
+    r"(?P<host>(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,63})"
+    r"(?:[/?#]\S*)?$",
+    re.IGNORECASE,
+)
+FAST_EMAIL_RE = re.compile(
+    r"^[a-z0-9_%+-]+(?:\.[a-z0-9_%+-]+)*"
+    r"@(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,63}$",
+    re.IGNORECASE,
+)
+
+
+class FastPathMiss(Exception):
+    """
+    Raised when a value is outside what the fast path can prove valid.
+    """
+
+
+def fast_timestamp(value):
+    """
+    Parse an upstream ``YYYY-MM-DDTHH:MM:SS[.ffffff](Z|+HH:MM)`` timestamp with
+    `datetime.fromisoformat`, skipping the regex based DRF `DateTimeField`.
+    Raises ValueError or TypeError for anything else.
+    """
+    if len(value) < 19 or value[4] != "-" or value[7] != "-" or value[10] != "T":
+        raise ValueError(value)
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=dt_timezone.utc)
+    return parsed.astimezone(dt_timezone.utc)
+
+
+def format_timestamp(value):
+    """
+    Format a UTC datetime exactly like DRF's `DateTimeField.to_representation`.
+    """
+    value = value.isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def _text(value, max_length):
+    if type(value) is not str:
+        raise FastPathMiss
+    value = value.strip()
+    if not value or "\x00" in value:
+        raise FastPathMiss
+    if max_length is not None and len(value) > max_length:
+        raise FastPathMiss
+    if not value.isascii():
+        try:
+            value.encode("utf-8")
+        except UnicodeEncodeError:
+            raise FastPathMiss
+    return value
+
+
+def _compile_field(field):
+    if isinstance(field, serializers.ListSerializer):
+        compiled_child = _compile_field(field.child)
+
+        def project_list(value):
+            if type(value) is not list or (not value and not field.allow_empty):
+                raise FastPathMiss
+            return [compiled_child(item) for item in value]
+
+        return project_list
+
+    if isinstance(field, serializers.Serializer):
+        return compile_serializer(type(field))
+
+    if isinstance(field, serializers.BooleanField):
+
+        def project_boolean(value):
+            if type(value) is not bool:
+                raise FastPathMiss
+            return value
+
+        return project_boolean
+
+    if isinstance(field, serializers.IntegerField):
+
+        def project_integer(value):
+            if type(value) is not int:
+                raise FastPathMiss
+            return value
+
+        return project_integer
+
+    if isinstance(field, serializers.DateTimeField):
+
+        def project_datetime(value):
+            try:
+                return format_timestamp(fast_timestamp(value))
+            except (TypeError, ValueError):
+                raise FastPathMiss
+
+        return project_datetime
+
+    if isinstance(field, serializers.URLField):
+
+        def project_url(value):
+            value = _text(value, field.max_length)
+            match = FAST_URL_RE.match(value)
+            if match is None or len(value) > 2048 or len(match["host"]) > 253:
+                raise FastPathMiss
+            return value
+
+        return project_url
+
+    if isinstance(field, serializers.EmailField):
+
+        def project_email(value):
+            value = _text(value, field.max_length)
+            if len(value) > 254 or FAST_EMAIL_RE.match(value) is None:
+                raise FastPathMiss
+            return value
+
+        return project_email
+
+    if type(field) is serializers.CharField and not field.min_length:
+
+        def project_char(value):
+            return _text(value, field.max_length)
+
+        return project_char
+
+    raise TypeError(f"No fast path for {type(field).__name__}")
+
+
+def compile_serializer(serializer_class):
+    """
+    Compile a DRF serializer into a plain function that validates a payload and
+    returns the same output as ``serializer.data`` after a successful
+    ``is_valid()``, without instantiating any serializer or field objects.
+
+    The compiled function raises `FastPathMiss` when it cannot prove the payload
+    valid; callers then run the original serializer, which also produces the
+    usual validation errors.
+    """
+    for name in dir(serializer_class):
+        if name == "validate" or name.startswith("validate_"):
+            if getattr(serializer_class, name) is not getattr(
+                serializers.Serializer, name, None
+            ):
+                raise TypeError(f"{serializer_class.__name__} defines {name}()")
+
+    compiled_fields = []
+    for name, field in serializer_class().fields.items():
+        if field.read_only or field.source != name:
+            raise TypeError(f"No fast path for {serializer_class.__name__}.{name}")
+        compiled_fields.append(
+            (name, _compile_field(field), field.required, field.allow_null)
+        )
+
+    def project(data):
+        if type(data) is not dict:
+            raise FastPathMiss
+        output = {}
+        for name, compiled, required, allow_null in compiled_fields:
+            if name not in data:
+                if required:
+                    raise FastPathMiss
+                continue
+            value = data[name]
+            if value is None:
+                if not allow_null:
+                    raise FastPathMiss
+                output[name] = None
+            else:
+                output[name] = compiled(value)
+        return output
+
+    project.__name__ = f"project_{serializer_class.__name__}"
+    return project
@@ -0,0 +1,338 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from urllib.parse import urlencode, urljoin, urlsplit
+
+from django.conf import settings
+from django.urls import reverse
+
+from apps.utils.cache import TTLCache, register_cache, token_digest
+from apps.utils.singleflight import SingleFlight
+from apps.utils.upstream import client
+
+PLAYLIST_CONTENT_TYPE = "application/vnd.apple.mpegurl"
+SEGMENT_CONTENT_TYPES = {
+    ".ts": "video/mp2t",
+    ".m4s": "video/iso.segment",
+    ".mp4": "video/mp4",
+    ".aac": "audio/aac",
+    ".vtt": "text/vtt",
+}
+UPSTREAM_HLS_PATH = re.compile(
+    r"^/recording/streams/(?P<stream_id>[^/]+)/hls/(?P<name>.+)$"
+)
+URI_ATTRIBUTE = re.compile(r'URI="([^"]*)"')
+HOST = re.compile(r"^(?P<hostname>[a-z0-9.-]+)(:[0-9]{1,5})?$", re.IGNORECASE)
+STREAM_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def is_allowed_domain(domain):
+    """
+    Only recording hosts under ``HLS_ALLOWED_DOMAINS`` are proxied, so the
+    endpoint cannot be used to fetch arbitrary URLs. `domain` must be a plain
+    hostname with an optional port; anything else, e.g. a decoded ``#`` or
+    ``?`` that would move the real host, is rejected.
+    """
+    match = HOST.match(domain)
+    if match is None:
+        return False
+    hostname = match["hostname"].lower()
+    return any(
+        hostname == suffix.lstrip(".") or hostname.endswith(suffix)
+        for suffix in getattr(settings, "HLS_ALLOWED_DOMAINS", [".angelcam.com"])
+    )
+
+
+def is_allowed_url(url):
+    """
+    Whether the host `url` actually points at is an allowed recording host.
+    """
+    parts = urlsplit(url)
+    return parts.scheme == "https" and is_allowed_domain(parts.hostname or "")
+
+
+def is_safe_stream_id(stream_id):
+    return STREAM_ID.match(stream_id) is not None
+
+
+def is_safe_name(name):
+    return ".." not in name.split("/")
+
+
+def upstream_hls_url(domain, stream_id, name):
+    return f"https://{domain}/recording/streams/{stream_id}/hls/{name}"
+
+
+def proxy_hls_url(url, query=None):
+    """
+    Map an upstream recording HLS URL to the path of the proxy endpoint.
+
+    Parameters:
+        - url (str): An absolute upstream URL.
+        - query (dict): Optional query parameters added to the proxy URL.
+
+    Returns:
+        - str: The proxy path, or None if `url` is not a recording HLS resource
+          of an allowed domain.
+    """
+    parts = urlsplit(url)
+    match = UPSTREAM_HLS_PATH.match(parts.path)
+    if parts.scheme != "https" or match is None:
+        return None
+    if not is_allowed_domain(parts.hostname or "") or not is_safe_name(match["name"]):
+        return None
+    path = reverse(
+        "recording-hls",
+        kwargs={
+            "domain": parts.netloc,
+            "stream_id": match["stream_id"],
+            "name": match["name"],
+        },
+    )
+    query_string = "&".join(
+        part for part in (parts.query, urlencode(query or {})) if part
+    )
+    return f"{path}?{query_string}" if query_string else path
+
+
+def rewrite_playlist(text, playlist_url, query=None):
+    """
+    Point every URI of an HLS playlist at the proxy endpoint.
+
+    Segment and variant playlist lines as well as ``URI="..."`` attributes
+    (``#EXT-X-KEY``, ``#EXT-X-MAP``, ``#EXT-X-MEDIA``) are resolved against
+    `playlist_url`; URIs outside the recording's HLS directory are made absolute
+    and left pointing upstream.
+    """
+
+    def rewrite(uri):
+        absolute = urljoin(playlist_url, uri)
+        return proxy_hls_url(absolute, query) or absolute
+
+    lines = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("#"):
+            line = URI_ATTRIBUTE.sub(
+                lambda match: f'URI="{rewrite(match.group(1))}"', line
+            )
+        elif stripped:
+            line = rewrite(stripped)
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+class SegmentCache:
+    """
+    Size-bounded on-disk cache for recorded HLS segments.
+
+    Recorded segments never change, so they are written to `directory` once and
+    served from there until the directory exceeds `max_bytes`, when the least
+    recently served files are removed. The segment just written is always kept.
+
+    Parameters:
+        - directory (str): Directory holding the cached segments.
+        - max_bytes (int): Total size of the segments kept on disk.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+        register_cache(self)
+
+    def _path(self, key):
+        return os.path.join(
+            self.directory, hashlib.sha256(key.encode()).hexdigest() + ".seg"
+        )
+
+    def open(self, key):
+        """
+        Return the cached segment opened for reading, or None.
+        """
+        path = self._path(key)
+        try:
+            file = open(path, "rb")
+        except OSError:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self._stats["hits"] += 1
+        return file
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def store(self, key, chunks):
+        """
+        Write the segment streamed as `chunks` under `key`.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        temporary_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary_path, "wb") as file:
+                for chunk in chunks:
+                    file.write(chunk)
+            os.replace(temporary_path, path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        self._trim(keep=path)
+
+    def _trim(self, keep):
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".seg"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        if not os.path.isdir(self.directory):
+            return
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".seg"):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+playlist_cache = TTLCache(
+    maxsize=getattr(settings, "HLS_PLAYLIST_CACHE_MAXSIZE", 256),
+    ttl=getattr(settings, "HLS_PLAYLIST_TTL", 2),
+)
+segment_cache = SegmentCache(
+    directory=getattr(
+        settings,
+        "HLS_SEGMENT_CACHE_DIR",
+        os.path.join(tempfile.gettempdir(), "angelcam-hls-segments"),
+    ),
+    max_bytes=getattr(settings, "HLS_SEGMENT_CACHE_BYTES", 1024**3),
+)
+segment_flights = SingleFlight()
+
+
+def playlist_text(personal_access_token, url):
+    """
+    Return the upstream playlist at `url`, cached for ``HLS_PLAYLIST_TTL`` seconds.
+
+    Returns:
+        - tuple: (200, text) on success or (upstream status code, None).
+    """
+    key = (token_digest(personal_access_token), url)
+    text = playlist_cache.get(key)
+    if text is not None:
+        return 200, text
+    response = client.get(url, personal_access_token=personal_access_token)
+    if response.status_code != 200:
+        return response.status_code, None
+    text = response.text
+    playlist_cache.set(key, text)
+    return 200, text
+
+
+class SegmentFetchCancelled(Exception):
+    """
+    Raised when a cancellable segment download is no longer wanted.
+    """
+
+
+def cancellable(chunks, cancelled, url):
+    for chunk in chunks:
+        if cancelled():
+            raise SegmentFetchCancelled(url)
+        yield chunk
+
+
+def segment_file(personal_access_token, url, cancelled=None):
+    """
+    Return a recorded segment from the disk cache, fetching it on a miss.
+
+    Concurrent misses for the same segment share one upstream download, which
+    is streamed straight to disk. A download started with `cancelled` is
+    abandoned, raising `SegmentFetchCancelled`, as soon as ``cancelled()``
+    returns True; callers without `cancelled` that were waiting on it start a
+    download of their own instead.
+
+    Returns:
+        - tuple: (200, open file) on success or (upstream status code, None).
+    """
+    file = segment_cache.open(url)
+    if file is not None:
+        return 200, file
+
+    def load():
+        if url in segment_cache:
+            return 200
+        response = client.get(
+            url, personal_access_token=personal_access_token, stream=True
+        )
+        try:
+            if response.status_code != 200:
+                return response.status_code
+            chunks = response.iter_content(getattr(settings, "HLS_CHUNK_SIZE", 65536))
+            if cancelled is not None:
+                chunks = cancellable(chunks, cancelled, url)
+            segment_cache.store(url, chunks)
+        finally:
+            response.close()
+        return 200
+
+    while True:
+        try:
+            status_code = segment_flights.do(url, load)
+        except SegmentFetchCancelled:
+            if cancelled is not None:
+                raise
+            continue
+        break
+    if status_code != 200:
+        return status_code, None
+    file = segment_cache.open(url)
+    if file is None:
+        return 404, None
+    return 200, file
+
+
+def playlist_segments(text, playlist_url):
+    """
+    Return the absolute upstream URLs of the segments of a media playlist on
+    allowed hosts, in playback order. Master playlists have none.
+    """
+    segments = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        url = urljoin(playlist_url, line)
+        extension = os.path.splitext(urlsplit(url).path)[1].lower()
+        if extension in SEGMENT_CONTENT_TYPES and is_allowed_url(url):
+            segments.append(url)
+    return segments
@@ -0,0 +1,357 @@
+import asyncio
+import collections
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+from apps.utils.upstream import client
+
+logger = logging.getLogger(__name__)
+
+RELAY_BOUNDARY = "frame"
+
+
+def multipart_boundary(content_type):
+    """
+    Return the boundary of a ``multipart/x-mixed-replace`` Content-Type, without
+    the leading dashes some cameras include, or None.
+    """
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.strip().partition("=")
+        if name.lower() == "boundary" and value:
+            value = value.strip('"')
+            return value[2:] if value.startswith("--") else value
+    return None
+
+
+def parse_mjpeg(chunks, boundary, max_frame_bytes=8 * 1024 * 1024):
+    """
+    Split an MJPEG ``multipart/x-mixed-replace`` byte stream into frames.
+
+    Parts are delimited by ``--<boundary>``; a part's Content-Length is used when
+    present, otherwise the frame runs up to the next delimiter.
+
+    Parameters:
+        - chunks (iterable): The raw response body in chunks of any size.
+        - boundary (str): The multipart boundary, see `multipart_boundary`.
+        - max_frame_bytes (int): Largest part accepted before the stream is rejected.
+
+    Yields:
+        - bytes: The payload (usually a JPEG image) of every complete part.
+    """
+    delimiter = b"--" + boundary.encode()
+    buffer = b""
+    chunks = iter(chunks)
+
+    def fill():
+        nonlocal buffer
+        chunk = next(chunks, None)
+        if chunk is None:
+            return False
+        buffer += chunk
+        if len(buffer) > max_frame_bytes:
+            raise ValueError("MJPEG part exceeds max_frame_bytes")
+        return True
+
+    while True:
+        start = buffer.find(delimiter)
+        headers_end = buffer.find(b"\r\n\r\n", start) if start != -1 else -1
+        if headers_end == -1:
+            if not fill():
+                return
+            continue
+
+        length = None
+        for line in buffer[start + len(delimiter) : headers_end].split(b"\r\n"):
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                try:
+                    length = int(value)
+                except ValueError:
+                    pass
+        body_start = headers_end + 4
+
+        if length is not None:
+            while len(buffer) < body_start + length:
+                if not fill():
+                    return
+            frame = buffer[body_start : body_start + length]
+            buffer = buffer[body_start + length :]
+        else:
+            end = buffer.find(delimiter, body_start)
+            while end == -1:
+                if not fill():
+                    return
+                end = buffer.find(delimiter, body_start)
+            frame = buffer[body_start:end]
+            if frame.endswith(b"\r\n"):
+                frame = frame[:-2]
+            buffer = buffer[end:]
+        yield frame
+
+
+def multipart_frame(frame):
+    """
+    Encode a frame as one part of the relay's ``multipart/x-mixed-replace`` response.
+    """
+    return (
+        (
+            f"--{RELAY_BOUNDARY}\r\n"
+            f"Content-Type: image/jpeg\r\n"
+            f"Content-Length: {len(frame)}\r\n\r\n"
+        ).encode()
+        + frame
+        + b"\r\n"
+    )
+
+
+class MjpegRelay:
+    """
+    A single upstream MJPEG connection shared by every viewer of a camera.
+
+    A background thread parses the upstream stream into frames and appends them
+    to a ring buffer of ``MJPEG_RING_SIZE`` frames. Each viewer follows the
+    buffer with its own cursor; a viewer that falls more than the buffer length
+    behind skips ahead to the oldest frame still buffered instead of slowing
+    down the others. The upstream connection is closed as soon as the last
+    viewer detaches, or when upstream ends the stream.
+
+    Sync viewers block in `wait`; async viewers await `async_wait`, which the
+    relay thread wakes up through their event loop.
+    """
+
+    def __init__(self, key, url, on_close):
+        self.key = key
+        self.url = url
+        self.frames = collections.deque(maxlen=getattr(settings, "MJPEG_RING_SIZE", 8))
+        self.sequence = 0
+        self.viewers = 0
+        self.closed = False
+        self._condition = threading.Condition()
+        self._waiters = []
+        self._on_close = on_close
+        self._response = None
+        self._thread = threading.Thread(
+            target=self._run, name=f"mjpeg-relay-{key}", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def attach(self):
+        """
+        Register a viewer. Returns False if the relay already shut down.
+        """
+        with self._condition:
+            if self.closed:
+                return False
+            self.viewers += 1
+            return True
+
+    def detach(self):
+        with self._condition:
+            self.viewers -= 1
+            if self.viewers > 0:
+                return
+        self.close()
+
+    def close(self):
+        with self._condition:
+            if self.closed:
+                return
+            self.closed = True
+            response = self._response
+            self._notify()
+        self._on_close(self)
+        if response is not None:
+            response.close()
+
+    def _run(self):
+        try:
+            response = client.get(self.url, stream=True)
+            with self._condition:
+                self._response = response
+                closed = self.closed
+            if closed:
+                response.close()
+                return
+            boundary = multipart_boundary(response.headers.get("Content-Type", ""))
+            if response.status_code != 200 or boundary is None:
+                logger.warning(
+                    "MJPEG relay %s: unexpected upstream response %s",
+                    self.key,
+                    response.status_code,
+                )
+                return
+            chunk_size = getattr(settings, "MJPEG_CHUNK_SIZE", 16384)
+            for frame in parse_mjpeg(response.iter_content(chunk_size), boundary):
+                with self._condition:
+                    if self.closed:
+                        return
+                    self.sequence += 1
+                    self.frames.append((self.sequence, frame))
+                    self._notify()
+        except Exception:
+            if not self.closed:
+                logger.exception("MJPEG relay %s failed", self.key)
+        finally:
+            self.close()
+
+    def _notify(self):
+        # Called with the condition held.
+        self._condition.notify_all()
+        for loop, waiter in self._waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                pass  # The viewer's event loop is closed.
+        self._waiters.clear()
+
+    def wait(self, after, timeout):
+        """
+        Block until a frame newer than sequence `after` is buffered.
+
+        Returns:
+            - list: The buffered ``(sequence, frame)`` pairs newer than `after`, empty
+              on timeout or once the relay is closed.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self.closed or self.sequence > after, timeout
+            )
+            return [entry for entry in self.frames if entry[0] > after]
+
+    async def async_wait(self, after, timeout):
+        """
+        Like `wait`, but awaits the frame without blocking a thread.
+        """
+        loop = asyncio.get_running_loop()
+        with self._condition:
+            if self.closed or self.sequence > after:
+                return [entry for entry in self.frames if entry[0] > after]
+            waiter = loop.create_future()
+            self._waiters.append((loop, waiter))
+        try:
+            await asyncio.wait([waiter], timeout=timeout)
+        finally:
+            with self._condition:
+                if (loop, waiter) in self._waiters:
+                    self._waiters.remove((loop, waiter))
+        with self._condition:
+            return [entry for entry in self.frames if entry[0] > after]
+
+
+def _wake(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class MjpegRelayRegistry:
+    """
+    The running relays of the process, one per camera.
+    """
+
+    def __init__(self):
+        self._relays = {}
+        self._lock = threading.Lock()
+
+    def attach(self, key, url):
+        """
+        Attach a viewer to the relay of `key`, starting one on `url` if needed.
+        """
+        with self._lock:
+            relay = self._relays.get(key)
+            if relay is not None and relay.attach():
+                return relay
+            relay = MjpegRelay(key, url, on_close=self._remove)
+            relay.attach()
+            self._relays[key] = relay
+        relay.start()
+        return relay
+
+    def get(self, key):
+        with self._lock:
+            return self._relays.get(key)
+
+    def _remove(self, relay):
+        with self._lock:
+            if self._relays.get(relay.key) is relay:
+                del self._relays[relay.key]
+
+    def __len__(self):
+        return len(self._relays)
+
+
+relays = MjpegRelayRegistry()
+
+
+def relay_stream(key, url, latest_only=True, max_fps=None):
+    """
+    Attach a viewer to the relay of `key` and yield its frames as multipart parts.
+
+    The generator is only advanced when the server has written the previous
+    part, so a client whose socket is backed up simply pulls less often. With
+    `latest_only` it then gets the newest buffered frame and every frame it
+    missed in the meantime is skipped; otherwise it catches up on the ring
+    buffer. `max_fps` caps the frame rate of this viewer and implies
+    `latest_only`.
+
+    The viewer is detached when the generator is closed, which Django does when
+    the client disconnects.
+
+    Under ASGI use `async_relay_stream` instead, see `views.is_asgi`.
+    """
+    relay = relays.attach(key, url)
+    timeout = getattr(settings, "MJPEG_FRAME_TIMEOUT", 30)
+    interval = 1 / max_fps if max_fps else 0
+    next_frame_at = 0
+    try:
+        last = relay.sequence - 1 if relay.frames else 0
+        while True:
+            if interval:
+                delay = next_frame_at - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            entries = relay.wait(last, timeout)
+            if not entries:
+                return
+            if latest_only or interval:
+                entries = entries[-1:]
+            for sequence, frame in entries:
+                last = sequence
+                yield multipart_frame(frame)
+            next_frame_at = time.monotonic() + interval
+    finally:
+        relay.detach()
+
+
+async def async_relay_stream(key, url, latest_only=True, max_fps=None):
+    """
+    Async variant of `relay_stream`. Waiting for frames and pacing `max_fps`
+    are awaited, so a viewer holds no thread; only the relay's upstream reader
+    runs in one.
+    """
+    relay = relays.attach(key, url)
+    timeout = getattr(settings, "MJPEG_FRAME_TIMEOUT", 30)
+    interval = 1 / max_fps if max_fps else 0
+    next_frame_at = 0
+    try:
+        last = relay.sequence - 1 if relay.frames else 0
+        while True:
+            if interval:
+                delay = next_frame_at - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            entries = await relay.async_wait(last, timeout)
+            if not entries:
+                return
+            if latest_only or interval:
+                entries = entries[-1:]
+            for sequence, frame in entries:
+                last = sequence
+                yield multipart_frame(frame)
+            next_frame_at = time.monotonic() + interval
+    finally:
+        relay.detach()
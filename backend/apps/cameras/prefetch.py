@@ -0,0 +1,184 @@
+import logging
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from apps.utils.cache import TTLCache, token_digest
+from .hls import SegmentFetchCancelled, segment_cache, segment_file
+
+logger = logging.getLogger(__name__)
+
+
+class PlaybackSession:
+    """
+    What the prefetcher knows about one viewer's playback of a recording.
+    """
+
+    def __init__(self, personal_access_token):
+        self.personal_access_token = personal_access_token
+        self.segments = []
+        self.positions = {}
+        self.window = frozenset()
+        self.speed = 1
+        self.paused = False
+
+
+class SegmentPrefetcher:
+    """
+    Read ahead the recorded HLS segments a viewer is about to play.
+
+    When a segment of a known media playlist is requested, the following K
+    segments are downloaded into the segment cache in the background, so a
+    latency spike upstream is absorbed before the player reaches them. K is
+    ``HLS_PREFETCH_SEGMENTS`` scaled by the playback speed set through
+    `SpeedRecordingView`, capped at ``HLS_PREFETCH_MAX_SEGMENTS``.
+
+    Prefetches are cancelled, including downloads already in progress, when the
+    recording is paused, when the viewer moves on so that a segment is no longer
+    ahead of it, and when no playlist or segment was requested for
+    ``HLS_PREFETCH_IDLE_TIMEOUT`` seconds.
+
+    Settings:
+        - HLS_PREFETCH_SEGMENTS (int): Segments read ahead at normal speed; 0 disables prefetching.
+        - HLS_PREFETCH_MAX_SEGMENTS (int): Upper bound on the read-ahead at high speeds.
+        - HLS_PREFETCH_IDLE_TIMEOUT (float): Seconds without requests before a session is dropped.
+        - HLS_PREFETCH_WORKERS (int): Concurrent prefetch downloads per process.
+    """
+
+    def __init__(self):
+        self._sessions = TTLCache(
+            maxsize=getattr(settings, "HLS_PREFETCH_MAX_SESSIONS", 1024),
+            ttl=getattr(settings, "HLS_PREFETCH_IDLE_TIMEOUT", 30),
+        )
+        self._lock = threading.Lock()
+        self._executor = None
+        self._stats = {"scheduled": 0, "fetched": 0, "cancelled": 0}
+
+    @staticmethod
+    def _key(personal_access_token, domain, stream_id):
+        return (token_digest(personal_access_token), domain, stream_id)
+
+    def _session(self, personal_access_token, domain, stream_id, create=True):
+        """
+        Return the playback session and mark it active, so it does not expire.
+        """
+        key = self._key(personal_access_token, domain, stream_id)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                if not create:
+                    return key, None
+                session = PlaybackSession(personal_access_token)
+            self._sessions.set(key, session)
+            return key, session
+
+    @staticmethod
+    def read_ahead(speed):
+        segments = getattr(settings, "HLS_PREFETCH_SEGMENTS", 2)
+        return min(
+            getattr(settings, "HLS_PREFETCH_MAX_SEGMENTS", 8),
+            math.ceil(segments * max(speed, 1)),
+        )
+
+    def playlist_loaded(self, personal_access_token, domain, stream_id, segments):
+        """
+        Remember the segment order of a media playlist served to the viewer.
+        """
+        if not segments:
+            return
+        _, session = self._session(personal_access_token, domain, stream_id)
+        with self._lock:
+            session.segments = segments
+            session.positions = {url: index for index, url in enumerate(segments)}
+
+    def segment_requested(self, personal_access_token, domain, stream_id, url):
+        """
+        Prefetch the segments following `url` in the viewer's playlist.
+        """
+        key, session = self._session(personal_access_token, domain, stream_id)
+        with self._lock:
+            index = session.positions.get(url)
+            if session.paused or index is None:
+                return
+            ahead = session.segments[
+                index + 1 : index + 1 + self.read_ahead(session.speed)
+            ]
+            # The requested segment stays in the window so that a prefetch the
+            # player has caught up with keeps downloading.
+            session.window = frozenset([url, *ahead])
+        for segment in ahead:
+            if segment not in segment_cache:
+                self._submit(key, session, segment)
+
+    def set_speed(self, personal_access_token, domain, stream_id, speed):
+        _, session = self._session(personal_access_token, domain, stream_id)
+        with self._lock:
+            session.speed = speed
+
+    def pause(self, personal_access_token, domain, stream_id):
+        _, session = self._session(
+            personal_access_token, domain, stream_id, create=False
+        )
+        if session is not None:
+            with self._lock:
+                session.paused = True
+                session.window = frozenset()
+
+    def resume(self, personal_access_token, domain, stream_id):
+        _, session = self._session(
+            personal_access_token, domain, stream_id, create=False
+        )
+        if session is not None:
+            with self._lock:
+                session.paused = False
+
+    def _wanted(self, key, session, url):
+        with self._lock:
+            return (
+                self._sessions.get(key) is session
+                and not session.paused
+                and url in session.window
+            )
+
+    def _submit(self, key, session, url):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "HLS_PREFETCH_WORKERS", 4),
+                    thread_name_prefix="hls-prefetch",
+                )
+            self._stats["scheduled"] += 1
+            executor = self._executor
+        executor.submit(self._prefetch, key, session, url)
+
+    def _prefetch(self, key, session, url):
+        def cancelled():
+            return not self._wanted(key, session, url)
+
+        if url in segment_cache:
+            return
+        try:
+            if cancelled():
+                raise SegmentFetchCancelled(url)
+            _, file = segment_file(session.personal_access_token, url, cancelled)
+        except SegmentFetchCancelled:
+            outcome = "cancelled"
+        except Exception:
+            logger.warning("Prefetch of %s failed", url, exc_info=True)
+            return
+        else:
+            if file is None:
+                return
+            file.close()
+            outcome = "fetched"
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, sessions=len(self._sessions))
+
+
+prefetcher = SegmentPrefetcher()
@@ -0,0 +1,754 @@
+import base64
+import binascii
+import hashlib
+import json
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from rest_framework import status
+
+from apps.utils.cache import TTLCache, token_digest
+from apps.utils.resilience import UpstreamError
+from apps.utils.upstream import async_client, client
+from core.settings import ANGEL_CAM_BASE_URL
+from .fastpath import FastPathMiss, compile_serializer
+from .serializers import (
+    CameraListResponseSerializer,
+    CameraSerializer,
+    RecordingSerializer,
+    StreamSerializer,
+    TimelineSerializer,
+)
+from .timeline import incremental_timeline, parse_timestamp, parse_upstream_timeline
+
+logger = logging.getLogger(__name__)
+
+CAMERA_LIST_PATH = "/v1/shared-cameras/"
+ALL_CAMERAS_PATH = f"{CAMERA_LIST_PATH}?all=true"
+
+response_cache = TTLCache(
+    maxsize=getattr(settings, "RESPONSE_CACHE_MAXSIZE", 1024),
+    ttl=getattr(settings, "RESPONSE_CACHE_TTL", 30),
+)
+
+
+class CachedPayload(dict):
+    """
+    A payload stored in `response_cache`. Every hit returns this same object,
+    so `rendered_payload` keeps its rendered body and ETag on it.
+    """
+
+    __slots__ = ("rendered",)
+
+
+def cache_payload(key, data):
+    """
+    Store `data` in `response_cache` for its `payload_ttl` and return the cached object.
+    """
+    data = CachedPayload(data)
+    response_cache.set(key, data, ttl=payload_ttl(data))
+    return data
+
+
+# Precompiled projections of the serializers used on hot endpoints, see `fastpath`.
+FAST_VALIDATORS = {
+    serializer_class: compile_serializer(serializer_class)
+    for serializer_class in (
+        CameraListResponseSerializer,
+        CameraSerializer,
+        RecordingSerializer,
+        StreamSerializer,
+        TimelineSerializer,
+    )
+}
+
+
+def camera_path(camera_id):
+    return f"{CAMERA_LIST_PATH}{camera_id}/"
+
+
+def cache_key(personal_access_token, path):
+    """
+    Build the response cache key from the hashed Personal Access Token and the upstream path.
+    """
+    return token_digest(personal_access_token), path
+
+
+def signed_url_timeout(url):
+    """
+    Return the `timeout` (in seconds) embedded in the `token` query parameter of a
+    signed AngelCam URL, or None if the URL is not signed.
+
+    The token is a base64 encoded JSON document followed by ``.<signature>``, e.g.
+    ``{"camera_id": "112859", "time": 1723369948105135, "timeout": 120}``.
+    """
+    tokens = parse_qs(urlsplit(url).query).get("token")
+    if not tokens:
+        return None
+    encoded = tokens[0].split(".", 1)[0]
+    encoded += "=" * (-len(encoded) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(encoded))
+        return float(payload["timeout"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        return None
+
+
+def shortest_signed_url_timeout(data):
+    """
+    Walk a camera payload and return the shortest signed URL timeout it contains.
+    """
+    if isinstance(data, dict):
+        values = data.values()
+    elif isinstance(data, list):
+        values = data
+    elif isinstance(data, str) and "token=" in data:
+        return signed_url_timeout(data)
+    else:
+        return None
+
+    timeouts = [shortest_signed_url_timeout(value) for value in values]
+    timeouts = [timeout for timeout in timeouts if timeout is not None]
+    return min(timeouts) if timeouts else None
+
+
+def payload_ttl(data):
+    """
+    Return how long `data` may be cached: the configured TTL, capped so that no
+    signed stream or snapshot URL in the payload is served after it expires.
+    """
+    ttl = response_cache.ttl
+    timeout = shortest_signed_url_timeout(data)
+    if timeout is not None:
+        margin = getattr(settings, "SIGNED_URL_EXPIRY_MARGIN", 15)
+        ttl = min(ttl, timeout - margin)
+    return ttl
+
+
+def body_etag(body):
+    """
+    Strong ETag of a response body: the first 128 bits of its SHA-256.
+    """
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def rendered_payload(data):
+    """
+    Render `data` to JSON and compute its strong ETag (SHA-256 of the body).
+
+    Payloads served from `response_cache` are the same `CachedPayload` on every
+    hit, so their body and ETag are only computed once and later requests,
+    including conditional ones answered with 304, skip serialization entirely.
+    Other payloads are rendered on every call.
+
+    Returns:
+        - tuple: (body, etag)
+    """
+    rendered = getattr(data, "rendered", None)
+    if rendered is not None:
+        return rendered
+    body = json.dumps(data, cls=DjangoJSONEncoder).encode()
+    rendered = body, body_etag(body)
+    if isinstance(data, CachedPayload):
+        data.rendered = rendered
+    return rendered
+
+
+def validate_response(
+    response, serializer_class, failure_detail, prepare=None, validated=False
+):
+    """
+    Validate a successful upstream response with `serializer_class`.
+
+    Serializers listed in `FAST_VALIDATORS` are first checked with their compiled
+    projection; the DRF serializer only runs when the fast path cannot prove the
+    payload valid, so error responses are unchanged.
+
+    Parameters:
+        - response: The upstream response.
+        - serializer_class (Serializer): The serializer used to validate the payload.
+        - failure_detail (str): Detail reported when the upstream call did not succeed.
+        - prepare (callable): Optional hook applied to the payload before validation.
+        - validated (bool): Return `validated_data` instead of the serialized representation.
+
+    Returns:
+        - tuple: (data, None) on success or (None, JsonResponse) describing the error.
+    """
+    if response.status_code != 200:
+        return None, JsonResponse(
+            {"detail": failure_detail}, status=response.status_code
+        )
+    payload = response.json()
+    if prepare is not None:
+        payload = prepare(payload)
+    fast_validator = FAST_VALIDATORS.get(serializer_class)
+    if (
+        fast_validator is not None
+        and not validated
+        and getattr(settings, "FAST_PATH_VALIDATION", True)
+    ):
+        try:
+            return fast_validator(payload), None
+        except FastPathMiss:
+            pass
+    serializer = serializer_class(data=payload)
+    if serializer.is_valid():
+        return serializer.validated_data if validated else serializer.data, None
+    return None, JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+def filter_camera_streams(cameras_data):
+    """
+    Keep only the stream formats the frontend can play directly (mjpeg and mp4).
+    """
+    streams = cameras_data.get("streams", [])
+    cameras_data["streams"] = [
+        stream
+        for stream in streams
+        if stream.get("format") == "mjpeg" or stream.get("format") == "mp4"
+    ]
+    return cameras_data
+
+
+def validate_camera_list(response):
+    return validate_response(
+        response, CameraListResponseSerializer, "Failed to retrieve camera list"
+    )
+
+
+def validate_camera(response):
+    if response.status_code != 200:
+        return None, JsonResponse(
+            {"error": "Failed to fetch camera data from external service"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return validate_response(
+        response, CameraSerializer, None, prepare=filter_camera_streams
+    )
+
+
+def fetch_timeline(personal_access_token, camera_id, params):
+    return client.get(
+        f"{ANGEL_CAM_BASE_URL}{camera_path(camera_id)}recording/timeline/",
+        personal_access_token=personal_access_token,
+        params=params,
+    )
+
+
+def validate_timeline(response):
+    """
+    Validate an upstream timeline, parsing timestamps on the fast path and only
+    falling back to `TimelineSerializer` when the payload is malformed.
+    """
+    if response.status_code == 200:
+        timeline = parse_upstream_timeline(response.json())
+        if timeline is not None:
+            return timeline, None
+    return validate_response(
+        response,
+        TimelineSerializer,
+        "Failed to retrieve timeline data",
+        validated=True,
+    )
+
+
+def timeline_data(personal_access_token, camera_id, start, end):
+    """
+    Return the validated timeline of `camera_id` for [start, end], fetching only
+    the parts missing from the per-camera cache, see `timeline.incremental_timeline`.
+
+    Returns:
+        - tuple: (timeline, None) on success or (None, JsonResponse) describing the error.
+    """
+
+    def fetch(missing_start, missing_end):
+        response = fetch_timeline(
+            personal_access_token,
+            camera_id,
+            {"start": missing_start.isoformat(), "end": missing_end.isoformat()},
+        )
+        return validate_timeline(response)
+
+    return incremental_timeline(personal_access_token, camera_id, start, end, fetch)
+
+
+def recording_data(personal_access_token, camera_id, refresh=False):
+    path = f"{camera_path(camera_id)}recording/"
+    return cached_data(
+        personal_access_token,
+        path,
+        lambda: client.get(
+            f"{ANGEL_CAM_BASE_URL}{path}",
+            personal_access_token=personal_access_token,
+        ),
+        lambda response: validate_response(
+            response, RecordingSerializer, "Failed to retrieve recording data"
+        ),
+        refresh=refresh,
+    )
+
+
+def cached_data(personal_access_token, path, fetch, validate, refresh=False):
+    """
+    Return validated data for `path` from the per-token response cache, falling
+    back to `fetch()` + `validate(response)` and caching the result on success.
+    With `refresh` the cached value is ignored and replaced.
+
+    Returns:
+        - tuple: (data, None) on success or (None, JsonResponse) describing the error.
+    """
+    key = cache_key(personal_access_token, path)
+    data = None if refresh else response_cache.get(key)
+    if data is not None:
+        return data, None
+    data, error_response = validate(fetch())
+    if data is not None:
+        data = cache_payload(key, data)
+    return data, error_response
+
+
+async def async_cached_data(personal_access_token, path, fetch, validate):
+    """
+    Async counterpart of `cached_data`; `fetch` is a coroutine function.
+    """
+    key = cache_key(personal_access_token, path)
+    data = response_cache.get(key)
+    if data is not None:
+        return data, None
+    data, error_response = validate(await fetch())
+    if data is not None:
+        data = cache_payload(key, data)
+    return data, error_response
+
+
+def camera_list_data(personal_access_token, refresh=False):
+    return cached_data(
+        personal_access_token,
+        CAMERA_LIST_PATH,
+        lambda: client.get(
+            f"{ANGEL_CAM_BASE_URL}{CAMERA_LIST_PATH}",
+            personal_access_token=personal_access_token,
+        ),
+        validate_camera_list,
+        refresh=refresh,
+    )
+
+
+def camera_data(personal_access_token, camera_id, refresh=False):
+    path = camera_path(camera_id)
+    return cached_data(
+        personal_access_token,
+        path,
+        lambda: client.get(
+            f"{ANGEL_CAM_BASE_URL}{path}",
+            personal_access_token=personal_access_token,
+        ),
+        validate_camera,
+        refresh=refresh,
+    )
+
+
+def remaining_page_urls(next_url, count, page_size):
+    """
+    Derive the URLs of every page after the first from the upstream `next` link.
+
+    Both page-number (``?page=2``) and limit/offset (``?limit=20&offset=20``)
+    pagination are recognised. Returns None for any other style, in which case
+    the pages have to be followed one `next` link at a time.
+    """
+    parts = urlsplit(next_url)
+    query = parse_qs(parts.query)
+
+    def with_query(**values):
+        page_query = dict(
+            query, **{name: [str(value)] for name, value in values.items()}
+        )
+        return urlunsplit(parts._replace(query=urlencode(page_query, doseq=True)))
+
+    try:
+        if "page" in query and page_size:
+            first = int(query["page"][0])
+            pages = math.ceil(count / page_size)
+            return [with_query(page=page) for page in range(first, pages + 1)]
+        if "offset" in query:
+            limit = int(query.get("limit", [page_size])[0])
+            first = int(query["offset"][0])
+            if limit > 0:
+                return [
+                    with_query(offset=offset) for offset in range(first, count, limit)
+                ]
+    except ValueError:
+        pass
+    return None
+
+
+def fetch_camera_list_page(personal_access_token, url):
+    return validate_camera_list(
+        client.get(url, personal_access_token=personal_access_token)
+    )
+
+
+def all_camera_list_data(personal_access_token):
+    """
+    Return every camera of the account as a single validated camera list.
+
+    The first page comes from `camera_list_data`; the remaining pages are
+    derived from its `count` and `next` link and fetched concurrently by at most
+    ``CAMERA_LIST_MAX_WORKERS`` threads. Cameras that moved between pages while
+    they were fetched are only returned once. The merged list is cached per token.
+
+    Returns:
+        - tuple: (data, None) on success or (None, JsonResponse) describing the error.
+    """
+    key = cache_key(personal_access_token, ALL_CAMERAS_PATH)
+    data = response_cache.get(key)
+    if data is not None:
+        return data, None
+
+    first_page, error_response = camera_list_data(personal_access_token)
+    if error_response is not None:
+        return None, error_response
+
+    pages = [first_page]
+    if first_page["next"]:
+        urls = remaining_page_urls(
+            first_page["next"], first_page["count"], len(first_page["results"])
+        )
+        if urls is None:
+            next_url = first_page["next"]
+            while next_url:
+                page, error_response = fetch_camera_list_page(
+                    personal_access_token, next_url
+                )
+                if error_response is not None:
+                    return None, error_response
+                pages.append(page)
+                next_url = page["next"]
+        else:
+            max_workers = getattr(settings, "CAMERA_LIST_MAX_WORKERS", 4)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(
+                    executor.map(
+                        lambda url: fetch_camera_list_page(personal_access_token, url),
+                        urls,
+                    )
+                )
+            for page, error_response in results:
+                if error_response is not None:
+                    return None, error_response
+                pages.append(page)
+
+    cameras = {}
+    for page in pages:
+        for camera in page["results"]:
+            cameras.setdefault(camera["id"], camera)
+    data = {
+        "count": len(cameras),
+        "next": None,
+        "previous": None,
+        "results": list(cameras.values()),
+    }
+    return cache_payload(key, data), None
+
+
+def camera_list_page_count(personal_access_token):
+    """
+    Return the number of upstream pages of a token's camera list, judging by
+    its cached first page, or 1 if that is not cached.
+    """
+    first_page = response_cache.get(cache_key(personal_access_token, CAMERA_LIST_PATH))
+    if first_page is None or not first_page["next"] or not first_page["results"]:
+        return 1
+    return math.ceil(first_page["count"] / len(first_page["results"]))
+
+
+def refresh_all_camera_list_data(personal_access_token):
+    """
+    Like `all_camera_list_data`, but always fetched from upstream. The fresh
+    list replaces the cached one, so regular requests benefit from the refresh.
+    """
+    for path in (CAMERA_LIST_PATH, ALL_CAMERAS_PATH):
+        response_cache.delete(cache_key(personal_access_token, path))
+    return all_camera_list_data(personal_access_token)
+
+
+def error_entry(error_response):
+    return {
+        "status": error_response.status_code,
+        "error": json.loads(error_response.content),
+    }
+
+
+def inline_result(fetch, *args):
+    """
+    Call a service returning ``(data, error_response)`` and return ``(data, entry)``
+    instead, where `entry` is the `error_entry` of a failure. An `UpstreamError`
+    raised by the call is reported the same way rather than propagated.
+    """
+    try:
+        data, error_response = fetch(*args)
+    except UpstreamError as error:
+        return None, {"status": error.status_code, "error": {"detail": error.detail}}
+    if error_response is not None:
+        return None, error_entry(error_response)
+    return data, None
+
+
+def camera_batch_data(personal_access_token, camera_ids):
+    """
+    Fetch the details of several cameras concurrently.
+
+    Each camera goes through `camera_data`, so responses are cached and the
+    streams are filtered exactly as for a single camera. At most
+    ``CAMERA_BATCH_MAX_WORKERS`` upstream calls run at the same time. A failing
+    camera does not fail the batch; its error is reported in place.
+
+    Returns:
+        - list: One ``{"id", "status", "data"}`` or ``{"id", "status", "error"}``
+          entry per camera id, in the requested order.
+    """
+    max_workers = getattr(settings, "CAMERA_BATCH_MAX_WORKERS", 8)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            lambda camera_id: inline_result(
+                camera_data, personal_access_token, camera_id
+            ),
+            camera_ids,
+        )
+        entries = []
+        for camera_id, (data, entry) in zip(camera_ids, results):
+            if entry is not None:
+                entries.append({"id": camera_id, **entry})
+            else:
+                entries.append(
+                    {"id": camera_id, "status": status.HTTP_200_OK, "data": data}
+                )
+    return entries
+
+
+def camera_page_data(personal_access_token, camera_id):
+    """
+    Fetch the camera details, recording info and recent timeline of a camera.
+
+    The camera details and the recording info are requested concurrently. The
+    timeline of the ``CAMERA_PAGE_TIMELINE_WINDOW`` seconds before
+    `recording_end` is requested as soon as the recording info arrives, while
+    the camera details may still be in flight.
+
+    Returns:
+        - dict: ``{"camera", "recording", "timeline", "errors"}``; the timeline holds
+          datetimes as returned by `timeline_data`. Failed parts are None and their
+          error is listed under `errors`.
+    """
+    page = {"camera": None, "recording": None, "timeline": None, "errors": {}}
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        camera_future = executor.submit(
+            inline_result, camera_data, personal_access_token, camera_id
+        )
+        recording_future = executor.submit(
+            inline_result, recording_data, personal_access_token, camera_id
+        )
+
+        page["recording"], entry = recording_future.result()
+        if entry is not None:
+            page["errors"]["recording"] = entry
+        else:
+            end = parse_timestamp(page["recording"]["recording_end"])
+            window = getattr(settings, "CAMERA_PAGE_TIMELINE_WINDOW", 23 * 3600)
+            page["timeline"], entry = inline_result(
+                timeline_data,
+                personal_access_token,
+                camera_id,
+                end - timedelta(seconds=window),
+                end,
+            )
+            if entry is not None:
+                page["errors"]["timeline"] = entry
+
+        page["camera"], entry = camera_future.result()
+        if entry is not None:
+            page["errors"]["camera"] = entry
+    return page
+
+
+class CameraListStreamError(Exception):
+    """
+    Raised while streaming a camera list when a later upstream page is unusable.
+    The response has already started, so the only option left is to abort it.
+    """
+
+
+def validate_camera_item(camera):
+    """
+    Validate a single camera of a camera list page, like `CameraListResponseSerializer` does.
+    """
+    if getattr(settings, "FAST_PATH_VALIDATION", True):
+        try:
+            return FAST_VALIDATORS[CameraSerializer](camera)
+        except FastPathMiss:
+            pass
+    serializer = CameraSerializer(data=camera)
+    if not serializer.is_valid():
+        raise CameraListStreamError(serializer.errors)
+    return serializer.data
+
+
+def stream_camera_list_data(personal_access_token, all_pages=False, asynchronous=False):
+    """
+    Return the camera list as an iterator of JSON chunks, one camera at a time.
+
+    The first page is validated before anything is sent, so upstream and
+    validation errors still produce a regular error response. With `all_pages`
+    the following pages are fetched one `next` link at a time while the earlier
+    cameras are being written; each camera is validated just before it is
+    emitted and a failure on a later page aborts the stream. Memory use is
+    bounded by one upstream page regardless of the number of cameras. The
+    response cache is not used.
+
+    Under ASGI (see `views.is_asgi`) pass `asynchronous` to get an async
+    iterator that fetches the following pages through `async_client`.
+
+    Returns:
+        - tuple: (iterator, None) on success or (None, JsonResponse) describing the error.
+    """
+    first_page, error_response = validate_camera_list(
+        client.get(
+            f"{ANGEL_CAM_BASE_URL}{CAMERA_LIST_PATH}",
+            personal_access_token=personal_access_token,
+        )
+    )
+    if error_response is not None:
+        return None, error_response
+    chunks = async_camera_list_chunks if asynchronous else camera_list_chunks
+    return chunks(personal_access_token, first_page, all_pages), None
+
+
+async def async_stream_camera_list_data(personal_access_token, all_pages=False):
+    """
+    Async counterpart of `stream_camera_list_data`, always returning an async iterator.
+    """
+    first_page, error_response = validate_camera_list(
+        await async_client.get(
+            f"{ANGEL_CAM_BASE_URL}{CAMERA_LIST_PATH}",
+            personal_access_token=personal_access_token,
+        )
+    )
+    if error_response is not None:
+        return None, error_response
+    return async_camera_list_chunks(personal_access_token, first_page, all_pages), None
+
+
+def camera_list_head(first_page, all_pages):
+    envelope = {
+        "count": first_page["count"],
+        "next": None if all_pages else first_page["next"],
+        "previous": None if all_pages else first_page["previous"],
+    }
+    return json.dumps(envelope)[:-1] + ', "results": ['
+
+
+def camera_list_page(response, url):
+    """
+    Return the lazily validated cameras and the `next` link of a later upstream page.
+    """
+    if response.status_code != 200:
+        raise CameraListStreamError(f"Upstream page {url} failed")
+    payload = response.json()
+    try:
+        results = payload["results"]
+        next_url = payload["next"]
+    except (KeyError, TypeError):
+        raise CameraListStreamError(f"Malformed upstream page {url}")
+    return (validate_camera_item(camera) for camera in results), next_url
+
+
+def camera_list_chunks(personal_access_token, first_page, all_pages):
+    yield camera_list_head(first_page, all_pages)
+    cameras = first_page["results"]
+    next_url = first_page["next"] if all_pages else None
+    separator = ""
+    try:
+        while True:
+            for camera in cameras:
+                yield separator + json.dumps(camera)
+                separator = ", "
+            if not next_url:
+                break
+            cameras, next_url = camera_list_page(
+                client.get(next_url, personal_access_token=personal_access_token),
+                next_url,
+            )
+    except CameraListStreamError:
+        logger.exception("Aborting streamed camera list")
+        raise
+    yield "]}"
+
+
+async def async_camera_list_chunks(personal_access_token, first_page, all_pages):
+    yield camera_list_head(first_page, all_pages)
+    cameras = first_page["results"]
+    next_url = first_page["next"] if all_pages else None
+    separator = ""
+    try:
+        while True:
+            for camera in cameras:
+                yield separator + json.dumps(camera)
+                separator = ", "
+            if not next_url:
+                break
+            cameras, next_url = camera_list_page(
+                await async_client.get(
+                    next_url, personal_access_token=personal_access_token
+                ),
+                next_url,
+            )
+    except CameraListStreamError:
+        logger.exception("Aborting streamed camera list")
+        raise
+    yield "]}"
+
+
+async def async_camera_list_data(personal_access_token):
+    return await async_cached_data(
+        personal_access_token,
+        CAMERA_LIST_PATH,
+        lambda: async_client.get(
+            f"{ANGEL_CAM_BASE_URL}{CAMERA_LIST_PATH}",
+            personal_access_token=personal_access_token,
+        ),
+        validate_camera_list,
+    )
+
+
+async def async_camera_data(personal_access_token, camera_id):
+    path = camera_path(camera_id)
+    return await async_cached_data(
+        personal_access_token,
+        path,
+        lambda: async_client.get(
+            f"{ANGEL_CAM_BASE_URL}{path}",
+            personal_access_token=personal_access_token,
+        ),
+        validate_camera,
+    )
+
+
+async def async_recording_data(personal_access_token, camera_id):
+    path = f"{camera_path(camera_id)}recording/"
+    return await async_cached_data(
+        personal_access_token,
+        path,
+        lambda: async_client.get(
+            f"{ANGEL_CAM_BASE_URL}{path}",
+            personal_access_token=personal_access_token,
+        ),
+        lambda response: validate_response(
+            response, RecordingSerializer, "Failed to retrieve recording data"
+        ),
+    )
@@ -0,0 +1,225 @@
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from PIL import Image
+
+from apps.utils.cache import register_cache
+from apps.utils.singleflight import SingleFlight
+from apps.utils.upstream import client
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotCache:
+    """
+    Size-bounded two-tier cache for snapshot images.
+
+    Images are kept in memory up to `max_memory_bytes` in total, least recently
+    used first out. When `directory` is set, every image is also written there
+    and images evicted from memory are read back from disk, which is bounded by
+    `max_disk_bytes` (oldest files are removed first).
+
+    Parameters:
+        - max_memory_bytes (int): Total size of the images kept in memory.
+        - directory (str): Optional directory for the disk tier.
+        - max_disk_bytes (int): Total size of the images kept on disk.
+    """
+
+    def __init__(self, max_memory_bytes, directory=None, max_disk_bytes=0):
+        self.max_memory_bytes = max_memory_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        register_cache(self)
+
+    @staticmethod
+    def _file_name(key):
+        return hashlib.sha256(repr(key).encode()).hexdigest() + ".img"
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return data
+        data = self._read(key)
+        with self._lock:
+            if data is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._remember(key, data)
+        return data
+
+    def set(self, key, data):
+        with self._lock:
+            self._remember(key, data)
+        self._write(key, data)
+
+    def _remember(self, key, data):
+        if len(data) > self.max_memory_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._entries[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _read(self, key):
+        if not self.directory:
+            return None
+        path = os.path.join(self.directory, self._file_name(key))
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            # Removed by a concurrent trim; the data read is still valid.
+            pass
+        return data
+
+    def _write(self, key, data):
+        if not self.directory or len(data) > self.max_disk_bytes:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, self._file_name(key))
+        temporary_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(data)
+        os.replace(temporary_path, path)
+        self._trim_disk()
+
+    def _trim_disk(self):
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".img"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        """
+        Empty the memory tier; files on disk are left to `max_disk_bytes`.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return dict(
+                self._stats, entries=len(self._entries), memory_bytes=self._memory_bytes
+            )
+
+
+snapshot_cache = SnapshotCache(
+    max_memory_bytes=getattr(settings, "SNAPSHOT_CACHE_MEMORY_BYTES", 64 * 1024 * 1024),
+    directory=getattr(settings, "SNAPSHOT_CACHE_DIR", None),
+    max_disk_bytes=getattr(settings, "SNAPSHOT_CACHE_DISK_BYTES", 512 * 1024 * 1024),
+)
+snapshot_flights = SingleFlight()
+
+
+def thumbnail_width(requested):
+    """
+    Round a requested width up to the nearest entry of ``SNAPSHOT_WIDTHS`` so the
+    number of cached variants per snapshot stays bounded. Returns None (the
+    original image) for widths above the largest entry.
+    """
+    for width in sorted(getattr(settings, "SNAPSHOT_WIDTHS", [160, 320, 640])):
+        if requested <= width:
+            return width
+    return None
+
+
+def make_thumbnail(data, width):
+    """
+    Downscale a JPEG snapshot to `width` pixels, keeping the aspect ratio.
+    Images that are already narrower, and images Pillow cannot decode, are
+    returned unchanged.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if image.width <= width:
+                return data
+            height = max(1, round(image.height * width / image.width))
+            thumbnail = image.convert("RGB").resize((width, height), Image.LANCZOS)
+    except (OSError, Image.DecompressionBombError):
+        logger.warning("Cannot decode snapshot, serving the original", exc_info=True)
+        return data
+    output = io.BytesIO()
+    thumbnail.save(
+        output,
+        format="JPEG",
+        quality=getattr(settings, "SNAPSHOT_JPEG_QUALITY", 80),
+        optimize=True,
+    )
+    return output.getvalue()
+
+
+def snapshot_image(camera_id, snapshot, width=None):
+    """
+    Return the snapshot image of a camera, optionally downscaled to `width`.
+
+    Originals and thumbnails are cached under ``(camera_id, created_at, width)``;
+    a new `created_at` means a new snapshot, so entries never need to be
+    invalidated. Concurrent requests for the same image share one upstream
+    fetch or resize.
+
+    Parameters:
+        - camera_id (int): The camera identifier.
+        - snapshot (dict): The validated `snapshot` of the camera (`url`, `created_at`).
+        - width (int): Optional thumbnail width, see `thumbnail_width`.
+
+    Returns:
+        - tuple: (key, image bytes) or (key, None) when upstream did not return the image.
+    """
+    key = (camera_id, snapshot["created_at"], width)
+    data = snapshot_cache.get(key)
+    if data is not None:
+        return key, data
+
+    def load():
+        data = snapshot_cache.get(key)
+        if data is not None:
+            return data
+        if width is None:
+            response = client.get(snapshot["url"])
+            if response.status_code != 200:
+                return None
+            data = response.content
+        else:
+            _, original = snapshot_image(camera_id, snapshot)
+            if original is None:
+                return None
+            data = make_thumbnail(original, width)
+        snapshot_cache.set(key, data)
+        return data
+
+    return key, snapshot_flights.do(key, load)
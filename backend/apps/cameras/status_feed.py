@@ -0,0 +1,263 @@
+import asyncio
+import json
+import logging
+import queue
+import threading
+
+from django.conf import settings
+
+from apps.utils.cache import token_digest
+from .services import refresh_all_camera_list_data
+
+logger = logging.getLogger(__name__)
+
+# Upstream statuses after which polling for the token is pointless.
+FATAL_STATUSES = (401, 403)
+
+
+def camera_state(camera):
+    """
+    The part of a camera pushed to status subscribers.
+    """
+    return {"id": camera["id"], "name": camera["name"], "status": camera["status"]}
+
+
+def diff_states(previous, current):
+    """
+    Return the cameras of `current` that are new or changed since `previous`,
+    plus a ``removed`` entry for every camera that disappeared.
+    """
+    changed = [
+        state
+        for camera_id, state in current.items()
+        if previous.get(camera_id) != state
+    ]
+    changed.extend(
+        {"id": camera_id, "name": state["name"], "status": "removed"}
+        for camera_id, state in previous.items()
+        if camera_id not in current
+    )
+    return changed
+
+
+class AsyncSubscriber:
+    """
+    A subscriber read from an event loop. The poller thread hands every
+    message over to the loop, so waiting for events holds no thread.
+    """
+
+    def __init__(self, loop):
+        self._loop = loop
+        self._queue = asyncio.Queue()
+
+    def put(self, message):
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, message)
+        except RuntimeError:
+            pass  # The subscriber's event loop is closed.
+
+    async def get(self, timeout):
+        """
+        Return the next message, or raise `asyncio.TimeoutError` after `timeout` seconds.
+        """
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+
+class CameraStatusPoller:
+    """
+    A background poller of the camera list of one token, shared by all of its
+    subscribers (typically one per open browser tab).
+
+    Every ``CAMERA_STATUS_POLL_INTERVAL`` seconds the full camera list is
+    refreshed from upstream, which also keeps the response cache warm for the
+    regular camera list endpoint, and diffed against the previous poll. New
+    subscribers first receive a ``snapshot`` event with every camera; after
+    that only a ``status`` event with the cameras that changed is published.
+    The poller stops when its last subscriber leaves or when upstream rejects
+    the token.
+    """
+
+    def __init__(self, key, personal_access_token, on_close):
+        self.key = key
+        self.personal_access_token = personal_access_token
+        self.cameras = None
+        self.closed = False
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._on_close = on_close
+        self._thread = threading.Thread(
+            target=self._run, name="camera-status-poller", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def subscribe(self, subscriber=None):
+        """
+        Register a subscriber: any object with a ``put(message)`` method, a new
+        `queue.Queue` by default. Returns the subscriber, or None if the poller
+        already stopped.
+        """
+        if subscriber is None:
+            subscriber = queue.Queue()
+        with self._lock:
+            if self.closed:
+                return None
+            self._subscribers.add(subscriber)
+            if self.cameras is not None:
+                subscriber.put(("snapshot", list(self.cameras.values())))
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+            if self._subscribers:
+                return
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            subscribers = list(self._subscribers)
+        self._stop.set()
+        self._on_close(self)
+        for subscriber in subscribers:
+            subscriber.put(None)
+
+    def _publish(self, event, payload, subscribers):
+        for subscriber in subscribers:
+            subscriber.put((event, payload))
+
+    def poll(self):
+        """
+        Refresh the camera list once and publish the differences.
+        """
+        data, error_response = refresh_all_camera_list_data(self.personal_access_token)
+        if error_response is not None:
+            with self._lock:
+                subscribers = list(self._subscribers)
+            self._publish("error", {"status": error_response.status_code}, subscribers)
+            if error_response.status_code in FATAL_STATUSES:
+                self.close()
+            return
+
+        current = {camera["id"]: camera_state(camera) for camera in data["results"]}
+        with self._lock:
+            previous, self.cameras = self.cameras, current
+            subscribers = list(self._subscribers)
+        if previous is None:
+            self._publish("snapshot", list(current.values()), subscribers)
+            return
+        changed = diff_states(previous, current)
+        if changed:
+            self._publish("status", changed, subscribers)
+
+    def _run(self):
+        interval = getattr(settings, "CAMERA_STATUS_POLL_INTERVAL", 15)
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Camera status poll failed")
+            self._stop.wait(interval)
+
+
+class CameraStatusPollerRegistry:
+    """
+    The running status pollers of the process, one per token.
+    """
+
+    def __init__(self):
+        self._pollers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, personal_access_token, subscriber=None):
+        """
+        Subscribe to the poller of a token, starting one if needed. See
+        `CameraStatusPoller.subscribe` for `subscriber`.
+
+        Returns:
+            - tuple: (poller, subscriber).
+        """
+        key = token_digest(personal_access_token)
+        with self._lock:
+            poller = self._pollers.get(key)
+            subscribed = poller.subscribe(subscriber) if poller is not None else None
+            if subscribed is not None:
+                return poller, subscribed
+            poller = CameraStatusPoller(key, personal_access_token, self._remove)
+            subscriber = poller.subscribe(subscriber)
+            self._pollers[key] = poller
+        poller.start()
+        return poller, subscriber
+
+    def _remove(self, poller):
+        with self._lock:
+            if self._pollers.get(poller.key) is poller:
+                del self._pollers[poller.key]
+
+    def __len__(self):
+        return len(self._pollers)
+
+
+pollers = CameraStatusPollerRegistry()
+
+
+def server_sent_event(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n".encode()
+
+
+def status_events(personal_access_token):
+    """
+    Subscribe to the camera status poller of a token and yield its events in
+    ``text/event-stream`` format.
+
+    A comment line is sent after ``CAMERA_STATUS_HEARTBEAT`` seconds without
+    events, so proxies keep the connection open and a disconnected client is
+    noticed. The subscription ends when the generator is closed, which Django
+    does when the client disconnects.
+
+    Under ASGI use `async_status_events` instead, see `views.is_asgi`.
+    """
+    poller, subscriber = pollers.subscribe(personal_access_token)
+    heartbeat = getattr(settings, "CAMERA_STATUS_HEARTBEAT", 15)
+    try:
+        yield b"retry: 5000\n\n"
+        while True:
+            try:
+                message = subscriber.get(timeout=heartbeat)
+            except queue.Empty:
+                yield b": keep-alive\n\n"
+                continue
+            if message is None:
+                return
+            yield server_sent_event(*message)
+    finally:
+        poller.unsubscribe(subscriber)
+
+
+async def async_status_events(personal_access_token):
+    """
+    Async variant of `status_events`; the events are awaited through an
+    `AsyncSubscriber`, so a subscriber holds no thread.
+    """
+    poller, subscriber = pollers.subscribe(
+        personal_access_token, AsyncSubscriber(asyncio.get_running_loop())
+    )
+    heartbeat = getattr(settings, "CAMERA_STATUS_HEARTBEAT", 15)
+    try:
+        yield b"retry: 5000\n\n"
+        while True:
+            try:
+                message = await subscriber.get(heartbeat)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            if message is None:
+                return
+            yield server_sent_event(*message)
+    finally:
+        poller.unsubscribe(subscriber)
@@ -1,12 +1,14 @@
 import pytest
+from asgiref.sync import async_to_sync
 from django.urls import reverse
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.conf import settings
-from django.test import RequestFactory
+from django.test import AsyncClient, RequestFactory
 from rest_framework import status
 from unittest.mock import patch, Mock
 import jwt
 from rest_framework.test import APIClient
+from apps.cameras.hls import SegmentCache
 from apps.cameras.views import CameraView
 from core.settings import PERSONAL_ACCESS_TOKEN
 
@@ -33,6 +35,21 @@ def authenticated_client(client, access_token):
     return client
 
 
+@pytest.fixture
+def asgi_get(access_token):
+    """
+    Send an authenticated GET request through the ASGI handler.
+    """
+    client = AsyncClient()
+
+    def get(path, data=None):
+        return async_to_sync(client.get)(
+            path, data, headers={"Authorization": f"Bearer {access_token}"}
+        )
+
+    return get
+
+
 @pytest.fixture
 def factory():
     return RequestFactory()
@@ -199,3 +216,10 @@ def valid_camera_list_data():
             },
         ],
     }
+
+
+@pytest.fixture
+def segment_cache(tmp_path):
+    cache = SegmentCache(str(tmp_path), max_bytes=1024)
+    with patch("apps.cameras.hls.segment_cache", cache):
+        yield cache
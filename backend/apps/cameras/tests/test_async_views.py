@@ -0,0 +1,131 @@
+import pytest
+from unittest.mock import patch, AsyncMock, Mock
+from django.urls import reverse
+from rest_framework import status
+from apps.cameras.serializers import CameraSerializer, RecordingSerializer
+
+
+@pytest.mark.django_db
+@patch("httpx.AsyncClient.request", new_callable=AsyncMock)
+def test_async_camera_view_matches_sync_output(
+    mock_request, authenticated_client, valid_camera_data
+):
+    mock_request.return_value = Mock(status_code=200, json=lambda: valid_camera_data)
+    url = reverse("async-camera", kwargs={"camera_id": 112859})
+
+    response = authenticated_client.get(url)
+
+    serializer = CameraSerializer(
+        data=dict(
+            valid_camera_data,
+            streams=[
+                stream
+                for stream in valid_camera_data["streams"]
+                if stream["format"] in ("mjpeg", "mp4")
+            ],
+        )
+    )
+    serializer.is_valid()
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == serializer.data
+
+
+@pytest.mark.django_db
+@patch("httpx.AsyncClient.request", new_callable=AsyncMock)
+def test_async_recording_info_success(
+    mock_request, authenticated_client, valid_get_recording_info
+):
+    mock_request.return_value = Mock(
+        status_code=200, json=lambda: valid_get_recording_info
+    )
+    url = reverse("async-camera-recording-info", kwargs={"camera_id": "112859"})
+
+    response = authenticated_client.get(url)
+
+    serializer = RecordingSerializer(data=valid_get_recording_info)
+    serializer.is_valid()
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == serializer.data
+
+
+@pytest.mark.django_db
+@patch("httpx.AsyncClient.request", new_callable=AsyncMock)
+def test_async_timeline_missing_params(mock_request, authenticated_client):
+    url = reverse("async-camera-recording-timeline", kwargs={"camera_id": "112859"})
+
+    response = authenticated_client.get(url)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == {"detail": "Start and end parameters are required."}
+    mock_request.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_async_camera_list_unauthorized(authenticated_client):
+    url = reverse("async-camera-list")
+    authenticated_client.credentials()
+
+    response = authenticated_client.get(url)
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.json() == {"error": "Unauthorized"}
+
+
+@pytest.mark.django_db
+@patch("httpx.AsyncClient.request", new_callable=AsyncMock)
+def test_async_recording_info_is_cached(
+    mock_request, authenticated_client, valid_get_recording_info
+):
+    mock_request.return_value = Mock(
+        status_code=200, json=lambda: valid_get_recording_info
+    )
+    url = reverse("async-camera-recording-info", kwargs={"camera_id": "112859"})
+
+    first = authenticated_client.get(url)
+    second = authenticated_client.get(url)
+
+    assert first.json() == second.json()
+    assert mock_request.call_count == 1
+
+
+@pytest.mark.django_db
+@patch("httpx.AsyncClient.request", new_callable=AsyncMock)
+def test_async_stream_view_returns_proxy_url(
+    mock_request, authenticated_client, valid_recording_stream_data
+):
+    mock_request.return_value = Mock(
+        status_code=200, json=lambda: valid_recording_stream_data
+    )
+    url = reverse("async-camera-recording-stream", kwargs={"camera_id": "112859"})
+
+    response = authenticated_client.get(
+        url, {"start": "2024-08-09T00:00:00Z", "proxy": "true"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["url"].startswith("http://testserver/api/recording/")
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_async_timeline_matches_sync_output(
+    mock_request, authenticated_client, valid_timeline_data
+):
+    mock_request.return_value = Mock(status_code=200, json=lambda: valid_timeline_data)
+    params = {
+        "start": "2024-08-09T00:00:00Z",
+        "end": "2024-08-09T01:00:00Z",
+        "format": "compact",
+    }
+
+    sync_response = authenticated_client.get(
+        reverse("camera-recording-timeline", kwargs={"camera_id": "112859"}), params
+    )
+    async_response = authenticated_client.get(
+        reverse("async-camera-recording-timeline", kwargs={"camera_id": "112859"}),
+        params,
+    )
+
+    assert async_response.status_code == status.HTTP_200_OK
+    assert async_response["Content-Type"] == sync_response["Content-Type"]
+    assert async_response.content == sync_response.content
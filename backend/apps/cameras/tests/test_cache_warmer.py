@@ -0,0 +1,154 @@
+import copy
+import pytest
+from unittest.mock import patch, AsyncMock, Mock
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from apps.cameras.tests.test_camera_list_pagination import BASE_URL, paged
+from apps.cameras.warmer import CacheWarmer, RequestBudget
+
+
+@pytest.fixture
+def warmer():
+    warmer = CacheWarmer()
+    with patch("apps.cameras.views.warmer", warmer), patch(
+        "apps.cameras.async_views.warmer", warmer
+    ), patch.object(CacheWarmer, "_run", lambda self: None):
+        yield warmer
+
+
+@pytest.fixture
+def camera_upstream(valid_camera_data):
+    def request(method, url, **kwargs):
+        return Mock(status_code=200, json=lambda: copy.deepcopy(valid_camera_data))
+
+    with patch("requests.Session.request", side_effect=request) as mock_request:
+        yield mock_request
+
+
+def test_request_budget_is_a_sliding_window():
+    budget = RequestBudget(limit=2, period=60)
+
+    assert budget.acquire(0)
+    assert budget.acquire(10)
+    assert not budget.acquire(59)
+    assert budget.acquire(60)
+
+
+@pytest.mark.django_db
+@override_settings(CACHE_WARMER_INTERVAL=10, CACHE_WARMER_JITTER=0.2)
+def test_requested_camera_is_refreshed_before_it_expires(
+    warmer, camera_upstream, authenticated_client
+):
+    url = reverse("camera", kwargs={"camera_id": 112859})
+    with patch("apps.cameras.warmer.time.monotonic", return_value=1000):
+        authenticated_client.get(url)
+    assert camera_upstream.call_count == 1
+
+    warmer.run_pending(now=1007)
+    assert camera_upstream.call_count == 1
+
+    warmer.run_pending(now=1010)
+    assert camera_upstream.call_count == 2
+    assert warmer.stats()["refreshed"] == 1
+
+    # The refreshed camera is served from the cache.
+    response = authenticated_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert camera_upstream.call_count == 2
+
+
+@override_settings(CACHE_WARMER_BUDGET=2, CACHE_WARMER_INTERVAL=10)
+def test_refreshes_over_budget_are_postponed(warmer, camera_upstream):
+    with patch("apps.cameras.warmer.time.monotonic", return_value=0):
+        for camera_id in range(3):
+            warmer.touch("token", "camera", camera_id)
+
+    warmer.run_pending(now=10)
+    assert camera_upstream.call_count == 2
+    assert warmer.stats()["postponed"] == 1
+
+    warmer.run_pending(now=70)
+    assert camera_upstream.call_count == 4
+
+
+@override_settings(CACHE_WARMER_ACTIVE_WINDOW=60, CACHE_WARMER_INTERVAL=10)
+def test_inactive_resources_are_dropped(warmer, camera_upstream):
+    with patch("apps.cameras.warmer.time.monotonic", return_value=0):
+        warmer.touch("token", "camera", 1)
+
+    warmer.run_pending(now=61)
+
+    camera_upstream.assert_not_called()
+    assert warmer.stats()["entries"] == 0
+
+
+@override_settings(CACHE_WARMER_INTERVAL=10)
+@patch("requests.Session.request")
+def test_rejected_token_is_no_longer_warmed(mock_request, warmer):
+    mock_request.return_value = Mock(status_code=401)
+    with patch("apps.cameras.warmer.time.monotonic", return_value=0):
+        warmer.touch("revoked", "camera-list")
+        warmer.touch("revoked", "recording", 1)
+
+    warmer.run_pending(now=10)
+
+    assert mock_request.call_count == 1
+    assert warmer.stats()["entries"] == 0
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_failed_resource_is_not_warmed(mock_request, warmer, authenticated_client):
+    mock_request.return_value = Mock(status_code=404)
+
+    response = authenticated_client.get(reverse("camera", kwargs={"camera_id": 404404}))
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert warmer.stats()["entries"] == 0
+
+
+@override_settings(CACHE_WARMER_BUDGET=3, CACHE_WARMER_INTERVAL=10)
+@patch("requests.Session.request")
+def test_every_page_of_all_cameras_counts_against_budget(
+    mock_request, warmer, valid_camera_list_data
+):
+    responses = paged(valid_camera_list_data, 3, lambda page: f"{BASE_URL}?page={page}")
+
+    def upstream(method, url, **kwargs):
+        page = int(url.split("page=")[1]) if "page=" in url else 1
+        return Mock(status_code=200, json=lambda: copy.deepcopy(responses[page]))
+
+    mock_request.side_effect = upstream
+    with patch("apps.cameras.warmer.time.monotonic", return_value=0), patch(
+        "apps.cameras.warmer.random.uniform", return_value=1
+    ):
+        warmer.touch("token", "all-cameras")
+        warmer.touch("token", "camera-list")
+        warmer.run_pending(now=10)
+
+    # The full list used up the budget with its three pages.
+    assert mock_request.call_count == 3
+    assert warmer.stats()["postponed"] == 1
+
+
+@pytest.mark.django_db
+@patch("httpx.AsyncClient.request", new_callable=AsyncMock)
+def test_async_views_are_warmed(
+    mock_request, warmer, authenticated_client, valid_camera_data
+):
+    mock_request.return_value = Mock(
+        status_code=200, json=lambda: copy.deepcopy(valid_camera_data)
+    )
+
+    response = authenticated_client.get(
+        reverse("async-camera", kwargs={"camera_id": 112859})
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert warmer.stats()["entries"] == 1
+
+    mock_request.return_value = Mock(status_code=404)
+    authenticated_client.get(
+        reverse("async-camera-recording-info", kwargs={"camera_id": 112859})
+    )
+    assert warmer.stats()["entries"] == 1
@@ -0,0 +1,88 @@
+import copy
+import pytest
+import requests
+from unittest.mock import patch, Mock
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_batch_returns_cameras_in_requested_order(
+    mock_request, authenticated_client, valid_camera_data
+):
+    mock_request.side_effect = lambda method, url, **kwargs: Mock(
+        status_code=200,
+        json=lambda: dict(copy.deepcopy(valid_camera_data), id=int(url.split("/")[-2])),
+    )
+
+    response = authenticated_client.get(reverse("camera-batch"), {"ids": "3,1,2,1"})
+
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()["results"]
+    assert [entry["id"] for entry in results] == [3, 1, 2]
+    assert [entry["data"]["id"] for entry in results] == [3, 1, 2]
+    assert all(entry["status"] == 200 for entry in results)
+    assert {stream["format"] for stream in results[0]["data"]["streams"]} == {
+        "mjpeg",
+        "mp4",
+    }
+    assert mock_request.call_count == 3
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_partial_failures_are_reported_inline(
+    mock_request, authenticated_client, valid_camera_data
+):
+    def upstream(method, url, **kwargs):
+        if "/2/" in url:
+            return Mock(status_code=404)
+        return Mock(status_code=200, json=lambda: copy.deepcopy(valid_camera_data))
+
+    mock_request.side_effect = upstream
+
+    response = authenticated_client.get(reverse("camera-batch"), {"ids": "1,2"})
+
+    assert response.status_code == status.HTTP_200_OK
+    failed = response.json()["results"][1]
+    assert failed == {
+        "id": 2,
+        "status": 400,
+        "error": {"error": "Failed to fetch camera data from external service"},
+    }
+
+
+@pytest.mark.django_db
+@override_settings(UPSTREAM_MAX_RETRIES=0)
+@patch("requests.Session.request")
+def test_timed_out_camera_is_reported_inline(
+    mock_request, authenticated_client, valid_camera_data
+):
+    def upstream(method, url, **kwargs):
+        if "/2/" in url:
+            raise requests.ReadTimeout()
+        return Mock(status_code=200, json=lambda: copy.deepcopy(valid_camera_data))
+
+    mock_request.side_effect = upstream
+
+    response = authenticated_client.get(reverse("camera-batch"), {"ids": "1,2,3"})
+
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()["results"]
+    assert [entry["status"] for entry in results] == [200, 504, 200]
+    assert results[1] == {
+        "id": 2,
+        "status": 504,
+        "error": {"detail": "Upstream service timed out"},
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("ids", ["", "1,abc", "1,2,3"])
+def test_invalid_ids_are_rejected(authenticated_client, ids):
+    with override_settings(CAMERA_BATCH_MAX_IDS=2):
+        response = authenticated_client.get(reverse("camera-batch"), {"ids": ids})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
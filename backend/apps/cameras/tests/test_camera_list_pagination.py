@@ -0,0 +1,101 @@
+import copy
+import pytest
+from unittest.mock import patch, Mock
+from django.urls import reverse
+from rest_framework import status
+from apps.cameras.services import remaining_page_urls
+
+BASE_URL = "https://api.angelcam.com/v1/shared-cameras/"
+
+
+def paged(valid_camera_list_data, pages, next_link):
+    """
+    Split the fixture cameras into `pages` pages of one camera each, linked by `next_link(page)`.
+    """
+    camera = valid_camera_list_data["results"][0]
+    responses = {}
+    for page in range(1, pages + 1):
+        data = copy.deepcopy(valid_camera_list_data)
+        data["count"] = pages
+        data["results"] = [dict(copy.deepcopy(camera), id=page)]
+        data["next"] = next_link(page + 1) if page < pages else None
+        responses[page] = data
+    return responses
+
+
+def test_remaining_page_urls_for_page_numbers():
+    assert remaining_page_urls(f"{BASE_URL}?page=2", 95, 20) == [
+        f"{BASE_URL}?page={page}" for page in range(2, 6)
+    ]
+
+
+def test_remaining_page_urls_for_limit_offset():
+    assert remaining_page_urls(f"{BASE_URL}?limit=20&offset=20", 50, 20) == [
+        f"{BASE_URL}?limit=20&offset=20",
+        f"{BASE_URL}?limit=20&offset=40",
+    ]
+
+
+def test_remaining_page_urls_for_unknown_style():
+    assert remaining_page_urls(f"{BASE_URL}?cursor=abc", 50, 20) is None
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_all_pages_are_merged(
+    mock_request, authenticated_client, valid_camera_list_data
+):
+    responses = paged(valid_camera_list_data, 4, lambda page: f"{BASE_URL}?page={page}")
+
+    def upstream(method, url, **kwargs):
+        page = int(url.split("page=")[1]) if "page=" in url else 1
+        return Mock(status_code=200, json=lambda: copy.deepcopy(responses[page]))
+
+    mock_request.side_effect = upstream
+    response = authenticated_client.get(reverse("camera-list"), {"all": "true"})
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["count"] == 4
+    assert data["next"] is None
+    assert [camera["id"] for camera in data["results"]] == [1, 2, 3, 4]
+    assert mock_request.call_count == 4
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_unknown_pagination_follows_next_links(
+    mock_request, authenticated_client, valid_camera_list_data
+):
+    responses = paged(
+        valid_camera_list_data, 3, lambda page: f"{BASE_URL}?cursor=c{page}"
+    )
+
+    def upstream(method, url, **kwargs):
+        page = int(url.split("cursor=c")[1]) if "cursor=" in url else 1
+        return Mock(status_code=200, json=lambda: copy.deepcopy(responses[page]))
+
+    mock_request.side_effect = upstream
+    response = authenticated_client.get(reverse("camera-list"), {"all": "true"})
+
+    assert [camera["id"] for camera in response.json()["results"]] == [1, 2, 3]
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_failed_page_fails_the_request(
+    mock_request, authenticated_client, valid_camera_list_data
+):
+    responses = paged(valid_camera_list_data, 3, lambda page: f"{BASE_URL}?page={page}")
+
+    def upstream(method, url, **kwargs):
+        if "page=3" in url:
+            return Mock(status_code=502)
+        page = int(url.split("page=")[1]) if "page=" in url else 1
+        return Mock(status_code=200, json=lambda: copy.deepcopy(responses[page]))
+
+    mock_request.side_effect = upstream
+    response = authenticated_client.get(reverse("camera-list"), {"all": "true"})
+
+    assert response.status_code == 502
+    assert response.json() == {"detail": "Failed to retrieve camera list"}
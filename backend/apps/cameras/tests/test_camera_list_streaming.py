@@ -0,0 +1,154 @@
+import copy
+import json
+import pytest
+from unittest.mock import patch, AsyncMock, Mock
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+from rest_framework import status
+from apps.cameras.services import CameraListStreamError
+
+NEXT_URL = "https://api.angelcam.com/v1/shared-cameras/?page=2"
+
+
+def two_pages(valid_camera_list_data):
+    first = copy.deepcopy(valid_camera_list_data)
+    second = copy.deepcopy(valid_camera_list_data)
+    first["count"] = 4
+    first["next"] = NEXT_URL
+    second["previous"] = "https://api.angelcam.com/v1/shared-cameras/"
+    second["results"] = [
+        dict(camera, id=camera["id"] + 10) for camera in second["results"]
+    ]
+    return first, second
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_streamed_list_matches_regular_list(
+    mock_request, authenticated_client, valid_camera_list_data
+):
+    mock_request.return_value = Mock(
+        status_code=200, json=lambda: copy.deepcopy(valid_camera_list_data)
+    )
+    url = reverse("camera-list")
+
+    streamed = authenticated_client.get(url, {"stream": "true"})
+    regular = authenticated_client.get(url)
+
+    assert streamed.status_code == status.HTTP_200_OK
+    assert streamed.streaming
+    assert json.loads(b"".join(streamed.streaming_content)) == regular.json()
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_all_pages_are_streamed_lazily(
+    mock_request, authenticated_client, valid_camera_list_data
+):
+    first, second = two_pages(valid_camera_list_data)
+    mock_request.side_effect = lambda method, url, **kwargs: Mock(
+        status_code=200,
+        json=lambda: copy.deepcopy(second if "page=2" in url else first),
+    )
+
+    response = authenticated_client.get(
+        reverse("camera-list"), {"stream": "true", "all": "true"}
+    )
+    chunks = iter(response.streaming_content)
+    head = [next(chunks), next(chunks)]
+    assert mock_request.call_count == 1
+
+    data = json.loads(b"".join(head + list(chunks)))
+    assert mock_request.call_count == 2
+    assert data["count"] == 4
+    assert data["next"] is None
+    assert [camera["id"] for camera in data["results"]] == [
+        112860,
+        112859,
+        112870,
+        112869,
+    ]
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_first_page_error_is_a_regular_response(mock_request, authenticated_client):
+    mock_request.return_value = Mock(status_code=503)
+
+    response = authenticated_client.get(reverse("camera-list"), {"stream": "true"})
+
+    assert response.status_code == 503
+    assert response.json() == {"detail": "Failed to retrieve camera list"}
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_invalid_later_page_aborts_the_stream(
+    mock_request, authenticated_client, valid_camera_list_data
+):
+    first, second = two_pages(valid_camera_list_data)
+    second["results"][1]["owner"]["email"] = "not-an-email"
+    mock_request.side_effect = lambda method, url, **kwargs: Mock(
+        status_code=200,
+        json=lambda: copy.deepcopy(second if "page=2" in url else first),
+    )
+
+    response = authenticated_client.get(
+        reverse("camera-list"), {"stream": "true", "all": "true"}
+    )
+
+    with pytest.raises(CameraListStreamError):
+        b"".join(response.streaming_content)
+
+
+def read_async(response, on_chunk=None):
+    """
+    Collect the chunks of an async streaming response, calling
+    `on_chunk(count)` after each one is received.
+    """
+
+    async def read():
+        chunks = []
+        async for chunk in response.streaming_content:
+            chunks.append(chunk)
+            if on_chunk is not None:
+                on_chunk(len(chunks))
+        return chunks
+
+    return async_to_sync(read)()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", ["camera-list", "async-camera-list"])
+@patch("httpx.AsyncClient.request", new_callable=AsyncMock)
+@patch("requests.Session.request")
+def test_pages_are_streamed_asynchronously_under_asgi(
+    mock_request, mock_async_request, asgi_get, valid_camera_list_data, url_name
+):
+    first, second = two_pages(valid_camera_list_data)
+    mock_request.return_value = Mock(status_code=200, json=lambda: first)
+    mock_async_request.side_effect = lambda method, url, **kwargs: Mock(
+        status_code=200,
+        json=lambda: copy.deepcopy(second if "page=2" in url else first),
+    )
+    first_page_calls = 1 if url_name == "async-camera-list" else 0
+    calls_after_first_camera = []
+
+    def on_chunk(index):
+        if index == 2:
+            calls_after_first_camera.append(mock_async_request.call_count)
+
+    response = asgi_get(reverse(url_name), {"stream": "true", "all": "true"})
+    assert response.is_async
+    chunks = read_async(response, on_chunk)
+
+    data = json.loads(b"".join(chunks))
+    assert calls_after_first_camera == [first_page_calls]
+    assert mock_async_request.call_count == first_page_calls + 1
+    assert data["count"] == 4
+    assert [camera["id"] for camera in data["results"]] == [
+        112860,
+        112859,
+        112870,
+        112869,
+    ]
@@ -6,7 +6,7 @@ from rest_framework.test import APIClient
 
 
 @pytest.mark.django_db
-@patch("apps.cameras.views.requests.get")
+@patch("requests.Session.request")
 def test_get_camera_list_success(
     mock_requests, authenticated_client, valid_camera_list_data
 ):
@@ -22,7 +22,7 @@ def test_get_camera_list_success(
 
 
 @pytest.mark.django_db
-@patch("apps.cameras.views.requests.get")
+@patch("requests.Session.request")
 def test_get_camera_list_auth_failure(mock_requests, authenticated_client):
     url = reverse("camera-list")
 
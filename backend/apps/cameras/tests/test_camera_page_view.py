@@ -0,0 +1,120 @@
+import copy
+import pytest
+import requests
+from datetime import datetime, timezone
+from unittest.mock import patch, Mock
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+NOW = datetime(2024, 8, 11, 12, 0, tzinfo=timezone.utc)
+
+
+def upstream(valid_camera_data, valid_get_recording_info, valid_timeline_data):
+    calls = []
+
+    def request(method, url, **kwargs):
+        calls.append((url, kwargs.get("params")))
+        if url.endswith("/recording/timeline/"):
+            payload = valid_timeline_data
+        elif url.endswith("/recording/"):
+            payload = valid_get_recording_info
+        else:
+            payload = valid_camera_data
+        return Mock(status_code=200, json=lambda: copy.deepcopy(payload))
+
+    return calls, request
+
+
+@pytest.mark.django_db
+@patch("apps.cameras.timeline.timezone.now", return_value=NOW)
+@patch("requests.Session.request")
+def test_camera_page_combines_all_parts(
+    mock_request,
+    mock_now,
+    authenticated_client,
+    valid_camera_data,
+    valid_get_recording_info,
+):
+    timeline = {
+        "start": "2024-08-10T11:09:39Z",
+        "end": "2024-08-11T10:09:39Z",
+        "segments": [{"start": "2024-08-11T01:00:00Z", "end": "2024-08-11T02:00:00Z"}],
+    }
+    calls, mock_request.side_effect = upstream(
+        valid_camera_data, valid_get_recording_info, timeline
+    )
+
+    response = authenticated_client.get(
+        reverse("camera-page", kwargs={"camera_id": 112859})
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["errors"] == {}
+    assert data["camera"]["id"] == 112859
+    assert data["recording"] == valid_get_recording_info
+    assert data["timeline"] == timeline
+    timeline_params = [params for url, params in calls if params]
+    assert timeline_params == [
+        {"start": "2024-08-10T11:09:39+00:00", "end": "2024-08-11T10:09:39+00:00"}
+    ]
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_failed_recording_info_is_reported_inline(
+    mock_request, authenticated_client, valid_camera_data
+):
+    def request(method, url, **kwargs):
+        if url.endswith("/recording/"):
+            return Mock(status_code=403)
+        return Mock(status_code=200, json=lambda: copy.deepcopy(valid_camera_data))
+
+    mock_request.side_effect = request
+
+    response = authenticated_client.get(
+        reverse("camera-page", kwargs={"camera_id": 112859})
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["camera"]["id"] == 112859
+    assert data["recording"] is None
+    assert data["timeline"] is None
+    assert data["errors"] == {
+        "recording": {
+            "status": 403,
+            "error": {"detail": "Failed to retrieve recording data"},
+        }
+    }
+    assert mock_request.call_count == 2
+
+
+@pytest.mark.django_db
+@override_settings(UPSTREAM_MAX_RETRIES=0)
+@patch("requests.Session.request")
+def test_timed_out_camera_details_are_reported_inline(
+    mock_request, authenticated_client, valid_get_recording_info, valid_timeline_data
+):
+    calls, request = upstream(None, valid_get_recording_info, valid_timeline_data)
+
+    def timing_out(method, url, **kwargs):
+        if url.endswith("/112859/"):
+            raise requests.ReadTimeout()
+        return request(method, url, **kwargs)
+
+    mock_request.side_effect = timing_out
+
+    response = authenticated_client.get(
+        reverse("camera-page", kwargs={"camera_id": 112859})
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["camera"] is None
+    assert data["recording"] == valid_get_recording_info
+    assert data["timeline"] is not None
+    assert data["errors"] == {
+        "camera": {"status": 504, "error": {"detail": "Upstream service timed out"}}
+    }
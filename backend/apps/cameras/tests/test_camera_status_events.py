@@ -0,0 +1,162 @@
+import copy
+import json
+import pytest
+from unittest.mock import patch, Mock
+from asgiref.sync import async_to_sync
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from apps.cameras.status_feed import (
+    CameraStatusPoller,
+    async_status_events,
+    diff_states,
+    pollers,
+    status_events,
+)
+
+
+def parse_event(chunk):
+    lines = dict(line.split(": ", 1) for line in chunk.decode().strip().split("\n"))
+    return lines["event"], json.loads(lines["data"])
+
+
+@pytest.fixture
+def camera_list_upstream(valid_camera_list_data):
+    payloads = [copy.deepcopy(valid_camera_list_data)]
+
+    def request(method, url, **kwargs):
+        return Mock(status_code=200, json=lambda: copy.deepcopy(payloads[-1]))
+
+    with patch("requests.Session.request", side_effect=request) as mock_request:
+        yield mock_request, payloads
+
+
+def test_diff_states_reports_changed_and_removed_cameras():
+    previous = {
+        1: {"id": 1, "name": "Door", "status": "online"},
+        2: {"id": 2, "name": "Yard", "status": "online"},
+    }
+    current = {
+        1: {"id": 1, "name": "Door", "status": "offline"},
+        3: {"id": 3, "name": "Gate", "status": "online"},
+    }
+
+    assert diff_states(previous, current) == [
+        {"id": 1, "name": "Door", "status": "offline"},
+        {"id": 3, "name": "Gate", "status": "online"},
+        {"id": 2, "name": "Yard", "status": "removed"},
+    ]
+
+
+def test_poller_publishes_snapshot_then_changes(camera_list_upstream):
+    _, payloads = camera_list_upstream
+    poller = CameraStatusPoller("key", "token", on_close=Mock())
+    subscriber = poller.subscribe()
+
+    poller.poll()
+    poller.poll()
+    changed = copy.deepcopy(payloads[-1])
+    changed["results"][0]["status"] = "offline"
+    payloads.append(changed)
+    poller.poll()
+
+    event, cameras = subscriber.get_nowait()
+    assert event == "snapshot"
+    assert [camera["id"] for camera in cameras] == [112860, 112859]
+    assert subscriber.get_nowait() == (
+        "status",
+        [{"id": 112860, "name": "Sample", "status": "offline"}],
+    )
+    assert subscriber.empty()
+
+
+@override_settings(CAMERA_STATUS_POLL_INTERVAL=60)
+def test_subscribers_share_one_poller(camera_list_upstream):
+    mock_request, _ = camera_list_upstream
+    first = status_events("token")
+    second = status_events("token")
+
+    assert next(first) == next(second) == b"retry: 5000\n\n"
+    assert parse_event(next(first))[0] == "snapshot"
+    assert parse_event(next(second))[0] == "snapshot"
+    assert len(pollers) == 1
+    assert mock_request.call_count == 1
+
+    first.close()
+    assert len(pollers) == 1
+    second.close()
+    assert len(pollers) == 0
+
+
+@override_settings(CAMERA_STATUS_POLL_INTERVAL=60)
+@patch("requests.Session.request")
+def test_rejected_token_ends_the_stream(mock_request):
+    mock_request.return_value = Mock(status_code=401)
+    events = status_events("revoked")
+
+    next(events)
+    assert parse_event(next(events)) == ("error", {"status": 401})
+    with pytest.raises(StopIteration):
+        next(events)
+    assert len(pollers) == 0
+
+
+@pytest.mark.django_db
+@override_settings(CAMERA_STATUS_POLL_INTERVAL=60)
+def test_events_view_streams_server_sent_events(
+    camera_list_upstream, authenticated_client
+):
+    response = authenticated_client.get(reverse("camera-status-events"))
+    content = iter(response.streaming_content)
+
+    next(content)
+    event, cameras = parse_event(next(content))
+    response.close()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"] == "text/event-stream"
+    assert event == "snapshot"
+    assert {camera["status"] for camera in cameras} == {"online"}
+    assert len(pollers) == 0
+
+
+@override_settings(CAMERA_STATUS_POLL_INTERVAL=60, CAMERA_STATUS_HEARTBEAT=0.05)
+def test_async_subscriber_shares_the_poller(camera_list_upstream):
+    mock_request, _ = camera_list_upstream
+
+    async def subscribe():
+        sync_events = status_events("token")
+        next(sync_events)
+        async_events = async_status_events("token")
+        chunks = [await async_events.__anext__() for _ in range(3)]
+        shared = len(pollers)
+        await async_events.aclose()
+        sync_events.close()
+        return chunks, shared
+
+    (retry, snapshot, keep_alive), shared = async_to_sync(subscribe)()
+
+    assert retry == b"retry: 5000\n\n"
+    assert parse_event(snapshot)[0] == "snapshot"
+    assert keep_alive == b": keep-alive\n\n"
+    assert shared == 1
+    assert mock_request.call_count == 1
+    assert len(pollers) == 0
+
+
+@pytest.mark.django_db
+@override_settings(CAMERA_STATUS_POLL_INTERVAL=60)
+def test_events_view_is_async_under_asgi(camera_list_upstream, asgi_get):
+    async def first_event(response):
+        events = response.streaming_content
+        await events.__anext__()
+        event = parse_event(await events.__anext__())
+        await events.aclose()
+        return event
+
+    response = asgi_get(reverse("camera-status-events"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.is_async
+    assert async_to_sync(first_event)(response)[0] == "snapshot"
+    assert len(pollers) == 0
@@ -11,7 +11,7 @@ from django.http import JsonResponse
 
 
 @pytest.mark.django_db
-@patch("requests.get")
+@patch("requests.Session.request")
 def test_get_camera_data_success(mock_get, authenticated_client, valid_camera_data):
     url = reverse("camera", kwargs={"camera_id": 112859})
     mock_get.return_value = Mock(status_code=200, json=lambda: valid_camera_data)
@@ -23,7 +23,7 @@ def test_get_camera_data_success(mock_get, authenticated_client, valid_camera_da
     assert response.json() == expected_data
 
 
-@patch("requests.get")
+@patch("requests.Session.request")
 def test_get_camera_data_invalid_data(mock_requests, authenticated_client):
     url = reverse("camera", kwargs={"camera_id": 112859})
     mock_response = mock_requests.return_value
@@ -34,7 +34,7 @@ def test_get_camera_data_invalid_data(mock_requests, authenticated_client):
     assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 
-@patch("requests.get")
+@patch("requests.Session.request")
 def test_get_camera_data_unauthorized(mock_requests, authenticated_client):
     url = reverse("camera", kwargs={"camera_id": 112859})
 
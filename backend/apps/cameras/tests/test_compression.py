@@ -0,0 +1,126 @@
+import copy
+import gzip
+import json
+import pytest
+from unittest.mock import patch, Mock
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from apps.utils.compression import (
+    ENCODERS,
+    CompressionMiddleware,
+    negotiate_encoding,
+)
+
+
+@pytest.fixture
+def camera_list_upstream(valid_camera_list_data):
+    with patch("requests.Session.request") as mock_request:
+        mock_request.return_value = Mock(
+            status_code=200, json=lambda: copy.deepcopy(valid_camera_list_data)
+        )
+        yield mock_request
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip", "gzip"),
+        ("gzip;q=0.5, br;q=1.0", "br"),
+        ("gzip, br, zstd", "zstd"),
+        ("*", "zstd"),
+        ("identity", None),
+        ("gzip;q=0", None),
+        ("", None),
+    ],
+)
+def test_negotiate_encoding(header, expected):
+    with patch.dict(ENCODERS, {"gzip": object(), "br": object(), "zstd": object()}):
+        assert negotiate_encoding(header, ["zstd", "br", "gzip"]) == expected
+
+
+def test_uninstalled_codings_are_skipped():
+    with patch.dict(ENCODERS, clear=True):
+        ENCODERS["gzip"] = object()
+        assert negotiate_encoding("br, gzip;q=0.1", ["zstd", "br", "gzip"]) == "gzip"
+
+
+@pytest.mark.django_db
+def test_camera_list_is_gzipped(
+    camera_list_upstream, authenticated_client, valid_camera_list_data
+):
+    response = authenticated_client.get(
+        reverse("camera-list"), HTTP_ACCEPT_ENCODING="gzip"
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response["Vary"]
+    assert int(response["Content-Length"]) == len(response.content)
+    assert json.loads(gzip.decompress(response.content)) == valid_camera_list_data
+
+
+@pytest.mark.django_db
+def test_compressed_etag_is_weak_and_still_matches(
+    camera_list_upstream, authenticated_client
+):
+    url = reverse("camera-list")
+    etag = authenticated_client.get(url, HTTP_ACCEPT_ENCODING="gzip")["ETag"]
+
+    response = authenticated_client.get(
+        url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=etag
+    )
+
+    assert etag.startswith('W/"')
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("coding", ["br", "zstd"])
+def test_optional_codings(
+    camera_list_upstream, authenticated_client, valid_camera_list_data, coding
+):
+    if coding not in ENCODERS:
+        pytest.skip(f"{coding} support is not installed")
+    response = authenticated_client.get(
+        reverse("camera-list"), HTTP_ACCEPT_ENCODING=coding
+    )
+
+    assert response["Content-Encoding"] == coding
+    if coding == "br":
+        body = pytest.importorskip("brotli").decompress(response.content)
+    else:
+        zstandard = pytest.importorskip("zstandard")
+        body = zstandard.ZstdDecompressor().decompress(response.content)
+    assert json.loads(body) == valid_camera_list_data
+
+
+@pytest.mark.django_db
+def test_small_responses_are_not_compressed(camera_list_upstream, authenticated_client):
+    with override_settings(COMPRESSION_MIN_SIZE=10**6):
+        response = authenticated_client.get(
+            reverse("camera-list"), HTTP_ACCEPT_ENCODING="gzip"
+        )
+
+    assert not response.has_header("Content-Encoding")
+
+
+@pytest.mark.django_db
+def test_streamed_camera_list_is_compressed(
+    camera_list_upstream, authenticated_client, valid_camera_list_data
+):
+    response = authenticated_client.get(
+        reverse("camera-list"), {"stream": "true"}, HTTP_ACCEPT_ENCODING="gzip"
+    )
+
+    assert response["Content-Encoding"] == "gzip"
+    assert not response.has_header("Content-Length")
+    body = gzip.decompress(b"".join(response.streaming_content))
+    assert json.loads(body) == valid_camera_list_data
+
+
+def test_missing_codings_are_logged_at_startup(caplog):
+    with patch("apps.utils.compression.brotli", None):
+        CompressionMiddleware(lambda request: None)
+
+    assert "brotli not installed" in caplog.text
@@ -0,0 +1,88 @@
+import copy
+import pytest
+from unittest.mock import patch, Mock
+from django.urls import reverse
+from rest_framework import status
+from apps.cameras.services import (
+    CachedPayload,
+    cache_payload,
+    rendered_payload,
+    response_cache,
+)
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_camera_response_has_strong_etag(
+    mock_request, authenticated_client, valid_camera_data
+):
+    mock_request.return_value = Mock(
+        status_code=200, json=lambda: copy.deepcopy(valid_camera_data)
+    )
+
+    response = authenticated_client.get(reverse("camera", kwargs={"camera_id": 112859}))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response["ETag"].startswith('"') and not response["ETag"].startswith("W/")
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_matching_if_none_match_returns_304(
+    mock_request, authenticated_client, valid_camera_data
+):
+    mock_request.return_value = Mock(
+        status_code=200, json=lambda: copy.deepcopy(valid_camera_data)
+    )
+    url = reverse("camera", kwargs={"camera_id": 112859})
+    etag = authenticated_client.get(url)["ETag"]
+
+    with patch("apps.cameras.services.json.dumps") as mock_dumps:
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response["ETag"] == etag
+    assert response.content == b""
+    mock_dumps.assert_not_called()
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_stale_etag_returns_full_body(
+    mock_request, authenticated_client, valid_get_recording_info
+):
+    mock_request.return_value = Mock(
+        status_code=200, json=lambda: copy.deepcopy(valid_get_recording_info)
+    )
+    url = reverse("camera-recording-info", kwargs={"camera_id": "112859"})
+
+    response = authenticated_client.get(url, HTTP_IF_NONE_MATCH='"outdated"')
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == valid_get_recording_info
+    assert (
+        authenticated_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code
+        == status.HTTP_304_NOT_MODIFIED
+    )
+
+
+def test_etag_depends_on_content_only():
+    first_body, first_etag = rendered_payload({"id": 1, "status": "online"})
+    _, same_etag = rendered_payload({"id": 1, "status": "online"})
+    _, other_etag = rendered_payload({"id": 1, "status": "offline"})
+
+    assert first_body == b'{"id": 1, "status": "online"}'
+    assert first_etag == same_etag != other_etag
+
+
+def test_only_cached_payloads_keep_their_rendering():
+    one_shot = {"results": [1, 2, 3]}
+    rendered_payload(one_shot)
+    cached = cache_payload(("token", "/v1/shared-cameras/"), {"id": 1})
+
+    assert isinstance(
+        response_cache.get(("token", "/v1/shared-cameras/")), CachedPayload
+    )
+    assert rendered_payload(cached) is rendered_payload(cached)
+    assert cached.rendered == rendered_payload({"id": 1})
+    assert not hasattr(one_shot, "rendered")
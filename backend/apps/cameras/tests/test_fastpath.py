@@ -0,0 +1,66 @@
+import copy
+import pytest
+from apps.cameras.fastpath import FastPathMiss
+from apps.cameras.serializers import (
+    CameraListResponseSerializer,
+    CameraSerializer,
+    RecordingSerializer,
+    StreamSerializer,
+    TimelineSerializer,
+)
+from apps.cameras.services import FAST_VALIDATORS
+
+
+def serializer_output(serializer_class, payload):
+    serializer = serializer_class(data=copy.deepcopy(payload))
+    assert serializer.is_valid(), serializer.errors
+    return serializer.data
+
+
+@pytest.mark.parametrize(
+    "serializer_class, fixture",
+    [
+        (CameraListResponseSerializer, "valid_camera_list_data"),
+        (CameraSerializer, "valid_camera_data"),
+        (RecordingSerializer, "valid_get_recording_info"),
+        (StreamSerializer, "valid_recording_stream_data"),
+        (TimelineSerializer, "valid_timeline_data"),
+    ],
+)
+def test_fast_path_matches_serializer_output(serializer_class, fixture, request):
+    payload = request.getfixturevalue(fixture)
+
+    fast_output = FAST_VALIDATORS[serializer_class](copy.deepcopy(payload))
+
+    assert fast_output == serializer_output(serializer_class, payload)
+    assert list(fast_output) == list(serializer_output(serializer_class, payload))
+
+
+def test_fast_path_normalizes_like_serializer(valid_camera_data):
+    payload = copy.deepcopy(valid_camera_data)
+    payload["name"] = "  Street  "
+    payload["snapshot"]["created_at"] = "2024-08-11T11:29:30+02:00"
+    del payload["applications"]
+
+    fast_output = FAST_VALIDATORS[CameraSerializer](payload)
+
+    assert fast_output == serializer_output(CameraSerializer, payload)
+    assert "applications" not in fast_output
+
+
+@pytest.mark.parametrize(
+    "field, value",
+    [
+        ("id", "112859"),
+        ("has_recording", "true"),
+        ("live_snapshot", "not a url"),
+        ("name", ""),
+        ("owner", None),
+        ("streams", "INVALID"),
+    ],
+)
+def test_fast_path_defers_to_serializer(valid_camera_data, field, value):
+    payload = dict(copy.deepcopy(valid_camera_data), **{field: value})
+
+    with pytest.raises(FastPathMiss):
+        FAST_VALIDATORS[CameraSerializer](payload)
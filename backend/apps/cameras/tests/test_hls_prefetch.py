@@ -0,0 +1,123 @@
+import json
+import threading
+import time
+import pytest
+from unittest.mock import patch, Mock
+from django.urls import reverse
+from rest_framework import status
+from apps.cameras.prefetch import SegmentPrefetcher
+
+DOMAIN = "e1-eu2.angelcam.com"
+STREAM_ID = "770baf82-23fe-46cf-b4b5-6f1a5be00e4f"
+UPSTREAM = f"https://{DOMAIN}/recording/streams/{STREAM_ID}/hls/"
+PLAYLIST = "#EXTM3U\n" + "".join(
+    f"#EXTINF:4.0,\nsegment-{index}.ts\n" for index in range(12)
+)
+
+
+def hls_url(name):
+    return reverse(
+        "recording-hls", kwargs={"domain": DOMAIN, "stream_id": STREAM_ID, "name": name}
+    )
+
+
+def control_url(name):
+    return reverse(name, kwargs={"domain": DOMAIN, "stream_id": STREAM_ID})
+
+
+@pytest.fixture
+def prefetcher(segment_cache):
+    prefetcher = SegmentPrefetcher()
+    with patch("apps.cameras.views.prefetcher", prefetcher):
+        yield prefetcher
+
+
+@pytest.fixture
+def hls_upstream(segment_cache):
+    release = {}
+
+    def request(method, url, **kwargs):
+        if url.endswith(".m3u8"):
+            return Mock(status_code=200, text=PLAYLIST)
+        if url.endswith(("/play/", "/pause/")):
+            return Mock(status_code=204)
+        if url.endswith("/speed/"):
+            return Mock(status_code=200)
+
+        def chunks(size):
+            yield b"seg"
+            if url in release:
+                release[url].wait(2)
+            yield b"ment"
+
+        return Mock(status_code=200, iter_content=chunks)
+
+    with patch("requests.Session.request", side_effect=request) as mock_request:
+        yield mock_request, release
+
+
+def settled(prefetcher, count):
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        stats = prefetcher.stats()
+        if stats["fetched"] + stats["cancelled"] >= count:
+            return stats
+        time.sleep(0.01)
+    return prefetcher.stats()
+
+
+@pytest.mark.parametrize("speed, expected", [(0, 2), (1, 2), (3, 6), (16, 8)])
+def test_read_ahead_scales_with_speed(speed, expected):
+    assert SegmentPrefetcher.read_ahead(speed) == expected
+
+
+@pytest.mark.django_db
+def test_next_segments_are_prefetched(
+    hls_upstream, prefetcher, segment_cache, authenticated_client
+):
+    authenticated_client.get(hls_url("playlist.m3u8"))
+    response = authenticated_client.get(hls_url("segment-3.ts"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert settled(prefetcher, 2)["fetched"] == 2
+    assert UPSTREAM + "segment-4.ts" in segment_cache
+    assert UPSTREAM + "segment-5.ts" in segment_cache
+    assert UPSTREAM + "segment-6.ts" not in segment_cache
+
+
+@pytest.mark.django_db
+def test_read_ahead_follows_playback_speed(
+    hls_upstream, prefetcher, segment_cache, authenticated_client
+):
+    authenticated_client.get(hls_url("playlist.m3u8"))
+    response = authenticated_client.generic(
+        "GET",
+        control_url("speed-recording"),
+        json.dumps({"speed": 2}),
+        content_type="application/json",
+    )
+    assert response.status_code == status.HTTP_200_OK
+    authenticated_client.get(hls_url("segment-0.ts"))
+
+    assert settled(prefetcher, 4)["fetched"] == 4
+    assert UPSTREAM + "segment-4.ts" in segment_cache
+    assert UPSTREAM + "segment-5.ts" not in segment_cache
+
+
+@pytest.mark.django_db
+def test_pause_cancels_prefetch(
+    hls_upstream, prefetcher, segment_cache, authenticated_client
+):
+    _, release = hls_upstream
+    for index in (1, 2):
+        release[UPSTREAM + f"segment-{index}.ts"] = threading.Event()
+
+    authenticated_client.get(hls_url("playlist.m3u8"))
+    authenticated_client.get(hls_url("segment-0.ts"))
+    authenticated_client.get(control_url("pause-recording"))
+    for event in release.values():
+        event.set()
+
+    assert settled(prefetcher, 2)["cancelled"] == 2
+    assert UPSTREAM + "segment-1.ts" not in segment_cache
+    assert UPSTREAM + "segment-2.ts" not in segment_cache
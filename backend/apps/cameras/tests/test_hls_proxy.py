@@ -0,0 +1,167 @@
+import pytest
+from unittest.mock import patch, Mock
+from django.urls import reverse
+from rest_framework import status
+from apps.cameras.hls import (
+    playlist_segments,
+    proxy_hls_url,
+    rewrite_playlist,
+)
+
+DOMAIN = "e1-eu2.angelcam.com"
+STREAM_ID = "770baf82-23fe-46cf-b4b5-6f1a5be00e4f"
+UPSTREAM = f"https://{DOMAIN}/recording/streams/{STREAM_ID}/hls/"
+PLAYLIST = (
+    "#EXTM3U\n"
+    "#EXT-X-TARGETDURATION:4\n"
+    '#EXT-X-MAP:URI="init.mp4"\n'
+    "#EXTINF:4.0,\n"
+    "segment-1.ts\n"
+    "#EXTINF:4.0,\n"
+    "https://cdn.example.com/other.ts\n"
+    "#EXT-X-ENDLIST\n"
+)
+
+
+def hls_url(name):
+    return reverse(
+        "recording-hls", kwargs={"domain": DOMAIN, "stream_id": STREAM_ID, "name": name}
+    )
+
+
+@pytest.fixture
+def hls_upstream(segment_cache):
+    def request(method, url, **kwargs):
+        if url.endswith(".m3u8"):
+            return Mock(status_code=200, text=PLAYLIST)
+        if url.endswith("missing.ts"):
+            return Mock(status_code=404)
+        return Mock(status_code=200, iter_content=lambda size: iter([b"seg", b"ment"]))
+
+    with patch("requests.Session.request", side_effect=request) as mock_request:
+        yield mock_request
+
+
+def test_rewrite_playlist_points_uris_at_proxy():
+    rewritten = rewrite_playlist(
+        PLAYLIST, UPSTREAM + "playlist.m3u8", {"token": "jwt"}
+    ).splitlines()
+
+    assert rewritten[2] == f'#EXT-X-MAP:URI="{hls_url("init.mp4")}?token=jwt"'
+    assert rewritten[4] == f"{hls_url('segment-1.ts')}?token=jwt"
+    assert rewritten[6] == "https://cdn.example.com/other.ts"
+
+
+def test_proxy_url_rejects_other_domains():
+    assert proxy_hls_url(UPSTREAM + "playlist.m3u8") == hls_url("playlist.m3u8")
+    assert proxy_hls_url("https://example.com/recording/streams/1/hls/a.ts") is None
+
+
+@pytest.mark.django_db
+def test_playlist_is_rewritten_and_cached(hls_upstream, authenticated_client):
+    first = authenticated_client.get(hls_url("playlist.m3u8"))
+    second = authenticated_client.get(hls_url("playlist.m3u8"))
+
+    assert first.status_code == second.status_code == status.HTTP_200_OK
+    assert first["Content-Type"] == "application/vnd.apple.mpegurl"
+    assert hls_url("segment-1.ts") in first.content.decode()
+    assert hls_upstream.call_count == 1
+
+
+@pytest.mark.django_db
+def test_segment_is_served_from_disk_cache(
+    hls_upstream, segment_cache, authenticated_client
+):
+    first = authenticated_client.get(hls_url("segment-1.ts"))
+    second = authenticated_client.get(hls_url("segment-1.ts"))
+
+    assert first.status_code == second.status_code == status.HTTP_200_OK
+    assert b"".join(first.streaming_content) == b"segment"
+    assert b"".join(second.streaming_content) == b"segment"
+    assert first["Content-Type"] == "video/mp2t"
+    assert "immutable" in first["Cache-Control"]
+    assert hls_upstream.call_count == 1
+    assert segment_cache.stats()["hits"] == 2
+
+
+@pytest.mark.django_db
+def test_failed_segment_is_not_cached(hls_upstream, authenticated_client):
+    first = authenticated_client.get(hls_url("missing.ts"))
+    second = authenticated_client.get(hls_url("missing.ts"))
+
+    assert first.status_code == second.status_code == status.HTTP_404_NOT_FOUND
+    assert first.json() == {"detail": "Failed to retrieve segment"}
+    assert hls_upstream.call_count == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "domain, name",
+    [("example.com", "playlist.m3u8"), (DOMAIN, "secret.txt")],
+)
+def test_unsupported_requests_are_not_proxied(
+    hls_upstream, authenticated_client, domain, name
+):
+    url = reverse(
+        "recording-hls", kwargs={"domain": domain, "stream_id": STREAM_ID, "name": name}
+    )
+
+    response = authenticated_client.get(url)
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    hls_upstream.assert_not_called()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "domain, stream_id",
+    [
+        ("evil.example%23.angelcam.com", STREAM_ID),
+        ("evil.example%3F.angelcam.com", STREAM_ID),
+        ("evil.example%40e1-eu2.angelcam.com", STREAM_ID),
+        (DOMAIN, "s1%23"),
+    ],
+)
+def test_smuggled_hosts_are_not_proxied(
+    hls_upstream, authenticated_client, domain, stream_id
+):
+    response = authenticated_client.get(
+        f"/api/recording/{domain}/{stream_id}/hls/playlist.m3u8"
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json() == {"detail": "Not found."}
+    hls_upstream.assert_not_called()
+
+
+def test_playlist_segments_skip_other_hosts():
+    assert playlist_segments(PLAYLIST, UPSTREAM + "playlist.m3u8") == [
+        UPSTREAM + "segment-1.ts"
+    ]
+
+
+def test_segment_cache_evicts_least_recently_used(segment_cache):
+    for index in range(3):
+        segment_cache.store(f"segment-{index}", [b"x" * 500])
+
+    assert "segment-0" not in segment_cache
+    assert "segment-1" in segment_cache
+    assert "segment-2" in segment_cache
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_stream_view_returns_proxy_url(
+    mock_request, authenticated_client, valid_recording_stream_data
+):
+    mock_request.return_value = Mock(
+        status_code=200, json=lambda: valid_recording_stream_data
+    )
+    url = reverse("camera-recording-stream", kwargs={"camera_id": "112859"})
+
+    response = authenticated_client.get(
+        url, {"start": "2024-08-09T00:00:00Z", "proxy": "true"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["url"] == "http://testserver" + hls_url("playlist.m3u8")
@@ -0,0 +1,246 @@
+import asyncio
+import copy
+import queue
+import threading
+import time
+import pytest
+from unittest.mock import patch, Mock
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+from rest_framework import status
+from apps.cameras.mjpeg import (
+    async_relay_stream,
+    multipart_boundary,
+    parse_mjpeg,
+    relay_stream,
+    relays,
+)
+
+FRAMES = [b"\xff\xd8frame-one\xff\xd9", b"\xff\xd8frame-two\r\n--\xff\xd9"]
+
+
+def mjpeg_body(frames, content_length=True):
+    body = b""
+    for frame in frames:
+        headers = b"--myboundary\r\nContent-Type: image/jpeg\r\n"
+        if content_length:
+            headers += b"Content-Length: %d\r\n" % len(frame)
+        body += headers + b"\r\n" + frame + b"\r\n"
+    return body + b"--myboundary\r\n\r\n"
+
+
+def test_multipart_boundary():
+    assert multipart_boundary("multipart/x-mixed-replace;boundary=--abc") == "abc"
+    assert multipart_boundary('multipart/x-mixed-replace; boundary="abc"') == "abc"
+    assert multipart_boundary("image/jpeg") is None
+
+
+@pytest.mark.parametrize("content_length", [True, False])
+def test_parse_mjpeg_across_chunk_boundaries(content_length):
+    body = mjpeg_body(FRAMES, content_length)
+    chunks = [body[index : index + 3] for index in range(0, len(body), 3)]
+
+    assert list(parse_mjpeg(chunks, "myboundary")) == FRAMES
+
+
+def test_parse_mjpeg_rejects_oversized_parts():
+    with pytest.raises(ValueError):
+        list(parse_mjpeg([b"x" * 100], "myboundary", max_frame_bytes=10))
+
+
+class Upstream:
+    """
+    A fake streaming upstream response fed frame by frame from the test.
+    """
+
+    def __init__(self):
+        self.parts = queue.Queue()
+        self.closed = threading.Event()
+        self.response = Mock(
+            status_code=200,
+            headers={"Content-Type": "multipart/x-mixed-replace;boundary=myboundary"},
+        )
+        self.response.iter_content = lambda chunk_size: self._chunks()
+        self.response.close = self.closed.set
+
+    def _chunks(self):
+        while not self.closed.is_set():
+            try:
+                yield self.parts.get(timeout=0.05)
+            except queue.Empty:
+                continue
+
+    def send(self, frame):
+        self.parts.put(mjpeg_body([frame])[: -len(b"--myboundary\r\n\r\n")])
+
+
+def test_viewers_share_one_upstream_connection():
+    upstream = Upstream()
+    with patch(
+        "requests.Session.request", return_value=upstream.response
+    ) as mock_request:
+        first = relay_stream(1, "https://m3-eu8.angelcam.com/stream.mjpeg")
+        second = relay_stream(1, "https://m3-eu8.angelcam.com/stream.mjpeg")
+
+        upstream.send(FRAMES[0])
+        upstream.send(FRAMES[0])
+        upstream.send(FRAMES[0])
+        first_part = next(first)
+        upstream.send(FRAMES[1])
+        second_part = next(second)
+
+        assert FRAMES[0] in first_part
+        assert first_part.startswith(b"--frame\r\nContent-Type: image/jpeg\r\n")
+        assert FRAMES[0] in second_part or FRAMES[1] in second_part
+        assert mock_request.call_count == 1
+        assert len(relays) == 1
+
+        first.close()
+        assert not upstream.closed.is_set()
+        second.close()
+
+    assert upstream.closed.wait(1)
+    assert len(relays) == 0
+
+
+def test_async_viewer_gets_latest_frame():
+    upstream = Upstream()
+    frames = [b"frame-%d" % index for index in range(3)]
+
+    async def watch():
+        viewer = async_relay_stream(4, "https://m3-eu8.angelcam.com/stream.mjpeg")
+        asyncio.get_running_loop().call_later(0.05, upstream.send, b"initial")
+        parts = [await viewer.__anext__()]
+        for frame in frames:
+            upstream.send(frame)
+        await asyncio.to_thread(buffered_frames, 4, 4)
+        parts.append(await viewer.__anext__())
+        await viewer.aclose()
+        return parts
+
+    with patch("requests.Session.request", return_value=upstream.response):
+        initial, latest = async_to_sync(watch)()
+
+    assert b"initial" in initial
+    assert frames[-1] in latest
+    assert upstream.closed.wait(1)
+    assert len(relays) == 0
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_mjpeg_view_accepts_query_token(
+    mock_request, client, access_token, valid_camera_data
+):
+    camera = copy.deepcopy(valid_camera_data)
+    camera["streams"] = [s for s in camera["streams"] if s["format"] != "mjpeg"]
+    mock_request.return_value = Mock(status_code=200, json=lambda: camera)
+    url = reverse("camera-mjpeg", kwargs={"camera_id": 112859})
+
+    assert client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+    response = client.get(url, {"token": access_token})
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json() == {"detail": "Camera has no MJPEG stream."}
+
+
+@pytest.mark.django_db
+def test_mjpeg_view_streams_asynchronously_under_asgi(asgi_get, valid_camera_data):
+    upstream = Upstream()
+    mjpeg_url = next(
+        stream["url"]
+        for stream in valid_camera_data["streams"]
+        if stream["format"] == "mjpeg"
+    )
+
+    def request(method, url, **kwargs):
+        if url == mjpeg_url:
+            return upstream.response
+        return Mock(status_code=200, json=lambda: copy.deepcopy(valid_camera_data))
+
+    async def first_part(response):
+        parts = response.streaming_content
+        asyncio.get_running_loop().call_later(0.05, upstream.send, FRAMES[0])
+        part = await parts.__anext__()
+        await parts.aclose()
+        return part
+
+    with patch("requests.Session.request", side_effect=request):
+        response = asgi_get(
+            reverse("camera-mjpeg", kwargs={"camera_id": 112859}), {"max_fps": "5"}
+        )
+        try:
+            assert response.status_code == status.HTTP_200_OK
+            assert response.is_async
+            assert FRAMES[0] in async_to_sync(first_part)(response)
+        finally:
+            relay = relays.get(112859)
+            if relay is not None:
+                relay.close()
+
+
+@pytest.mark.django_db
+def test_query_token_is_ignored_by_other_views(client, access_token):
+    response = client.get(reverse("camera-list"), {"token": access_token})
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def buffered_frames(key, count):
+    deadline = time.monotonic() + 2
+    while relays.get(key).sequence < count and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+@pytest.mark.parametrize("latest_only, expected", [(True, 1), (False, 3)])
+def test_slow_viewer_gets_latest_frame(latest_only, expected):
+    upstream = Upstream()
+    frames = [b"frame-%d" % index for index in range(3)]
+    with patch("requests.Session.request", return_value=upstream.response):
+        viewer = relay_stream(
+            2, "https://m3-eu8.angelcam.com/stream.mjpeg", latest_only
+        )
+        first_send = threading.Timer(0.05, upstream.send, (b"initial",))
+        first_send.start()
+        assert b"initial" in next(viewer)
+
+        for frame in frames:
+            upstream.send(frame)
+        buffered_frames(2, 4)
+        parts = [next(viewer) for _ in range(expected)]
+        viewer.close()
+
+    assert upstream.closed.wait(1)
+    assert [frame for frame in frames if any(frame in part for part in parts)] == (
+        frames[-expected:]
+    )
+
+
+def test_max_fps_spaces_frames():
+    upstream = Upstream()
+    with patch("requests.Session.request", return_value=upstream.response):
+        with patch("apps.cameras.mjpeg.time.sleep") as mock_sleep:
+            viewer = relay_stream(
+                3, "https://m3-eu8.angelcam.com/stream.mjpeg", max_fps=2
+            )
+            threading.Timer(0.05, upstream.send, (b"first",)).start()
+            next(viewer)
+            upstream.send(b"second")
+            next(viewer)
+            viewer.close()
+
+    assert upstream.closed.wait(1)
+    (delay,), _ = mock_sleep.call_args
+    assert 0.4 < delay <= 0.5
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "params", [{"delivery": "everything"}, {"max_fps": "0"}, {"max_fps": "fast"}]
+)
+def test_invalid_delivery_params_are_rejected(authenticated_client, params):
+    response = authenticated_client.get(
+        reverse("camera-mjpeg", kwargs={"camera_id": 112859}), params
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -8,7 +8,7 @@ from apps.cameras.views import RecordingView
 
 
 @pytest.mark.django_db
-@patch("requests.get")
+@patch("requests.Session.request")
 def test_get_recording_info_success(
     mock_get, authenticated_client, valid_get_recording_info
 ):
@@ -32,7 +32,7 @@ def test_get_recording_info_success(
 
 
 @pytest.mark.django_db
-@patch("requests.get")
+@patch("requests.Session.request")
 def test_get_recording_info_failure(mock_get, authenticated_client):
     mock_response = Mock()
     mock_response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -48,7 +48,7 @@ def test_get_recording_info_failure(mock_get, authenticated_client):
 
 
 @pytest.mark.django_db
-@patch("requests.get")
+@patch("requests.Session.request")
 def test_get_recording_info_invalid_data(mock_get, authenticated_client):
     mock_recording_data = {"status": "INVALID", "unexpected_field": "value"}
 
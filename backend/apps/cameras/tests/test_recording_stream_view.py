@@ -7,7 +7,7 @@ from apps.cameras.views import StreamView
 
 
 @pytest.mark.django_db
-@patch("requests.get")
+@patch("requests.Session.request")
 def test_get_stream_success(
     mock_get, authenticated_client, valid_recording_stream_data
 ):
@@ -33,7 +33,7 @@ def test_get_stream_success(
 
 
 @pytest.mark.django_db
-@patch("requests.get")
+@patch("requests.Session.request")
 def test_get_stream_missing_param(mock_get, authenticated_client):
     url = reverse("camera-recording-stream", kwargs={"camera_id": "112859"})
 
@@ -44,7 +44,7 @@ def test_get_stream_missing_param(mock_get, authenticated_client):
 
 
 @pytest.mark.django_db
-@patch("requests.get")
+@patch("requests.Session.request")
 def test_get_stream_invalid_data(mock_get, authenticated_client):
     mock_stream_data = {
         "format": "INVALID",
@@ -75,7 +75,7 @@ def test_get_stream_invalid_data(mock_get, authenticated_client):
 
 
 @pytest.mark.django_db
-@patch("requests.get")
+@patch("requests.Session.request")
 def test_get_stream_failure(mock_get, authenticated_client):
     mock_response = Mock()
     mock_response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
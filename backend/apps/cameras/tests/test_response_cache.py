@@ -0,0 +1,82 @@
+import base64
+import json
+import pytest
+from unittest.mock import patch, Mock
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from apps.cameras.services import (
+    cache_key,
+    camera_path,
+    payload_ttl,
+    response_cache,
+    signed_url_timeout,
+)
+from apps.utils.cache import TTLCache
+
+
+def signed_url(timeout):
+    token = base64.b64encode(
+        json.dumps({"camera_id": "112859", "timeout": timeout}).encode()
+    ).decode()
+    return f"https://m3-eu8.angelcam.com/snapshot.jpg?token={token}%2Eabcdef"
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_camera_list_is_served_from_cache(
+    mock_request, authenticated_client, valid_camera_list_data
+):
+    mock_request.return_value = Mock(
+        status_code=200, json=lambda: valid_camera_list_data
+    )
+    url = reverse("camera-list")
+
+    first = authenticated_client.get(url)
+    second = authenticated_client.get(url)
+
+    assert first.status_code == second.status_code == status.HTTP_200_OK
+    assert first.json() == second.json()
+    assert mock_request.call_count == 1
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_failed_camera_fetch_is_not_cached(mock_request, authenticated_client):
+    mock_request.return_value = Mock(status_code=500)
+    url = reverse("camera", kwargs={"camera_id": 112859})
+
+    authenticated_client.get(url)
+    authenticated_client.get(url)
+
+    assert mock_request.call_count == 2
+
+
+def test_cache_keys_are_per_token():
+    assert cache_key("token-a", camera_path(1)) != cache_key("token-b", camera_path(1))
+    assert "token-a" not in cache_key("token-a", camera_path(1))[0]
+
+
+def test_signed_url_timeout_from_fixture(valid_camera_data):
+    assert signed_url_timeout(valid_camera_data["live_snapshot"]) == 120
+    assert signed_url_timeout(valid_camera_data["snapshot"]["url"]) is None
+
+
+@override_settings(SIGNED_URL_EXPIRY_MARGIN=15)
+def test_payload_ttl_is_capped_by_shortest_signed_url():
+    data = {"live_snapshot": signed_url(3600), "streams": [{"url": signed_url(20)}]}
+
+    assert payload_ttl(data) == 5
+    assert payload_ttl({"name": "Street"}) == response_cache.ttl
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,170 @@
+import copy
+import io
+import pytest
+from unittest.mock import patch, Mock
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from apps.cameras.snapshots import SnapshotCache, thumbnail_width
+
+
+def jpeg(width, height):
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), (40, 120, 200)).save(output, "JPEG")
+    return output.getvalue()
+
+
+@pytest.fixture
+def snapshot_upstream(valid_camera_data):
+    image = jpeg(1280, 720)
+
+    def request(method, url, **kwargs):
+        if url == valid_camera_data["snapshot"]["url"]:
+            return Mock(status_code=200, content=image)
+        return Mock(status_code=200, json=lambda: copy.deepcopy(valid_camera_data))
+
+    with patch("requests.Session.request", side_effect=request) as mock_request:
+        yield mock_request, image
+
+
+def snapshot_calls(mock_request, valid_camera_data):
+    return [
+        call
+        for call in mock_request.call_args_list
+        if call.args[1] == valid_camera_data["snapshot"]["url"]
+    ]
+
+
+@pytest.mark.django_db
+def test_snapshot_is_fetched_once(
+    snapshot_upstream, authenticated_client, valid_camera_data
+):
+    mock_request, image = snapshot_upstream
+    url = reverse("camera-snapshot", kwargs={"camera_id": 112859})
+
+    first = authenticated_client.get(url)
+    second = authenticated_client.get(url)
+
+    assert first.status_code == second.status_code == status.HTTP_200_OK
+    assert first["Content-Type"] == "image/jpeg"
+    assert first.content == second.content == image
+    assert len(snapshot_calls(mock_request, valid_camera_data)) == 1
+
+
+@pytest.mark.django_db
+def test_thumbnail_is_downscaled_to_width_bucket(
+    snapshot_upstream, authenticated_client, valid_camera_data
+):
+    mock_request, _ = snapshot_upstream
+    url = reverse("camera-snapshot", kwargs={"camera_id": 112859})
+
+    small = authenticated_client.get(url, {"width": 300})
+    medium = authenticated_client.get(url, {"width": 640})
+
+    assert Image.open(io.BytesIO(small.content)).size == (320, 180)
+    assert Image.open(io.BytesIO(medium.content)).size == (640, 360)
+    assert len(snapshot_calls(mock_request, valid_camera_data)) == 1
+
+
+@pytest.mark.django_db
+def test_snapshot_etag_returns_304(snapshot_upstream, authenticated_client):
+    url = reverse("camera-snapshot", kwargs={"camera_id": 112859})
+    response = authenticated_client.get(url)
+
+    assert "private" in response["Cache-Control"]
+    assert (
+        authenticated_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code
+        == status.HTTP_304_NOT_MODIFIED
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("width", ["0", "-5", "wide"])
+def test_invalid_width_is_rejected(authenticated_client, width):
+    response = authenticated_client.get(
+        reverse("camera-snapshot", kwargs={"camera_id": 112859}), {"width": width}
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_failed_snapshot_fetch_returns_502(
+    mock_request, authenticated_client, valid_camera_data
+):
+    mock_request.side_effect = lambda method, url, **kwargs: (
+        Mock(status_code=404)
+        if url == valid_camera_data["snapshot"]["url"]
+        else Mock(status_code=200, json=lambda: copy.deepcopy(valid_camera_data))
+    )
+
+    response = authenticated_client.get(
+        reverse("camera-snapshot", kwargs={"camera_id": 112859})
+    )
+
+    assert response.status_code == status.HTTP_502_BAD_GATEWAY
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_corrupt_snapshot_is_served_unchanged(
+    mock_request, authenticated_client, valid_camera_data
+):
+    corrupt = b"\xff\xd8 not really a jpeg"
+    mock_request.side_effect = lambda method, url, **kwargs: (
+        Mock(status_code=200, content=corrupt)
+        if url == valid_camera_data["snapshot"]["url"]
+        else Mock(status_code=200, json=lambda: copy.deepcopy(valid_camera_data))
+    )
+
+    response = authenticated_client.get(
+        reverse("camera-snapshot", kwargs={"camera_id": 112859}), {"width": 320}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.content == corrupt
+
+
+def test_thumbnail_width_buckets():
+    assert thumbnail_width(1) == 160
+    assert thumbnail_width(161) == 320
+    assert thumbnail_width(641) is None
+
+
+def test_memory_tier_is_size_bounded():
+    cache = SnapshotCache(max_memory_bytes=10)
+    cache.set("a", b"12345")
+    cache.set("b", b"12345")
+    cache.get("a")
+    cache.set("c", b"12345")
+
+    assert cache.get("a") == b"12345"
+    assert cache.get("b") is None
+    assert cache.stats()["memory_bytes"] == 10
+
+
+def test_disk_tier_survives_memory_eviction(tmp_path):
+    cache = SnapshotCache(max_memory_bytes=5, directory=tmp_path, max_disk_bytes=10)
+    cache.set("a", b"12345")
+    cache.set("b", b"67890")
+
+    assert cache.get("a") == b"12345"
+    assert cache.stats()["disk_hits"] == 1
+
+    cache.set("c", b"abcde")
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_files_removed_by_a_concurrent_trim_are_tolerated(tmp_path):
+    cache = SnapshotCache(max_memory_bytes=0, directory=tmp_path, max_disk_bytes=10)
+    cache.set("a", b"12345")
+
+    with patch("apps.cameras.snapshots.os.utime", side_effect=FileNotFoundError):
+        assert cache.get("a") == b"12345"
+
+    vanished = Mock(path=str(tmp_path / "gone.img"))
+    vanished.name = "gone.img"
+    vanished.stat.side_effect = FileNotFoundError
+    with patch("apps.cameras.snapshots.os.scandir", return_value=[vanished]):
+        cache.set("b", b"67890")
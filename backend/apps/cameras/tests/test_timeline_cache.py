@@ -0,0 +1,97 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import patch, Mock
+from django.urls import reverse
+from rest_framework import status
+from apps.cameras.timeline import merge_intervals, subtract_intervals
+
+NOW = datetime(2024, 8, 11, 12, 0, tzinfo=timezone.utc)
+
+
+def timeline_url(start, end):
+    return (
+        reverse("camera-recording-timeline", kwargs={"camera_id": "112859"})
+        + f"?start={start}&end={end}"
+    )
+
+
+def upstream_timeline(start, end, segments):
+    return Mock(
+        status_code=200,
+        json=lambda: {
+            "start": start,
+            "end": end,
+            "segments": [{"start": s, "end": e} for s, e in segments],
+        },
+    )
+
+
+@pytest.mark.django_db
+@patch("apps.cameras.timeline.timezone.now", return_value=NOW)
+@patch("requests.Session.request")
+def test_overlapping_window_only_fetches_missing_range(
+    mock_request, mock_now, authenticated_client
+):
+    mock_request.side_effect = [
+        upstream_timeline(
+            "2024-08-10T00:00:00Z",
+            "2024-08-10T12:00:00Z",
+            [("2024-08-10T01:00:00Z", "2024-08-10T02:00:00Z")],
+        ),
+        upstream_timeline(
+            "2024-08-10T12:00:00Z",
+            "2024-08-10T14:00:00Z",
+            [("2024-08-10T13:00:00Z", "2024-08-10T13:30:00Z")],
+        ),
+    ]
+
+    authenticated_client.get(
+        timeline_url("2024-08-10T00:00:00Z", "2024-08-10T12:00:00Z")
+    )
+    response = authenticated_client.get(
+        timeline_url("2024-08-10T01:30:00Z", "2024-08-10T14:00:00Z")
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "start": "2024-08-10T01:30:00Z",
+        "end": "2024-08-10T14:00:00Z",
+        "segments": [
+            {"start": "2024-08-10T01:30:00Z", "end": "2024-08-10T02:00:00Z"},
+            {"start": "2024-08-10T13:00:00Z", "end": "2024-08-10T13:30:00Z"},
+        ],
+    }
+    assert mock_request.call_count == 2
+    _, kwargs = mock_request.call_args
+    assert kwargs["params"]["start"].startswith("2024-08-10T12:00:00")
+
+
+@pytest.mark.django_db
+@patch("apps.cameras.timeline.timezone.now", return_value=NOW)
+@patch("requests.Session.request")
+def test_still_recording_tail_is_refetched(
+    mock_request, mock_now, authenticated_client
+):
+    mock_request.return_value = upstream_timeline(
+        "2024-08-11T10:00:00Z",
+        "2024-08-11T11:59:00Z",
+        [
+            ("2024-08-11T10:00:00Z", "2024-08-11T10:30:00Z"),
+            ("2024-08-11T11:00:00Z", "2024-08-11T11:59:00Z"),
+        ],
+    )
+    url = timeline_url("2024-08-11T10:00:00Z", "2024-08-11T12:00:00Z")
+
+    first = authenticated_client.get(url)
+    second = authenticated_client.get(url)
+
+    assert first.json() == second.json()
+    assert mock_request.call_count == 2
+    _, kwargs = mock_request.call_args
+    assert kwargs["params"]["start"].startswith("2024-08-11T11:00:00")
+
+
+def test_interval_helpers():
+    assert merge_intervals([(5, 7), (1, 3), (3, 4), (6, 9)]) == [(1, 4), (5, 9)]
+    assert subtract_intervals(0, 10, [(2, 4), (6, 8)]) == [(0, 2), (4, 6), (8, 10)]
+    assert subtract_intervals(3, 7, [(0, 10)]) == []
@@ -0,0 +1,114 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch, Mock
+from django.urls import reverse
+from rest_framework import status
+from apps.cameras.timeline import downsample
+
+START = datetime(2024, 8, 9, tzinfo=timezone.utc)
+
+
+def minutes(value):
+    return START + timedelta(minutes=value)
+
+
+def fragmented_timeline(count):
+    return {
+        "start": START,
+        "end": minutes(count * 10),
+        "segments": [
+            {"start": minutes(index * 10), "end": minutes(index * 10 + 9)}
+            for index in range(count)
+        ],
+    }
+
+
+def test_gaps_below_resolution_are_filled():
+    timeline = downsample(fragmented_timeline(6), resolution=120)
+
+    assert timeline["segments"] == [{"start": minutes(0), "end": minutes(59)}]
+
+
+def test_resolution_is_capped_at_timeline_length():
+    timeline = downsample(fragmented_timeline(6), resolution=1e300)
+
+    assert timeline["segments"] == [{"start": minutes(0), "end": minutes(59)}]
+
+
+def test_buckets_cap_number_of_intervals():
+    timeline = fragmented_timeline(144)
+    timeline["segments"][50]["start"] = minutes(505)
+
+    downsampled = downsample(timeline, buckets=10)
+
+    assert len(downsampled["segments"]) <= 10
+    assert downsampled["segments"][0]["start"] == minutes(0)
+    assert downsampled["segments"][-1]["end"] == minutes(1439)
+
+
+def test_without_parameters_timeline_is_unchanged():
+    timeline = fragmented_timeline(3)
+
+    assert downsample(timeline) is timeline
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_timeline_view_downsamples_with_buckets(
+    mock_request, authenticated_client, valid_timeline_data
+):
+    mock_request.return_value = Mock(status_code=200, json=lambda: valid_timeline_data)
+    url = (
+        reverse("camera-recording-timeline", kwargs={"camera_id": "112859"})
+        + "?start=2024-08-09T00:00:00Z&end=2024-08-09T23:59:59Z&buckets=1"
+    )
+
+    response = authenticated_client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["segments"] == [
+        {"start": "2024-08-09T01:09:12Z", "end": "2024-08-09T01:39:38Z"}
+    ]
+
+
+@pytest.mark.django_db
+def test_timeline_view_rejects_invalid_buckets(authenticated_client):
+    url = (
+        reverse("camera-recording-timeline", kwargs={"camera_id": "112859"})
+        + "?start=2024-08-09T00:00:00Z&end=2024-08-09T23:59:59Z&buckets=abc"
+    )
+
+    response = authenticated_client.get(url)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("resolution", ["nan", "inf", "-inf"])
+@pytest.mark.parametrize("view", ["camera-recording-timeline", "camera-page"])
+def test_views_reject_non_finite_resolution(authenticated_client, view, resolution):
+    url = (
+        reverse(view, kwargs={"camera_id": "112859"})
+        + "?start=2024-08-09T00:00:00Z&end=2024-08-09T23:59:59Z"
+    )
+
+    response = authenticated_client.get(url, {"resolution": resolution})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_timeline_view_accepts_huge_resolution(
+    mock_request, authenticated_client, valid_timeline_data
+):
+    mock_request.return_value = Mock(status_code=200, json=lambda: valid_timeline_data)
+    url = (
+        reverse("camera-recording-timeline", kwargs={"camera_id": "112859"})
+        + "?start=2024-08-09T00:00:00Z&end=2024-08-09T23:59:59Z&resolution=1e300"
+    )
+
+    response = authenticated_client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()["segments"]) == 1
@@ -0,0 +1,99 @@
+import struct
+import pytest
+from unittest.mock import patch, Mock
+from django.urls import reverse
+from rest_framework import status
+from apps.cameras.serializers import TimelineSerializer
+from apps.cameras.timeline import parse_upstream_timeline
+
+WINDOW = "?start=2024-08-09T00:00:00Z&end=2024-08-09T23:59:59Z"
+EXPECTED_VALUES = [
+    1723165752,
+    1723198177,
+    1723165752,
+    1723165778,
+    1723167458,
+    1723167578,
+]
+
+
+def timeline_url(query=""):
+    return (
+        reverse("camera-recording-timeline", kwargs={"camera_id": "112859"})
+        + WINDOW
+        + query
+    )
+
+
+def test_fast_path_matches_serializer(valid_timeline_data):
+    serializer = TimelineSerializer(data=valid_timeline_data)
+    serializer.is_valid()
+
+    assert parse_upstream_timeline(valid_timeline_data) == serializer.validated_data
+
+
+def test_fast_path_rejects_malformed_payload():
+    assert parse_upstream_timeline({"start": "INVALID", "end": "INVALID"}) is None
+    assert (
+        parse_upstream_timeline(
+            {"start": "2024-08-09", "end": "2024-08-09", "segments": []}
+        )
+        is None
+    )
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_compact_format(mock_request, authenticated_client, valid_timeline_data):
+    mock_request.return_value = Mock(status_code=200, json=lambda: valid_timeline_data)
+
+    response = authenticated_client.get(timeline_url("&format=compact"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "start": EXPECTED_VALUES[0],
+        "end": EXPECTED_VALUES[1],
+        "segments": EXPECTED_VALUES[2:],
+    }
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_binary_format_negotiated_by_accept_header(
+    mock_request, authenticated_client, valid_timeline_data
+):
+    mock_request.return_value = Mock(status_code=200, json=lambda: valid_timeline_data)
+
+    response = authenticated_client.get(
+        timeline_url(), HTTP_ACCEPT="application/octet-stream"
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"] == "application/octet-stream"
+    assert list(struct.unpack("<6q", response.content)) == EXPECTED_VALUES
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "accept",
+    [
+        "application/json",
+        "application/vnd.angelcam.timeline+json",
+        "application/octet-stream",
+    ],
+)
+@patch("requests.Session.request")
+def test_every_format_varies_on_accept_and_has_etag(
+    mock_request, authenticated_client, valid_timeline_data, accept
+):
+    mock_request.return_value = Mock(status_code=200, json=lambda: valid_timeline_data)
+
+    response = authenticated_client.get(timeline_url(), HTTP_ACCEPT=accept)
+    revalidated = authenticated_client.get(
+        timeline_url(), HTTP_ACCEPT=accept, HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "Accept" in response["Vary"]
+    assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+    assert "Accept" in revalidated["Vary"]
@@ -8,7 +8,7 @@ from apps.cameras.views import CamerasRecordingTimeLineView
 
 
 @pytest.mark.django_db
-@patch("requests.get")
+@patch("requests.Session.request")
 def test_get_recording_timeline_success(
     mock_get, authenticated_client, valid_timeline_data
 ):
@@ -34,7 +34,7 @@ def test_get_recording_timeline_success(
 
 
 @pytest.mark.django_db
-@patch("requests.get")
+@patch("requests.Session.request")
 def test_get_recording_timeline_missing_params(mock_get, authenticated_client):
     url = reverse("camera-recording-timeline", kwargs={"camera_id": "112859"})
 
@@ -45,7 +45,7 @@ def test_get_recording_timeline_missing_params(mock_get, authenticated_client):
 
 
 @pytest.mark.django_db
-@patch("requests.get")
+@patch("requests.Session.request")
 def test_get_recording_timeline_invalid_data(mock_get, authenticated_client):
     mock_timeline_data = {"start": "INVALID", "end": "INVALID", "segments": "INVALID"}
 
@@ -70,7 +70,7 @@ def test_get_recording_timeline_invalid_data(mock_get, authenticated_client):
 
 
 @pytest.mark.django_db
-@patch("requests.get")
+@patch("requests.Session.request")
 def test_get_recording_timeline_failure(mock_get, authenticated_client):
     mock_response = Mock()
     mock_response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -0,0 +1,114 @@
+import threading
+import time
+from unittest.mock import patch, Mock
+
+from django.test import override_settings
+
+from apps.utils.upstream import UpstreamClient
+
+
+@patch("requests.Session.request")
+def test_requests_to_same_host_reuse_pool(mock_request):
+    mock_request.return_value = Mock(status_code=200)
+    upstream = UpstreamClient(pool_maxsize=2, pool_idle_timeout=60)
+
+    upstream.get("https://api.angelcam.com/v1/me/", personal_access_token="token")
+    upstream.get("https://api.angelcam.com/v1/shared-cameras/")
+    upstream.post("https://e1-eu2.angelcam.com/recording/streams/abc/play/")
+
+    stats = upstream.stats()
+    assert stats["misses"] == 2
+    assert stats["hits"] == 1
+    assert stats["hosts"] == [
+        "https://api.angelcam.com",
+        "https://e1-eu2.angelcam.com",
+    ]
+    _, kwargs = mock_request.call_args_list[0]
+    assert kwargs["headers"] == {"Authorization": "PersonalAccessToken token"}
+
+
+@patch("requests.Session.request")
+def test_idle_pools_are_evicted(mock_request):
+    mock_request.return_value = Mock(status_code=200)
+    upstream = UpstreamClient(pool_maxsize=2, pool_idle_timeout=30)
+
+    with patch("apps.utils.upstream.time.monotonic", return_value=0):
+        upstream.get("https://e1-eu2.angelcam.com/recording/streams/abc/")
+    with patch("apps.utils.upstream.time.monotonic", return_value=100):
+        upstream.get("https://api.angelcam.com/v1/me/")
+
+    stats = upstream.stats()
+    assert stats["evictions"] == 1
+    assert stats["hosts"] == ["https://api.angelcam.com"]
+
+
+def concurrent_gets(upstream, calls):
+    release = threading.Event()
+    sent = []
+
+    def slow_request(method, url, **kwargs):
+        sent.append((method, url))
+        release.wait(5)
+        return Mock(status_code=200, content=b"{}")
+
+    responses = []
+    with patch("requests.Session.request", side_effect=slow_request):
+        threads = [
+            threading.Thread(
+                target=lambda call=call: responses.append(
+                    upstream.get(*call[0], **call[1])
+                )
+            )
+            for call in calls
+        ]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while (
+            len(sent) + upstream.stats()["collapsed"] < len(calls)
+            and time.monotonic() < deadline
+        ):
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+    return sent, responses
+
+
+def test_identical_concurrent_gets_share_one_request():
+    upstream = UpstreamClient()
+    call = (
+        ("https://api.angelcam.com/v1/shared-cameras/1/recording/stream/",),
+        {"personal_access_token": "token", "params": {"start": "a", "speed": 1}},
+    )
+
+    sent, responses = concurrent_gets(upstream, [call] * 5)
+
+    assert len(sent) == 1
+    assert upstream.stats()["collapsed"] == 4
+    assert all(response is responses[0] for response in responses)
+
+
+def test_gets_differing_in_token_or_params_are_not_shared():
+    upstream = UpstreamClient()
+    url = "https://api.angelcam.com/v1/shared-cameras/1/recording/stream/"
+    calls = [
+        ((url,), {"personal_access_token": "a", "params": {"start": "x"}}),
+        ((url,), {"personal_access_token": "b", "params": {"start": "x"}}),
+        ((url,), {"personal_access_token": "a", "params": {"start": "y"}}),
+    ]
+
+    sent, _ = concurrent_gets(upstream, calls)
+
+    assert len(sent) == 3
+    assert upstream.stats()["collapsed"] == 0
+
+
+@override_settings(UPSTREAM_COALESCE_GETS=False)
+def test_coalescing_can_be_disabled():
+    upstream = UpstreamClient()
+    call = (("https://api.angelcam.com/v1/shared-cameras/",), {})
+
+    sent, _ = concurrent_gets(upstream, [call] * 3)
+
+    assert len(sent) == 3
@@ -0,0 +1,221 @@
+import asyncio
+import collections
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import requests
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from apps.utils.resilience import (
+    UpstreamTimeout,
+    UpstreamUnavailable,
+    breakers,
+)
+from apps.utils.upstream import AsyncUpstreamClient, UpstreamClient
+from core.settings import ANGEL_CAM_BASE_URL
+
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    """
+    /ok answers 200, /slow after 0.3 seconds, /down always 503 and /flaky 503
+    for the first `server.flaky_failures` requests.
+    """
+
+    def respond(self):
+        hits = self.server.hits
+        hits[self.path] += 1
+        status_code = 200
+        if self.path == "/slow":
+            time.sleep(0.3)
+        elif self.path == "/down":
+            status_code = 503
+        elif self.path == "/flaky" and hits[self.path] <= self.server.flaky_failures:
+            status_code = 503
+        body = b'{"ok": true}'
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = respond
+    do_POST = respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fake_upstream():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeUpstreamHandler)
+    server.daemon_threads = True
+    server.hits = collections.Counter()
+    server.flaky_failures = 2
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@override_settings(UPSTREAM_READ_TIMEOUT=0.1, UPSTREAM_MAX_RETRIES=0)
+def test_read_timeout_raises_upstream_timeout(fake_upstream):
+    _, base_url = fake_upstream
+    started = time.monotonic()
+
+    with pytest.raises(UpstreamTimeout):
+        UpstreamClient().get(f"{base_url}/slow")
+
+    assert time.monotonic() - started < 0.3
+
+
+@override_settings(
+    UPSTREAM_READ_TIMEOUT=0.1, UPSTREAM_ENDPOINT_TIMEOUTS={"/slow": (1, 2)}
+)
+def test_endpoint_timeout_overrides_default(fake_upstream):
+    _, base_url = fake_upstream
+
+    response = UpstreamClient().get(f"{base_url}/slow")
+
+    assert response.status_code == 200
+
+
+@override_settings(UPSTREAM_MAX_RETRIES=2, UPSTREAM_RETRY_BACKOFF=0.001)
+def test_unavailable_get_is_retried(fake_upstream):
+    server, base_url = fake_upstream
+
+    response = UpstreamClient().get(f"{base_url}/flaky")
+
+    assert response.status_code == 200
+    assert server.hits["/flaky"] == 3
+
+
+@override_settings(UPSTREAM_MAX_RETRIES=2, UPSTREAM_RETRY_BACKOFF=0.001)
+def test_post_is_not_retried(fake_upstream):
+    server, base_url = fake_upstream
+
+    response = UpstreamClient().post(f"{base_url}/flaky")
+
+    assert response.status_code == 503
+    assert server.hits["/flaky"] == 1
+
+
+@override_settings(
+    UPSTREAM_MAX_RETRIES=2,
+    UPSTREAM_RETRY_BACKOFF=0.001,
+    UPSTREAM_RETRY_BUDGET_MIN=2,
+    UPSTREAM_RETRY_BUDGET_RATIO=0,
+    UPSTREAM_BREAKER_FAILURES=100,
+)
+def test_retry_budget_limits_retries(fake_upstream):
+    server, base_url = fake_upstream
+    upstream = UpstreamClient()
+
+    assert upstream.get(f"{base_url}/down").status_code == 503
+    assert server.hits["/down"] == 3
+    assert upstream.get(f"{base_url}/down").status_code == 503
+    assert server.hits["/down"] == 4
+
+
+@override_settings(
+    UPSTREAM_MAX_RETRIES=0,
+    UPSTREAM_BREAKER_FAILURES=3,
+    UPSTREAM_BREAKER_RESET_TIMEOUT=0.2,
+)
+def test_circuit_breaker_fails_fast_and_recovers(fake_upstream):
+    server, base_url = fake_upstream
+    upstream = UpstreamClient()
+
+    for _ in range(3):
+        assert upstream.get(f"{base_url}/down").status_code == 503
+    with pytest.raises(UpstreamUnavailable):
+        upstream.get(f"{base_url}/ok")
+    assert server.hits["/ok"] == 0
+
+    time.sleep(0.25)
+    assert upstream.get(f"{base_url}/ok").status_code == 200
+    assert breakers.states()[base_url] == "closed"
+
+
+@override_settings(
+    UPSTREAM_MAX_RETRIES=0,
+    UPSTREAM_BREAKER_FAILURES=1,
+    UPSTREAM_BREAKER_RESET_TIMEOUT=0.2,
+)
+def test_unexpected_error_in_trial_reopens_breaker(fake_upstream):
+    _, base_url = fake_upstream
+    upstream = UpstreamClient()
+    assert upstream.get(f"{base_url}/down").status_code == 503
+    time.sleep(0.25)
+
+    with patch(
+        "requests.Session.request",
+        side_effect=requests.exceptions.ChunkedEncodingError,
+    ):
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            upstream.get(f"{base_url}/ok")
+    assert breakers.states()[base_url] == "open"
+
+    time.sleep(0.25)
+    assert upstream.get(f"{base_url}/ok").status_code == 200
+    assert breakers.states()[base_url] == "closed"
+
+
+@override_settings(
+    UPSTREAM_MAX_RETRIES=0,
+    UPSTREAM_BREAKER_FAILURES=1,
+    UPSTREAM_BREAKER_RESET_TIMEOUT=0.2,
+)
+def test_cancelled_trial_releases_breaker(fake_upstream):
+    _, base_url = fake_upstream
+    upstream = AsyncUpstreamClient()
+    assert UpstreamClient().get(f"{base_url}/down").status_code == 503
+    time.sleep(0.25)
+
+    async def cancelled_trial():
+        with patch("httpx.AsyncClient.request", side_effect=asyncio.CancelledError):
+            with pytest.raises(asyncio.CancelledError):
+                await upstream.get(f"{base_url}/ok")
+        assert breakers.states()[base_url] == "open"
+        # The next call becomes the trial without waiting for another timeout.
+        response = await upstream.get(f"{base_url}/ok")
+        await upstream._client().aclose()
+        return response
+
+    assert async_to_sync(cancelled_trial)().status_code == 200
+    assert breakers.states()[base_url] == "closed"
+
+
+@override_settings(UPSTREAM_BREAKER_MAX_HOSTS=3)
+def test_breaker_registry_is_bounded():
+    failing = breakers.for_url("https://down.example.org/")
+    failing.record(False)
+    for index in range(200):
+        breakers.for_url(f"https://h{index}.example.org/")
+
+    states = breakers.states()
+    assert len(states) == 3
+    assert states["https://down.example.org"] == "closed"
+    assert breakers.for_url("https://down.example.org/") is failing
+
+
+@pytest.mark.django_db
+@patch("requests.Session.request")
+def test_open_breaker_returns_503(mock_request, authenticated_client):
+    breaker = breakers.for_url(ANGEL_CAM_BASE_URL)
+    for _ in range(5):
+        breaker.record(False)
+
+    response = authenticated_client.get(reverse("camera-list"))
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json() == {"detail": "Upstream service unavailable"}
+    assert int(response["Retry-After"]) > 0
+    mock_request.assert_not_called()
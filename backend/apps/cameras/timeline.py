@@ -0,0 +1,276 @@
+import struct
+import threading
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.utils.cache import TTLCache, token_digest
+from .fastpath import fast_timestamp
+
+timeline_cache = TTLCache(
+    maxsize=getattr(settings, "TIMELINE_CACHE_MAXSIZE", 512),
+    ttl=getattr(settings, "TIMELINE_CACHE_TTL", 3600),
+)
+
+
+def parse_timestamp(value):
+    """
+    Parse an ISO-8601 timestamp into an aware UTC datetime, or return None.
+    """
+    try:
+        parsed = parse_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed is None:
+        return None
+    if timezone.is_naive(parsed):
+        return parsed.replace(tzinfo=dt_timezone.utc)
+    return parsed.astimezone(dt_timezone.utc)
+
+
+def parse_upstream_timeline(payload):
+    """
+    Fast path for upstream timeline payloads.
+
+    Returns the same structure as `TimelineSerializer.validated_data`, or None when
+    the payload does not have the expected shape; callers then fall back to the
+    serializer so that validation errors are reported exactly as before.
+    """
+    try:
+        return {
+            "start": fast_timestamp(payload["start"]),
+            "end": fast_timestamp(payload["end"]),
+            "segments": [
+                {
+                    "start": fast_timestamp(segment["start"]),
+                    "end": fast_timestamp(segment["end"]),
+                }
+                for segment in payload["segments"]
+            ],
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def compact_values(timeline):
+    """
+    Flatten a timeline to epoch seconds: ``[start, end, start0, end0, start1, end1, ...]``.
+    """
+    values = [int(timeline["start"].timestamp()), int(timeline["end"].timestamp())]
+    for segment in timeline["segments"]:
+        values.append(int(segment["start"].timestamp()))
+        values.append(int(segment["end"].timestamp()))
+    return values
+
+
+def pack_compact_values(values):
+    """
+    Encode compact timeline values as little-endian signed 64-bit integers.
+    """
+    return struct.pack(f"<{len(values)}q", *values)
+
+
+def merge_intervals(intervals):
+    """
+    Merge overlapping or touching (start, end) intervals into a sorted list.
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(start, end, covered):
+    """
+    Return the parts of [start, end] that are not covered by the sorted `covered` intervals.
+    """
+    missing = []
+    cursor = start
+    for covered_start, covered_end in covered:
+        if covered_end <= cursor:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > cursor:
+            missing.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+class CameraTimeline:
+    """
+    Known recording segments of one camera, together with the time ranges for
+    which the segment list is known to be complete.
+
+    Everything newer than the mutable window (``TIMELINE_MUTABLE_WINDOW``) is
+    treated as still recording: it is returned to the caller but never marked as
+    covered, so the tail of the timeline is always re-fetched from upstream.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.covered = []
+        self.segments = []
+        self.first_available = None
+        self.last_available = None
+        self.latest_fetched_end = None
+
+    def missing(self, start, end, max_ranges):
+        """
+        Return the sub-ranges of [start, end] that must be fetched from upstream.
+        Fragmented coverage is collapsed into a single range once it would take
+        more than `max_ranges` upstream calls.
+        """
+        missing = subtract_intervals(start, end, self.covered)
+        if len(missing) > max_ranges:
+            return [(missing[0][0], missing[-1][1])]
+        return missing
+
+    def add(self, start, end, timeline, stable_until):
+        """
+        Merge a validated upstream timeline fetched for [start, end].
+        """
+        segments = [
+            (segment["start"], segment["end"]) for segment in timeline["segments"]
+        ]
+        covered_end = min(end, stable_until)
+        for segment_start, segment_end in segments:
+            if segment_end > stable_until:
+                covered_end = min(covered_end, segment_start)
+
+        # Upstream clips the reported window to the available recording; only the
+        # outermost fetches say anything about where the recording starts and ends.
+        if timeline["start"] > start and (
+            not self.covered or start <= self.covered[0][0]
+        ):
+            self.first_available = timeline["start"]
+        if self.latest_fetched_end is None or end >= self.latest_fetched_end:
+            self.latest_fetched_end = end
+            self.last_available = timeline["end"] if timeline["end"] < end else None
+
+        if covered_end > start:
+            self.covered = merge_intervals(self.covered + [(start, covered_end)])
+            self.segments = merge_intervals(
+                self.segments
+                + [segment for segment in segments if segment[1] <= covered_end]
+            )
+        return [segment for segment in segments if segment[1] > covered_end]
+
+    def window(self, start, end, mutable_segments):
+        """
+        Build the timeline for [start, end] from cached and freshly fetched mutable segments.
+        """
+        segments = merge_intervals(self.segments + mutable_segments)
+        window_start = max(start, self.first_available or start)
+        window_end = min(end, self.last_available or end)
+        return {
+            "start": window_start,
+            "end": window_end,
+            "segments": [
+                {"start": max(segment_start, start), "end": min(segment_end, end)}
+                for segment_start, segment_end in segments
+                if segment_end > start and segment_start < end
+            ],
+        }
+
+
+def downsample(timeline, buckets=None, resolution=None):
+    """
+    Reduce the segments of a timeline to what can actually be displayed.
+
+    Adjacent segments separated by a gap shorter than the threshold are merged.
+    The threshold is `resolution` seconds (at most the timeline length), or the
+    width of one bucket when only `buckets` is given. If more than `buckets`
+    intervals remain, the smallest gaps are filled until at most `buckets`
+    intervals are left.
+
+    Parameters:
+        - timeline (dict): A timeline with datetime `start`, `end` and `segments`.
+        - buckets (int): Maximum number of intervals to return, e.g. the display width.
+        - resolution (float): Gaps shorter than this many seconds are filled.
+
+    Returns:
+        - dict: The timeline with downsampled `segments`.
+    """
+    if resolution is not None:
+        # No gap is longer than the timeline itself, so a larger resolution
+        # changes nothing but could overflow the timedelta.
+        window = (timeline["end"] - timeline["start"]).total_seconds()
+        threshold = timedelta(seconds=min(resolution, window))
+    elif buckets:
+        threshold = (timeline["end"] - timeline["start"]) / buckets
+    else:
+        return timeline
+
+    segments = []
+    for segment in timeline["segments"]:
+        if segments and segment["start"] - segments[-1]["end"] < threshold:
+            segments[-1]["end"] = max(segments[-1]["end"], segment["end"])
+        else:
+            segments.append(dict(segment))
+
+    if buckets and len(segments) > buckets:
+        gaps = sorted(
+            range(1, len(segments)),
+            key=lambda index: segments[index]["start"] - segments[index - 1]["end"],
+        )
+        filled = set(gaps[: len(segments) - buckets])
+        reduced = [segments[0]]
+        for index in range(1, len(segments)):
+            if index in filled:
+                reduced[-1]["end"] = max(reduced[-1]["end"], segments[index]["end"])
+            else:
+                reduced.append(segments[index])
+        segments = reduced
+
+    return dict(timeline, segments=segments)
+
+
+def camera_timeline(personal_access_token, camera_id):
+    key = (token_digest(personal_access_token), str(camera_id))
+    entry = timeline_cache.get(key)
+    if entry is None:
+        entry = CameraTimeline()
+        timeline_cache.set(key, entry)
+    return entry
+
+
+def incremental_timeline(personal_access_token, camera_id, start, end, fetch):
+    """
+    Return the timeline of `camera_id` for [start, end], asking upstream only for
+    the sub-ranges that are not already cached.
+
+    Parameters:
+        - personal_access_token (str): The Personal Access Token of the caller.
+        - camera_id (str): The camera identifier.
+        - start (datetime): Start of the requested window.
+        - end (datetime): End of the requested window.
+        - fetch (callable): Called as ``fetch(start, end)`` for every missing range and
+          returning ``(validated_timeline, None)`` or ``(None, error_response)``.
+
+    Returns:
+        - tuple: (timeline, None) on success or (None, error_response) from `fetch`.
+    """
+    mutable_window = getattr(settings, "TIMELINE_MUTABLE_WINDOW", 300)
+    max_ranges = getattr(settings, "TIMELINE_MAX_MISSING_RANGES", 4)
+    stable_until = timezone.now() - timedelta(seconds=mutable_window)
+    entry = camera_timeline(personal_access_token, camera_id)
+
+    with entry.lock:
+        mutable_segments = []
+        for missing_start, missing_end in entry.missing(start, end, max_ranges):
+            timeline, error_response = fetch(missing_start, missing_end)
+            if error_response is not None:
+                return None, error_response
+            mutable_segments += entry.add(
+                missing_start, missing_end, timeline, stable_until
+            )
+        return entry.window(start, end, mutable_segments), None
@@ -2,18 +2,49 @@
 from django.urls import path
 from .views import (
     CameraListView,
+    CameraBatchView,
     CameraView,
+    CameraMjpegView,
+    CameraPageView,
+    CameraSnapshotView,
+    CameraStatusEventsView,
     CamerasRecordingTimeLineView,
     StreamView,
     RecordingView,
     PlayRecordingView,
+    RecordingHlsView,
     PauseRecordingView,
     SpeedRecordingView,
 )
+from .async_views import (
+    AsyncCameraListView,
+    AsyncCameraView,
+    AsyncCamerasRecordingTimeLineView,
+    AsyncStreamView,
+    AsyncRecordingView,
+    AsyncPlayRecordingView,
+    AsyncPauseRecordingView,
+    AsyncSpeedRecordingView,
+)
 
 urlpatterns = [
     path("cameras/", CameraListView.as_view(), name="camera-list"),
+    path("cameras/batch", CameraBatchView.as_view(), name="camera-batch"),
+    path(
+        "cameras/events",
+        CameraStatusEventsView.as_view(),
+        name="camera-status-events",
+    ),
     path("camera/<int:camera_id>", CameraView.as_view(), name="camera"),
+    path("camera/<int:camera_id>/page", CameraPageView.as_view(), name="camera-page"),
+    path(
+        "camera/<int:camera_id>/mjpeg", CameraMjpegView.as_view(), name="camera-mjpeg"
+    ),
+    path(
+        "camera/<int:camera_id>/snapshot",
+        CameraSnapshotView.as_view(),
+        name="camera-snapshot",
+    ),
     path(
         "camera/<str:camera_id>/recording/timeline/",
         CamerasRecordingTimeLineView.as_view(),
@@ -44,4 +75,44 @@ urlpatterns = [
         SpeedRecordingView.as_view(),
         name="speed-recording",
     ),
+    path(
+        "recording/<str:domain>/<str:stream_id>/hls/<path:name>",
+        RecordingHlsView.as_view(),
+        name="recording-hls",
+    ),
+    # ASGI-native variants of the views above, served side by side for benchmarking.
+    path("async/cameras/", AsyncCameraListView.as_view(), name="async-camera-list"),
+    path(
+        "async/camera/<int:camera_id>", AsyncCameraView.as_view(), name="async-camera"
+    ),
+    path(
+        "async/camera/<str:camera_id>/recording/timeline/",
+        AsyncCamerasRecordingTimeLineView.as_view(),
+        name="async-camera-recording-timeline",
+    ),
+    path(
+        "async/camera/<str:camera_id>/recording/stream",
+        AsyncStreamView.as_view(),
+        name="async-camera-recording-stream",
+    ),
+    path(
+        "async/camera/<str:camera_id>/recording/info",
+        AsyncRecordingView.as_view(),
+        name="async-camera-recording-info",
+    ),
+    path(
+        "async/recording/<str:domain>/<str:stream_id>/play",
+        AsyncPlayRecordingView.as_view(),
+        name="async-play-recording",
+    ),
+    path(
+        "async/recording/<str:domain>/<str:stream_id>/pause",
+        AsyncPauseRecordingView.as_view(),
+        name="async-pause-recording",
+    ),
+    path(
+        "async/recording/<str:domain>/<str:stream_id>/speed",
+        AsyncSpeedRecordingView.as_view(),
+        name="async-speed-recording",
+    ),
 ]
@@ -1,22 +1,308 @@
+import hashlib
 import json
+import math
 
-from django.http import JsonResponse, HttpResponseBadRequest
-import requests
+import os
+
+from django.http import (
+    FileResponse,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.views import View
 from rest_framework import status
 from .serializers import (
-    CameraListResponseSerializer,
-    CameraSerializer,
     TimelineSerializer,
     StreamSerializer,
-    RecordingSerializer,
     SpeedUpdateSerializer,
 )
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
 from django.utils.decorators import method_decorator
 from apps.utils.auth import require_personal_access_token
+from apps.utils.upstream import client
+from .services import (
+    all_camera_list_data,
+    body_etag,
+    camera_batch_data,
+    camera_data,
+    camera_list_data,
+    camera_page_data,
+    fetch_timeline,
+    recording_data,
+    rendered_payload,
+    stream_camera_list_data,
+    timeline_data,
+    validate_response,
+)
+from .hls import (
+    PLAYLIST_CONTENT_TYPE,
+    SEGMENT_CONTENT_TYPES,
+    is_allowed_domain,
+    is_allowed_url,
+    is_safe_name,
+    is_safe_stream_id,
+    playlist_segments,
+    playlist_text,
+    proxy_hls_url,
+    rewrite_playlist,
+    segment_file,
+    upstream_hls_url,
+)
+from .prefetch import prefetcher
+from .mjpeg import RELAY_BOUNDARY, async_relay_stream, relay_stream
+from .status_feed import async_status_events, status_events
+from .warmer import warmer
+from .snapshots import snapshot_image, thumbnail_width
+from .timeline import (
+    compact_values,
+    downsample,
+    pack_compact_values,
+    parse_timestamp,
+)
 from core.settings import ANGEL_CAM_BASE_URL
 
 
+def json_response(request, data):
+    """
+    Return `data` as JSON with a strong ETag, or 304 Not Modified when the
+    request's `If-None-Match` matches it. See `services.rendered_payload`.
+    """
+    body, etag = rendered_payload(data)
+    return etag_response(request, body, etag, "application/json")
+
+
+def etag_response(request, body, etag, content_type):
+    response = HttpResponse(body, content_type=content_type, status=status.HTTP_200_OK)
+    response["ETag"] = etag
+    if request.method in ("GET", "HEAD"):
+        return get_conditional_response(request, etag=etag, response=response)
+    return response
+
+
+def is_asgi(request):
+    """
+    Whether `request` is served by the ASGI handler. It collects sync iterators
+    of a `StreamingHttpResponse` into a list before sending anything, so
+    endless or incremental streams must use an async iterator there.
+    """
+    return isinstance(request, ASGIRequest)
+
+
+def serialized_response(response, serializer_class, failure_detail, request=None):
+    """
+    Validate a successful upstream response with `serializer_class` and wrap the
+    result in a JsonResponse. Non-200 upstream responses are reported with
+    `failure_detail` and the upstream status code. When `request` is given the
+    response carries an ETag, see `json_response`.
+    """
+    data, error_response = validate_response(response, serializer_class, failure_detail)
+    return data_response(data, error_response, request=request)
+
+
+def data_response(data, error_response, request=None):
+    if error_response is not None:
+        return error_response
+    if request is not None:
+        return json_response(request, data)
+    return JsonResponse(data, safe=False, status=status.HTTP_200_OK)
+
+
+def playback_control_response(response, expected_status, payload, failure_detail):
+    if response.status_code == expected_status:
+        return JsonResponse(payload, safe=False, status=status.HTTP_200_OK)
+    return JsonResponse({"detail": failure_detail}, status=response.status_code)
+
+
+def timeline_params(request):
+    start = request.GET.get("start")
+    end = request.GET.get("end")
+    if not start or not end:
+        return None
+    return {"start": start, "end": end}
+
+
+def downsample_params(request):
+    """
+    Parse the optional `buckets` and `resolution` timeline query parameters.
+
+    Returns:
+        - tuple: (buckets, resolution, None) on success or (None, None, JsonResponse).
+    """
+    try:
+        buckets = request.GET.get("buckets")
+        buckets = int(buckets) if buckets else None
+        resolution = request.GET.get("resolution")
+        resolution = float(resolution) if resolution else None
+    except ValueError:
+        buckets = resolution = 0
+    if (buckets is not None and buckets <= 0) or (
+        resolution is not None and not (math.isfinite(resolution) and resolution > 0)
+    ):
+        return (
+            None,
+            None,
+            JsonResponse(
+                {"detail": "Buckets and resolution must be positive numbers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            ),
+        )
+    return buckets, resolution, None
+
+
+COMPACT_TIMELINE_MEDIA_TYPE = "application/vnd.angelcam.timeline+json"
+BINARY_TIMELINE_MEDIA_TYPE = "application/octet-stream"
+
+
+def timeline_response(request, timeline):
+    """
+    Render a timeline in the format negotiated by the client.
+
+    - ``format=compact`` or ``Accept: application/vnd.angelcam.timeline+json``:
+      ``{"start": int, "end": int, "segments": [start0, end0, start1, end1, ...]}``
+      with all values in epoch seconds.
+    - ``format=binary`` or ``Accept: application/octet-stream``: the values
+      ``[start, end, start0, end0, ...]`` as little-endian int64.
+    - Otherwise the regular `TimelineSerializer` representation.
+
+    Every format carries an ETag, and ``Vary: Accept`` keeps caches from serving
+    one format for another.
+    """
+    wire_format = request.GET.get("format")
+    accept = request.headers.get("Accept", "")
+    if wire_format == "binary" or (
+        wire_format is None and BINARY_TIMELINE_MEDIA_TYPE in accept
+    ):
+        body = pack_compact_values(compact_values(timeline))
+        response = etag_response(
+            request, body, body_etag(body), BINARY_TIMELINE_MEDIA_TYPE
+        )
+    elif wire_format == "compact" or (
+        wire_format is None and COMPACT_TIMELINE_MEDIA_TYPE in accept
+    ):
+        values = compact_values(timeline)
+        body = json.dumps(
+            {"start": values[0], "end": values[1], "segments": values[2:]}
+        ).encode()
+        response = etag_response(
+            request, body, body_etag(body), COMPACT_TIMELINE_MEDIA_TYPE
+        )
+    else:
+        response = json_response(request, TimelineSerializer(timeline).data)
+    patch_vary_headers(response, ["Accept"])
+    return response
+
+
+def stream_params(request):
+    start = request.GET.get("start")
+    if not start:
+        return None
+    return {"start": start}
+
+
+MISSING_TIMELINE_PARAMS = {"detail": "Start and end parameters are required."}
+MISSING_STREAM_PARAMS = {"detail": "Start parameter is required."}
+HLS_NOT_FOUND = {"detail": "Not found."}
+
+
+def recording_timeline_response(request, camera_id):
+    """
+    Respond to a timeline request, see `CamerasRecordingTimeLineView`.
+    """
+    params = timeline_params(request)
+    if params is None:
+        return JsonResponse(MISSING_TIMELINE_PARAMS, status=status.HTTP_400_BAD_REQUEST)
+    buckets, resolution, error_response = downsample_params(request)
+    if error_response is not None:
+        return error_response
+    start = parse_timestamp(params["start"])
+    end = parse_timestamp(params["end"])
+    if start is None or end is None or start >= end:
+        # Let upstream report on windows we cannot reason about.
+        response = fetch_timeline(request.personal_access_token, camera_id, params)
+        return serialized_response(
+            response,
+            TimelineSerializer,
+            "Failed to retrieve timeline data",
+            request=request,
+        )
+
+    timeline, error_response = timeline_data(
+        request.personal_access_token, camera_id, start, end
+    )
+    if error_response is not None:
+        return error_response
+    timeline = downsample(timeline, buckets=buckets, resolution=resolution)
+    return timeline_response(request, timeline)
+
+
+def stream_response(request, response):
+    """
+    Validate an upstream recording stream response. With ``proxy=true`` the
+    stream URL is replaced by its `RecordingHlsView` URL, see `hls.proxy_hls_url`.
+    """
+    data, error_response = validate_response(
+        response, StreamSerializer, "Failed to retrieve stream data"
+    )
+    if error_response is None and request.GET.get("proxy") == "true":
+        proxy_url = proxy_hls_url(data["url"])
+        if proxy_url is not None:
+            data["url"] = request.build_absolute_uri(proxy_url)
+    return data_response(data, error_response, request=request)
+
+
+def parse_speed(request):
+    """
+    Parse and validate the playback speed from the request body.
+
+    Returns:
+        - tuple: (payload, None) on success or (None, JsonResponse) describing the error.
+    """
+    try:
+        json_data = json.loads(request.body)
+    except ValueError:
+        return None, JsonResponse(
+            {"detail": "Invalid JSON"}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    serializer = SpeedUpdateSerializer(data=json_data)
+    if not serializer.is_valid():
+        return None, JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return {"speed": int(serializer.validated_data["speed"])}, None
+
+
+def camera_ids_param(request):
+    """
+    Parse the comma separated `ids` query parameter into a list of unique camera ids.
+
+    Returns:
+        - tuple: (camera_ids, None) on success or (None, JsonResponse) describing the error.
+    """
+    max_ids = getattr(settings, "CAMERA_BATCH_MAX_IDS", 50)
+    try:
+        camera_ids = [
+            int(camera_id) for camera_id in request.GET.get("ids", "").split(",")
+        ]
+    except ValueError:
+        camera_ids = []
+    camera_ids = list(dict.fromkeys(camera_ids))
+    if not camera_ids or len(camera_ids) > max_ids:
+        return None, JsonResponse(
+            {
+                "detail": f"ids must be a comma separated list of 1 to {max_ids} camera ids."
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return camera_ids, None
+
+
 @method_decorator(require_personal_access_token, name="dispatch")
 class CameraLiveStreamView(View):
     """
@@ -35,12 +321,9 @@ class CameraLiveStreamView(View):
 
     @staticmethod
     def get(request, camera_id):
-        headers = {
-            "Authorization": f"PersonalAccessToken {request.personal_access_token}"
-        }
-        response = requests.get(
+        response = client.get(
             f"{ANGEL_CAM_BASE_URL}/v1/shared-cameras/{camera_id}/recording/stream/",
-            headers=headers,
+            personal_access_token=request.personal_access_token,
         )
         if response.status_code == 200:
             live_stream_url = response.json().get("live_stream_url")
@@ -57,6 +340,16 @@ class CameraListView(View):
     Endpoint:
         GET /camera/
 
+    Query Parameters:
+        - all (str): "true" to return the cameras of every upstream page in a single
+          list, fetched concurrently, see `services.all_camera_list_data`.
+        - stream (str): "true" to stream the list one camera at a time, see
+          `services.stream_camera_list_data`. Combined with `all=true` the upstream
+          pages are streamed in order as they arrive. Under ASGI the following
+          pages are fetched by an async iterator.
+
+    Validated responses are cached per token, see `services.cached_data`.
+
     Response:
         - 200 OK: Returns a JSON response containing a list of cameras.
         - 400 Bad Request: If there is an issue with the response data.
@@ -64,20 +357,24 @@ class CameraListView(View):
 
     @staticmethod
     def get(request):
-        headers = {
-            "Authorization": f"PersonalAccessToken {request.personal_access_token}"
-        }
-        response = requests.get(
-            f"{ANGEL_CAM_BASE_URL}/v1/shared-cameras/", headers=headers
-        )
-        if response.status_code == 200:
-            cameras_data = response.json()
-            serializer = CameraListResponseSerializer(data=cameras_data)
-            if serializer.is_valid():
-                return JsonResponse(
-                    serializer.data, safe=False, status=status.HTTP_200_OK
-                )
-            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if request.GET.get("stream") == "true":
+            chunks, error_response = stream_camera_list_data(
+                request.personal_access_token,
+                all_pages=request.GET.get("all") == "true",
+                asynchronous=is_asgi(request),
+            )
+            if error_response is not None:
+                return error_response
+            return StreamingHttpResponse(chunks, content_type="application/json")
+        if request.GET.get("all") == "true":
+            kind = "all-cameras"
+            data, error_response = all_camera_list_data(request.personal_access_token)
+        else:
+            kind = "camera-list"
+            data, error_response = camera_list_data(request.personal_access_token)
+        if error_response is None:
+            warmer.touch(request.personal_access_token, kind)
+        return data_response(data, error_response, request=request)
 
 
 @method_decorator(require_personal_access_token, name="dispatch")
@@ -91,6 +388,8 @@ class CameraView(View):
     Parameters:
         - camera_id (str): The unique identifier for the camera.
 
+    Validated responses are cached per token, see `services.cached_data`.
+
     Response:
         - 200 OK: Returns a JSON response containing the camera details.
         - 400 Bad Request: If there is an issue with the response data.
@@ -98,34 +397,246 @@ class CameraView(View):
 
     @staticmethod
     def get(request, camera_id):
-        headers = {
-            "Authorization": f"PersonalAccessToken {request.personal_access_token}"
-        }
-        response = requests.get(
-            f"{ANGEL_CAM_BASE_URL}/v1/shared-cameras/{camera_id}/", headers=headers
+        data, error_response = camera_data(request.personal_access_token, camera_id)
+        if error_response is None:
+            warmer.touch(request.personal_access_token, "camera", camera_id)
+        return data_response(data, error_response, request=request)
+
+
+@method_decorator(require_personal_access_token, name="dispatch")
+class CameraBatchView(View):
+    """
+    View to retrieve the details of several cameras in one request.
+
+    Endpoint:
+        GET /cameras/batch?ids=<camera_id>,<camera_id>,...
+
+    Query Parameters:
+        - ids (str): Comma separated camera ids, at most ``CAMERA_BATCH_MAX_IDS``.
+
+    The cameras are fetched concurrently, see `services.camera_batch_data`.
+
+    Response:
+        - 200 OK: Returns ``{"results": [...]}`` with one entry per camera id, holding
+          either the camera details under `data` or the error under `error`, together
+          with the status the single camera endpoint would have returned.
+        - 400 Bad Request: If `ids` is missing or invalid.
+    """
+
+    @staticmethod
+    def get(request):
+        camera_ids, error_response = camera_ids_param(request)
+        if error_response is not None:
+            return error_response
+        results = camera_batch_data(request.personal_access_token, camera_ids)
+        return json_response(request, {"results": results})
+
+
+@method_decorator(require_personal_access_token, name="dispatch")
+class CameraStatusEventsView(View):
+    """
+    View to push camera status changes to the client as Server-Sent Events.
+
+    Endpoint:
+        GET /cameras/events
+
+    Parameters:
+        - token (str, optional): The JWT, for ``EventSource`` clients that cannot
+          send an Authorization header.
+
+    All subscribers of a token share one upstream poller, see
+    `status_feed.CameraStatusPoller`. Under ASGI the events are awaited, see
+    `status_feed.async_status_events`, so a subscriber holds no worker thread.
+    Events carry a JSON list of
+    ``{"id", "name", "status"}`` objects:
+
+        - snapshot: Every camera, sent first.
+        - status: Only the cameras whose name or status changed; cameras that
+          disappeared are sent with status ``removed``.
+        - error: ``{"status": <upstream status>}`` when a poll failed.
+
+    Response:
+        - 200 OK: A ``text/event-stream`` response.
+    """
+
+    accepts_query_token = True
+
+    @staticmethod
+    def get(request):
+        events = async_status_events if is_asgi(request) else status_events
+        response = StreamingHttpResponse(
+            events(request.personal_access_token),
+            content_type="text/event-stream",
         )
-        if response.status_code == 200:
-            cameras_data = response.json()
-            streams = cameras_data.get("streams", [])
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+@method_decorator(require_personal_access_token, name="dispatch")
+class CameraSnapshotView(View):
+    """
+    View to serve the latest stored snapshot of a camera, optionally as a thumbnail.
 
-            filtered_streams = [
-                stream
-                for stream in streams
-                if stream.get("format") == "mjpeg" or stream.get("format") == "mp4"
-            ]
+    Endpoint:
+        GET /camera/<camera_id>/snapshot
+
+    Parameters:
+        - camera_id (int): The unique identifier for the camera.
+        - width (int, optional): Thumbnail width in pixels, rounded up to the nearest
+          of ``SNAPSHOT_WIDTHS``; wider requests get the original image.
+
+    Snapshots are fetched once per `created_at` and kept in a size-bounded memory
+    and disk cache, see `snapshots.snapshot_image`.
 
-            cameras_data["streams"] = filtered_streams
+    Response:
+        - 200 OK: Returns the JPEG image.
+        - 304 Not Modified: If `If-None-Match` matches the snapshot.
+        - 400 Bad Request: If `width` is invalid or the camera cannot be fetched.
+        - 502 Bad Gateway: If the snapshot image cannot be fetched.
+    """
 
-            serializer = CameraSerializer(data=cameras_data)
-            if serializer.is_valid():
+    @staticmethod
+    def get(request, camera_id):
+        width = request.GET.get("width")
+        if width is not None:
+            if not width.isdigit() or int(width) <= 0:
                 return JsonResponse(
-                    serializer.data, safe=False, status=status.HTTP_200_OK
+                    {"detail": "Width must be a positive integer."},
+                    status=status.HTTP_400_BAD_REQUEST,
                 )
-            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-        return JsonResponse(
-            {"error": "Failed to fetch camera data from external service"},
-            status=status.HTTP_400_BAD_REQUEST,
+            width = thumbnail_width(int(width))
+
+        camera, error_response = camera_data(request.personal_access_token, camera_id)
+        if error_response is not None:
+            return error_response
+
+        key, image = snapshot_image(camera_id, camera["snapshot"], width)
+        if image is None:
+            return JsonResponse(
+                {"detail": "Failed to retrieve snapshot"},
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
+        etag = f'"{hashlib.sha256(repr(key).encode()).hexdigest()[:32]}"'
+        response = HttpResponse(image, content_type="image/jpeg")
+        response["ETag"] = etag
+        patch_cache_control(
+            response,
+            private=True,
+            max_age=getattr(settings, "SNAPSHOT_MAX_AGE", 60),
+        )
+        return get_conditional_response(request, etag=etag, response=response)
+
+
+@method_decorator(require_personal_access_token, name="dispatch")
+class CameraMjpegView(View):
+    """
+    View to relay the live MJPEG stream of a camera.
+
+    Endpoint:
+        GET /camera/<camera_id>/mjpeg
+
+    Parameters:
+        - camera_id (int): The unique identifier for the camera.
+        - token (str, optional): The JWT, for ``<img>`` elements that cannot send an
+          Authorization header.
+        - delivery (str, optional): ``latest`` (default) always sends the newest frame and
+          drops the ones a slow client missed; ``buffered`` replays the relay's ring buffer.
+        - max_fps (float, optional): Cap the frame rate sent to this viewer.
+
+    All viewers of a camera share one upstream connection, see `mjpeg.MjpegRelay`
+    and `mjpeg.relay_stream`. Under ASGI viewers are served by
+    `mjpeg.async_relay_stream` and hold no thread.
+
+    Response:
+        - 200 OK: A ``multipart/x-mixed-replace`` stream of JPEG frames.
+        - 400 Bad Request: If the camera cannot be fetched or the parameters are invalid.
+        - 404 Not Found: If the camera has no MJPEG stream.
+    """
+
+    accepts_query_token = True
+
+    @staticmethod
+    def get(request, camera_id):
+        delivery = request.GET.get("delivery", "latest")
+        try:
+            max_fps = request.GET.get("max_fps")
+            max_fps = float(max_fps) if max_fps else None
+        except ValueError:
+            max_fps = 0
+        if delivery not in ("latest", "buffered") or (
+            max_fps is not None and not 0 < max_fps <= 1000
+        ):
+            return JsonResponse(
+                {
+                    "detail": "Delivery must be latest or buffered and max_fps a positive number."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        camera, error_response = camera_data(request.personal_access_token, camera_id)
+        if error_response is not None:
+            return error_response
+        url = next(
+            (
+                stream["url"]
+                for stream in camera["streams"]
+                if stream["format"] == "mjpeg"
+            ),
+            None,
         )
+        if url is None:
+            return JsonResponse(
+                {"detail": "Camera has no MJPEG stream."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        stream = async_relay_stream if is_asgi(request) else relay_stream
+        response = StreamingHttpResponse(
+            stream(camera_id, url, latest_only=delivery == "latest", max_fps=max_fps),
+            content_type=f"multipart/x-mixed-replace; boundary={RELAY_BOUNDARY}",
+        )
+        response["Cache-Control"] = "no-cache, no-store"
+        return response
+
+
+@method_decorator(require_personal_access_token, name="dispatch")
+class CameraPageView(View):
+    """
+    View to retrieve everything the camera page renders in one request.
+
+    Endpoint:
+        GET /camera/<camera_id>/page
+
+    Parameters:
+        - camera_id (int): The unique identifier for the camera.
+        - buckets (int, optional): Downsample the timeline, see `CamerasRecordingTimeLineView`.
+        - resolution (float, optional): Downsample the timeline, see `CamerasRecordingTimeLineView`.
+
+    The camera details and recording info are fetched concurrently; the timeline
+    of the ``CAMERA_PAGE_TIMELINE_WINDOW`` seconds before `recording_end` is
+    fetched as soon as the recording info is known, see `services.camera_page_data`.
+
+    Response:
+        - 200 OK: Returns ``{"camera", "recording", "timeline", "errors"}``. A part that
+          could not be fetched is null and its error is reported under `errors`
+          with the status the dedicated endpoint would have returned.
+        - 400 Bad Request: If `buckets` or `resolution` are invalid.
+    """
+
+    @staticmethod
+    def get(request, camera_id):
+        buckets, resolution, error_response = downsample_params(request)
+        if error_response is not None:
+            return error_response
+        page = camera_page_data(request.personal_access_token, camera_id)
+        for kind in ("camera", "recording"):
+            if page[kind] is not None:
+                warmer.touch(request.personal_access_token, kind, camera_id)
+        if page["timeline"] is not None:
+            page["timeline"] = TimelineSerializer(
+                downsample(page["timeline"], buckets=buckets, resolution=resolution)
+            ).data
+        return json_response(request, page)
 
 
 @method_decorator(require_personal_access_token, name="dispatch")
@@ -139,6 +650,13 @@ class CamerasRecordingTimeLineView(View):
     Parameters:
         - start (str): The start timestamp for the timeline.
         - end (str): The end timestamp for the timeline.
+        - buckets (int, optional): Return at most this many intervals, e.g. the display width.
+        - resolution (float, optional): Fill gaps between segments shorter than this many seconds.
+        - format (str, optional): ``compact`` or ``binary`` wire format, see `timeline_response`.
+
+    Known segments are kept per camera, so only the parts of the window that are
+    not cached yet (typically the still-recording tail) are requested upstream,
+    see `timeline.incremental_timeline`.
 
     Response:
         - 200 OK: Returns a JSON response containing the recording timeline data.
@@ -147,34 +665,7 @@ class CamerasRecordingTimeLineView(View):
 
     @staticmethod
     def get(request, camera_id):
-        start = request.GET.get("start")
-        end = request.GET.get("end")
-
-        if not start or not end:
-            return JsonResponse(
-                {"detail": "Start and end parameters are required."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        headers = {
-            "Authorization": f"PersonalAccessToken {request.personal_access_token}"
-        }
-        params = {"start": start, "end": end}
-        response = requests.get(
-            f"{ANGEL_CAM_BASE_URL}/v1/shared-cameras/{camera_id}/recording/timeline/",
-            headers=headers,
-            params=params,
-        )
-        if response.status_code == 200:
-            timeline_data = response.json()
-            serializer = TimelineSerializer(data=timeline_data)
-            if serializer.is_valid():
-                return JsonResponse(
-                    serializer.data, safe=False, status=status.HTTP_200_OK
-                )
-            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-        return JsonResponse(
-            {"detail": "Failed to retrieve timeline data"}, status=response.status_code
-        )
+        return recording_timeline_response(request, camera_id)
 
 
 @method_decorator(require_personal_access_token, name="dispatch")
@@ -187,6 +678,8 @@ class StreamView(View):
 
     Parameters:
         - start (str): The start timestamp for the stream.
+        - proxy (bool, optional): If true, `url` points at the HLS proxy, see
+          `RecordingHlsView`.
 
     Response:
         - 200 OK: Returns a JSON response containing the stream data.
@@ -195,36 +688,17 @@ class StreamView(View):
 
     @staticmethod
     def get(request, camera_id):
-        start = request.GET.get("start")
-
-        if not start:
+        params = stream_params(request)
+        if params is None:
             return JsonResponse(
-                {"detail": "Start parameter is required."},
-                status=status.HTTP_400_BAD_REQUEST,
+                MISSING_STREAM_PARAMS, status=status.HTTP_400_BAD_REQUEST
             )
-
-        headers = {
-            "Authorization": f"PersonalAccessToken {request.personal_access_token}"
-        }
-        params = {
-            "start": start,
-        }
-        response = requests.get(
+        response = client.get(
             f"{ANGEL_CAM_BASE_URL}/v1/shared-cameras/{camera_id}/recording/stream/",
-            headers=headers,
+            personal_access_token=request.personal_access_token,
             params=params,
         )
-        if response.status_code == 200:
-            stream_data = response.json()
-            serializer = StreamSerializer(data=stream_data)
-            if serializer.is_valid():
-                return JsonResponse(
-                    serializer.data, safe=False, status=status.HTTP_200_OK
-                )
-            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-        return JsonResponse(
-            {"detail": "Failed to retrieve stream data"}, status=response.status_code
-        )
+        return stream_response(request, response)
 
 
 @method_decorator(require_personal_access_token, name="dispatch")
@@ -245,25 +719,10 @@ class RecordingView(View):
 
     @staticmethod
     def get(request, camera_id):
-        headers = {
-            "Authorization": f"PersonalAccessToken {request.personal_access_token}"
-        }
-
-        response = requests.get(
-            f"{ANGEL_CAM_BASE_URL}/v1/shared-cameras/{camera_id}/recording/",
-            headers=headers,
-        )
-        if response.status_code == 200:
-            recording_data = response.json()
-            serializer = RecordingSerializer(data=recording_data)
-            if serializer.is_valid():
-                return JsonResponse(
-                    serializer.data, safe=False, status=status.HTTP_200_OK
-                )
-            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-        return JsonResponse(
-            {"detail": "Failed to retrieve recording data"}, status=response.status_code
-        )
+        data, error_response = recording_data(request.personal_access_token, camera_id)
+        if error_response is None:
+            warmer.touch(request.personal_access_token, "recording", camera_id)
+        return data_response(data, error_response, request=request)
 
 
 @method_decorator(require_personal_access_token, name="dispatch")
@@ -285,20 +744,14 @@ class PlayRecordingView(View):
 
     @staticmethod
     def get(request, domain, stream_id):
-        headers = {
-            "Authorization": f"PersonalAccessToken {request.personal_access_token}"
-        }
-
-        response = requests.post(
+        response = client.post(
             f"https://{domain}/recording/streams/{stream_id}/play/",
-            headers=headers,
+            personal_access_token=request.personal_access_token,
         )
         if response.status_code == 204:
-            return JsonResponse(
-                {"status": "playing"}, safe=False, status=status.HTTP_200_OK
-            )
-        return JsonResponse(
-            {"detail": "Failed to play the recording"}, status=response.status_code
+            prefetcher.resume(request.personal_access_token, domain, stream_id)
+        return playback_control_response(
+            response, 204, {"status": "playing"}, "Failed to play the recording"
         )
 
 
@@ -321,20 +774,14 @@ class PauseRecordingView(View):
 
     @staticmethod
     def get(request, domain, stream_id):
-        headers = {
-            "Authorization": f"PersonalAccessToken {request.personal_access_token}"
-        }
-
-        response = requests.post(
+        response = client.post(
             f"https://{domain}/recording/streams/{stream_id}/pause/",
-            headers=headers,
+            personal_access_token=request.personal_access_token,
         )
         if response.status_code == 204:
-            return JsonResponse(
-                {"status": "paused"}, safe=False, status=status.HTTP_200_OK
-            )
-        return JsonResponse(
-            {"detail": "Failed to pause the recording"}, status=response.status_code
+            prefetcher.pause(request.personal_access_token, domain, stream_id)
+        return playback_control_response(
+            response, 204, {"status": "paused"}, "Failed to pause the recording"
         )
 
 
@@ -360,36 +807,107 @@ class SpeedRecordingView(View):
 
     @staticmethod
     def get(request, domain, stream_id):
-        try:
-            data = request.body
-            json_data = json.loads(data)
-        except ValueError:
-            return JsonResponse(
-                {"detail": "Invalid JSON"}, status=status.HTTP_400_BAD_REQUEST
-            )
-
-        serializer = SpeedUpdateSerializer(data=json_data)
-        if not serializer.is_valid():
-            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-        validated_data = serializer.validated_data
-        speed = int(validated_data["speed"])
-        headers = {
-            "Authorization": f"PersonalAccessToken {request.personal_access_token}"
-        }
-
-        data = {"speed": speed}
+        data, error_response = parse_speed(request)
+        if error_response is not None:
+            return error_response
 
-        response = requests.get(
+        response = client.get(
             f"https://{domain}/recording/streams/{stream_id}/speed/",
-            headers=headers,
+            personal_access_token=request.personal_access_token,
             json=data,
         )
         if response.status_code == 200:
+            prefetcher.set_speed(
+                request.personal_access_token, domain, stream_id, data["speed"]
+            )
+        return playback_control_response(
+            response, 200, {"success": "true"}, "Failed to update the playback speed"
+        )
+
+
+@method_decorator(require_personal_access_token, name="dispatch")
+class RecordingHlsView(View):
+    """
+    View to proxy the HLS playlists and segments of a recording stream.
+
+    Endpoint:
+        GET /recording/<domain>/<stream_id>/hls/<name>
+
+    Parameters:
+        - domain (str): The domain of the recording service, one of ``HLS_ALLOWED_DOMAINS``.
+        - stream_id (str): The unique identifier for the stream.
+        - name (str): The playlist (``.m3u8``) or segment path below the stream's HLS directory.
+        - token (str, optional): The JWT, for players that cannot send an
+          Authorization header. It is carried over to the rewritten playlist URIs.
+
+    Other query parameters are forwarded upstream. Playlists are rewritten to
+    point back at this endpoint and cached for ``HLS_PLAYLIST_TTL`` seconds;
+    recorded segments are immutable and served from a size-bounded disk cache,
+    see `hls.segment_file`.
+
+    Response:
+        - 200 OK: The rewritten playlist or the segment.
+        - 404 Not Found: If the domain is not allowed, `stream_id` or `name` is malformed
+          or `name` is not a playlist or segment.
+        - Upstream status: If the playlist or segment cannot be fetched.
+    """
+
+    accepts_query_token = True
+
+    @staticmethod
+    def get(request, domain, stream_id, name):
+        extension = os.path.splitext(name)[1].lower()
+        if (
+            not is_allowed_domain(domain)
+            or not is_safe_stream_id(stream_id)
+            or not is_safe_name(name)
+            or (extension != ".m3u8" and extension not in SEGMENT_CONTENT_TYPES)
+        ):
+            return JsonResponse(HLS_NOT_FOUND, status=status.HTTP_404_NOT_FOUND)
+
+        upstream_query = request.GET.copy()
+        upstream_query.pop("token", None)
+        url = upstream_hls_url(domain, stream_id, name)
+        if upstream_query:
+            url = f"{url}?{upstream_query.urlencode()}"
+        if not is_allowed_url(url):
+            return JsonResponse(HLS_NOT_FOUND, status=status.HTTP_404_NOT_FOUND)
+
+        if extension == ".m3u8":
+            status_code, text = playlist_text(request.personal_access_token, url)
+            if text is None:
+                return JsonResponse(
+                    {"detail": "Failed to retrieve playlist"}, status=status_code
+                )
+            prefetcher.playlist_loaded(
+                request.personal_access_token,
+                domain,
+                stream_id,
+                playlist_segments(text, url),
+            )
+            token = request.GET.get("token")
+            response = HttpResponse(
+                rewrite_playlist(text, url, {"token": token} if token else None),
+                content_type=PLAYLIST_CONTENT_TYPE,
+            )
+            patch_cache_control(
+                response, private=True, max_age=getattr(settings, "HLS_PLAYLIST_TTL", 2)
+            )
+            return response
+
+        status_code, file = segment_file(request.personal_access_token, url)
+        if file is None:
             return JsonResponse(
-                {"success": "true"}, safe=False, status=status.HTTP_200_OK
+                {"detail": "Failed to retrieve segment"}, status=status_code
             )
-        return JsonResponse(
-            {"detail": "Failed to update the playback speed"},
-            status=response.status_code,
+        prefetcher.segment_requested(
+            request.personal_access_token, domain, stream_id, url
+        )
+        response = FileResponse(file, content_type=SEGMENT_CONTENT_TYPES[extension])
+        patch_cache_control(
+            response,
+            private=True,
+            immutable=True,
+            max_age=getattr(settings, "HLS_SEGMENT_MAX_AGE", 7 * 24 * 3600),
         )
+        return response
@@ -0,0 +1,227 @@
+import collections
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+
+from apps.utils.cache import register_cache, token_digest
+from .services import (
+    camera_data,
+    camera_list_data,
+    camera_list_page_count,
+    recording_data,
+    refresh_all_camera_list_data,
+)
+
+logger = logging.getLogger(__name__)
+
+# How each kind of warmed resource is refreshed into the response cache.
+REFRESHERS = {
+    "camera-list": lambda token, _: camera_list_data(token, refresh=True),
+    "all-cameras": lambda token, _: refresh_all_camera_list_data(token),
+    "camera": lambda token, camera_id: camera_data(token, camera_id, refresh=True),
+    "recording": lambda token, camera_id: recording_data(
+        token, camera_id, refresh=True
+    ),
+}
+
+# Upstream requests a successful refresh sent, where it is more than one.
+REQUEST_COUNTS = {"all-cameras": camera_list_page_count}
+
+# Upstream statuses after which a token is no longer warmed.
+FATAL_STATUSES = (401, 403)
+
+
+class _Entry:
+    def __init__(self, personal_access_token, kind, camera_id, last_active, due_at):
+        self.personal_access_token = personal_access_token
+        self.kind = kind
+        self.camera_id = camera_id
+        self.last_active = last_active
+        self.due_at = due_at
+
+
+class RequestBudget:
+    """
+    Allow at most `limit` requests in any sliding window of `period` seconds.
+    """
+
+    def __init__(self, limit, period=60):
+        self.limit = limit
+        self.period = period
+        self._sent = collections.deque()
+        self._lock = threading.Lock()
+
+    def acquire(self, now):
+        with self._lock:
+            while self._sent and self._sent[0] <= now - self.period:
+                self._sent.popleft()
+            if len(self._sent) >= self.limit:
+                return False
+            self._sent.append(now)
+            return True
+
+    def charge(self, now, count):
+        """
+        Record `count` more requests sent at `now`, even over the limit.
+        """
+        with self._lock:
+            self._sent.extend([now] * count)
+
+
+class CacheWarmer:
+    """
+    Keep the response cache warm for the resources users recently looked at.
+
+    The camera views record every camera list, camera and recording info a
+    token is successfully served. A background thread refreshes each of them
+    roughly every ``CACHE_WARMER_INTERVAL`` seconds, which is meant to stay
+    below ``RESPONSE_CACHE_TTL`` so interactive requests find the data cached.
+    Every refresh is scheduled with random jitter, so resources touched
+    together do not refresh in lockstep, and the warmer never sends more than
+    ``CACHE_WARMER_BUDGET`` upstream requests per minute in total, counting
+    every page of a full camera list; refreshes over budget are postponed, most
+    overdue first. Resources not requested for ``CACHE_WARMER_ACTIVE_WINDOW``
+    seconds, or whose token upstream rejects, are dropped.
+
+    The caches are per process, so the warmer runs as a thread inside each
+    server process; it starts with the first recorded request.
+
+    Settings:
+        - CACHE_WARMER_ENABLED (bool): Record requests and run the warmer thread.
+        - CACHE_WARMER_INTERVAL (float): Seconds between refreshes of a resource.
+        - CACHE_WARMER_JITTER (float): Fraction of the interval refreshes are moved earlier at random.
+        - CACHE_WARMER_ACTIVE_WINDOW (float): Seconds a resource is warmed after its last request.
+        - CACHE_WARMER_BUDGET (int): Upstream requests per minute the warmer may send.
+        - CACHE_WARMER_MAX_ENTRIES (int): Resources tracked at most; the least recently requested go first.
+    """
+
+    def __init__(self):
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._budget = None
+        self._stats = {"refreshed": 0, "failed": 0, "postponed": 0}
+        register_cache(self)
+
+    @staticmethod
+    def _interval():
+        interval = getattr(settings, "CACHE_WARMER_INTERVAL", 20)
+        jitter = getattr(settings, "CACHE_WARMER_JITTER", 0.2)
+        return interval * random.uniform(1 - jitter, 1)
+
+    def touch(self, personal_access_token, kind, camera_id=None):
+        """
+        Record that `personal_access_token` was just served a resource of `kind`
+        (see `REFRESHERS`), so it is kept warm from now on. Call it only after
+        the resource was fetched successfully.
+        """
+        if not getattr(settings, "CACHE_WARMER_ENABLED", True):
+            return
+        now = time.monotonic()
+        key = (token_digest(personal_access_token), kind, camera_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(
+                    personal_access_token, kind, camera_id, now, now + self._interval()
+                )
+            entry.last_active = now
+            self._entries.move_to_end(key)
+            while len(self._entries) > getattr(
+                settings, "CACHE_WARMER_MAX_ENTRIES", 4096
+            ):
+                self._entries.popitem(last=False)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="cache-warmer", daemon=True
+                )
+                self._thread.start()
+
+    def run_pending(self, now=None):
+        """
+        Refresh every resource that is due, within the request budget.
+        """
+        now = time.monotonic() if now is None else now
+        window = getattr(settings, "CACHE_WARMER_ACTIVE_WINDOW", 600)
+        with self._lock:
+            if self._budget is None:
+                self._budget = RequestBudget(
+                    getattr(settings, "CACHE_WARMER_BUDGET", 120)
+                )
+            budget = self._budget
+            for key in [
+                key
+                for key, entry in self._entries.items()
+                if now - entry.last_active > window
+            ]:
+                del self._entries[key]
+            due = sorted(
+                (
+                    (entry.due_at, key, entry)
+                    for key, entry in self._entries.items()
+                    if entry.due_at <= now
+                ),
+                key=lambda item: item[0],
+            )
+
+        for index, (_, key, entry) in enumerate(due):
+            with self._lock:
+                if self._entries.get(key) is not entry:
+                    continue
+            if not budget.acquire(now):
+                with self._lock:
+                    self._stats["postponed"] += len(due) - index
+                return
+            if self._refresh(key, entry) and entry.kind in REQUEST_COUNTS:
+                count = REQUEST_COUNTS[entry.kind](entry.personal_access_token)
+                budget.charge(now, count - 1)
+            entry.due_at = now + self._interval()
+
+    def _refresh(self, key, entry):
+        """
+        Refresh one resource. Returns whether the refresh succeeded.
+        """
+        try:
+            _, error_response = REFRESHERS[entry.kind](
+                entry.personal_access_token, entry.camera_id
+            )
+        except Exception:
+            logger.warning("Refreshing %s failed", entry.kind, exc_info=True)
+            error_response = None
+            outcome = "failed"
+        else:
+            outcome = "failed" if error_response is not None else "refreshed"
+        with self._lock:
+            self._stats[outcome] += 1
+            if (
+                error_response is not None
+                and error_response.status_code in FATAL_STATUSES
+            ):
+                token = key[0]
+                for other in [other for other in self._entries if other[0] == token]:
+                    del self._entries[other]
+        return outcome == "refreshed"
+
+    def _run(self):
+        tick = getattr(settings, "CACHE_WARMER_TICK", 1)
+        while not self._stop.wait(tick):
+            try:
+                self.run_pending()
+            except Exception:
+                logger.exception("Cache warmer pass failed")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._budget = None
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
+
+
+warmer = CacheWarmer()
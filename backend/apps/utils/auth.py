@@ -1,15 +1,28 @@
 from functools import wraps
+from asgiref.sync import iscoroutinefunction
 from django.http import JsonResponse
 from rest_framework import status
 
 
+def _unauthorized():
+    return JsonResponse({"error": "Unauthorized"}, status=status.HTTP_401_UNAUTHORIZED)
+
+
 def require_personal_access_token(view_func):
+    if iscoroutinefunction(view_func):
+
+        @wraps(view_func)
+        async def _async_wrapped_view(request, *args, **kwargs):
+            if not hasattr(request, "personal_access_token"):
+                return _unauthorized()
+            return await view_func(request, *args, **kwargs)
+
+        return _async_wrapped_view
+
     @wraps(view_func)
     def _wrapped_view(request, *args, **kwargs):
         if not hasattr(request, "personal_access_token"):
-            return JsonResponse(
-                {"error": "Unauthorized"}, status=status.HTTP_401_UNAUTHORIZED
-            )
+            return _unauthorized()
         return view_func(request, *args, **kwargs)
 
     return _wrapped_view
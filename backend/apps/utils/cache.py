@@ -0,0 +1,92 @@
+import hashlib
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+_caches = weakref.WeakSet()
+
+
+def register_cache(cache):
+    """
+    Register an object with a `clear()` method so that `clear_all_caches` empties it.
+    """
+    _caches.add(cache)
+
+
+def token_digest(token):
+    """
+    Return a stable digest of a token so raw credentials are never used as cache keys.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory cache with per-entry expiry and LRU eviction.
+
+    Parameters:
+        - maxsize (int): Maximum number of entries kept before the least recently used one is evicted.
+        - ttl (float): Default lifetime of an entry in seconds.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        register_cache(self)
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self._stats["misses"] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Store `value` under `key`. A `ttl` of zero or less means the value is not cached.
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, size=len(self._entries))
+
+
+def clear_all_caches():
+    """
+    Empty every `TTLCache` and registered cache in the process, e.g. between tests.
+    """
+    for cache in list(_caches):
+        cache.clear()
@@ -0,0 +1,235 @@
+import gzip
+import logging
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_CONTENT_TYPES = ("application/json", "text/")
+DEFAULT_LEVELS = {"gzip": 6, "br": 4, "zstd": 3}
+
+
+def is_compressible(content_type):
+    media_type = content_type.split(";", 1)[0].strip()
+    return media_type.startswith(COMPRESSIBLE_CONTENT_TYPES) or media_type.endswith(
+        "+json"
+    )
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    @staticmethod
+    def compress(data, level):
+        return gzip.compress(data, compresslevel=level, mtime=0)
+
+    class Stream:
+        def __init__(self, level):
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+        def chunk(self, data):
+            return self._compressor.compress(data) + self._compressor.flush(
+                zlib.Z_SYNC_FLUSH
+            )
+
+        def finish(self):
+            return self._compressor.flush()
+
+
+class BrotliEncoder:
+    name = "br"
+
+    @staticmethod
+    def compress(data, level):
+        return brotli.compress(data, quality=level)
+
+    class Stream:
+        def __init__(self, level):
+            self._compressor = brotli.Compressor(quality=level)
+
+        def chunk(self, data):
+            return self._compressor.process(data) + self._compressor.flush()
+
+        def finish(self):
+            return self._compressor.finish()
+
+
+class ZstdEncoder:
+    name = "zstd"
+
+    @staticmethod
+    def compress(data, level):
+        return zstandard.ZstdCompressor(level=level).compress(data)
+
+    class Stream:
+        def __init__(self, level):
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+        def chunk(self, data):
+            return self._compressor.compress(data) + self._compressor.flush(
+                zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            )
+
+        def finish(self):
+            return self._compressor.flush()
+
+
+ENCODERS = {GzipEncoder.name: GzipEncoder}
+if brotli is not None:
+    ENCODERS[BrotliEncoder.name] = BrotliEncoder
+if zstandard is not None:
+    ENCODERS[ZstdEncoder.name] = ZstdEncoder
+
+
+def accepted_encodings(header):
+    """
+    Parse an Accept-Encoding header into ``{coding: q}``.
+    """
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate_encoding(header, preferred):
+    """
+    Pick the content coding for a response.
+
+    Codings the client rates higher win; ties are broken by the server's
+    `preferred` order. Codings whose library is not installed are skipped.
+
+    Returns:
+        - str: The chosen coding, or None to send the response uncompressed.
+    """
+    accepted = accepted_encodings(header)
+    candidates = []
+    for rank, coding in enumerate(preferred):
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if coding in ENCODERS and q > 0:
+            candidates.append((-q, rank, coding))
+    return min(candidates)[2] if candidates else None
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress API responses with zstd, brotli or gzip, as negotiated through the
+    request's Accept-Encoding header.
+
+    Only JSON (including ``+json`` media types) and text responses under
+    ``COMPRESSION_PREFIXES`` are compressed, and regular responses only when they
+    are at least ``COMPRESSION_MIN_SIZE`` bytes and actually shrink. Streaming responses are compressed chunk by chunk
+    and flushed after every chunk so they keep arriving incrementally. Like
+    Django's GZipMiddleware, strong ETags are weakened on compressed responses,
+    which keeps `If-None-Match` working through the weak comparison.
+
+    brotli and zstd require the ``brotli`` and ``zstandard`` packages listed in
+    requirements.txt; a warning is logged at startup when either is missing.
+
+    Settings:
+        - COMPRESSION_PREFIXES (list): Path prefixes whose responses are compressed.
+        - COMPRESSION_MIN_SIZE (int): Smallest body in bytes worth compressing.
+        - COMPRESSION_ENCODINGS (list): Supported codings in order of preference.
+        - COMPRESSION_LEVELS (dict): Compression level per coding.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        missing = [
+            package
+            for package, module in (("brotli", brotli), ("zstandard", zstandard))
+            if module is None
+        ]
+        if missing:
+            logger.warning(
+                "%s not installed, responses are compressed with %s only",
+                " and ".join(missing),
+                ", ".join(ENCODERS),
+            )
+
+    def process_response(self, request, response):
+        prefixes = tuple(getattr(settings, "COMPRESSION_PREFIXES", ("/api/",)))
+        if not request.path_info.startswith(prefixes):
+            return response
+        if response.has_header("Content-Encoding"):
+            return response
+        if not is_compressible(response.get("Content-Type", "")):
+            return response
+        if not response.streaming and len(response.content) < getattr(
+            settings, "COMPRESSION_MIN_SIZE", 512
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = negotiate_encoding(
+            request.headers.get("Accept-Encoding", ""),
+            getattr(settings, "COMPRESSION_ENCODINGS", ("zstd", "br", "gzip")),
+        )
+        if coding is None:
+            return response
+        encoder = ENCODERS[coding]
+        levels = getattr(settings, "COMPRESSION_LEVELS", DEFAULT_LEVELS)
+        level = levels.get(coding, DEFAULT_LEVELS[coding])
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self._compress_async_stream(
+                    response.streaming_content, encoder.Stream(level)
+                )
+            else:
+                response.streaming_content = self._compress_stream(
+                    response.streaming_content, encoder.Stream(level)
+                )
+            del response["Content-Length"]
+        else:
+            compressed = encoder.compress(response.content, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = coding
+        return response
+
+    @staticmethod
+    def _compress_stream(content, stream):
+        for chunk in content:
+            compressed = stream.chunk(chunk)
+            if compressed:
+                yield compressed
+        yield stream.finish()
+
+    @staticmethod
+    async def _compress_async_stream(content, stream):
+        async for chunk in content:
+            compressed = stream.chunk(chunk)
+            if compressed:
+                yield compressed
+        yield stream.finish()
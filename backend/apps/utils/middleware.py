@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+from django.http import JsonResponse
+from django.utils.deprecation import MiddlewareMixin
+
+from .resilience import UpstreamError
+
+
+def is_lean_request(request):
+    """
+    Return True if the request targets a route that only needs the lean pipeline.
+
+    Settings:
+        - LEAN_MIDDLEWARE_PREFIXES (list): Path prefixes served without the
+          session/CSRF/auth/messages/clickjacking middleware, e.g. ``["/api/"]``.
+    """
+    return request.path_info.startswith(
+        tuple(getattr(settings, "LEAN_MIDDLEWARE_PREFIXES", ()))
+    )
+
+
+class RouteAwareMiddlewareMixin:
+    """
+    Route-aware dispatch for the Django contrib middleware.
+
+    Requests under ``LEAN_MIDDLEWARE_PREFIXES`` are handed straight to the next
+    middleware, so the token-authenticated API skips the session lookup, CSRF
+    checks, user loading and message storage entirely, while ``/admin/`` keeps
+    the full pipeline. Subclassing the original middleware keeps the admin
+    system checks and the handler's `process_view` wiring intact.
+    """
+
+    def __call__(self, request):
+        if is_lean_request(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class RouteAwareSessionMiddleware(RouteAwareMiddlewareMixin, SessionMiddleware):
+    pass
+
+
+class RouteAwareCsrfViewMiddleware(RouteAwareMiddlewareMixin, CsrfViewMiddleware):
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if is_lean_request(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class RouteAwareAuthenticationMiddleware(
+    RouteAwareMiddlewareMixin, AuthenticationMiddleware
+):
+    pass
+
+
+class RouteAwareMessageMiddleware(RouteAwareMiddlewareMixin, MessageMiddleware):
+    pass
+
+
+class RouteAwareXFrameOptionsMiddleware(
+    RouteAwareMiddlewareMixin, XFrameOptionsMiddleware
+):
+    pass
+
+
+class UpstreamErrorMiddleware(MiddlewareMixin):
+    """
+    Turn upstream failures raised by the views into a clear JSON response
+    instead of a 500: 503 with ``Retry-After`` while the host's circuit breaker
+    is open, 504 for timeouts and 502 for other transport errors. See
+    `apps.utils.upstream.UpstreamClient`.
+    """
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, UpstreamError):
+            return None
+        response = JsonResponse(
+            {"detail": exception.detail}, status=exception.status_code
+        )
+        if exception.retry_after is not None:
+            response["Retry-After"] = str(exception.retry_after)
+        return response
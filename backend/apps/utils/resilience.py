@@ -0,0 +1,219 @@
+import collections
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+from .cache import register_cache
+
+# Upstream responses that mean the host, not the request, is in trouble. They are
+# retried (for GETs) and count as circuit breaker failures.
+UNAVAILABLE_STATUSES = (502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class UpstreamError(Exception):
+    """
+    An upstream call that could not be completed. Mapped to an HTTP response by
+    `apps.utils.middleware.UpstreamErrorMiddleware`.
+    """
+
+    status_code = 502
+    detail = "Upstream service request failed"
+
+    def __init__(self, host, retry_after=None):
+        super().__init__(host)
+        self.host = host
+        self.retry_after = retry_after
+
+
+class UpstreamTimeout(UpstreamError):
+    status_code = 504
+    detail = "Upstream service timed out"
+
+
+class UpstreamUnavailable(UpstreamError):
+    """
+    Raised without contacting the host while its circuit breaker is open.
+    """
+
+    status_code = 503
+    detail = "Upstream service unavailable"
+
+
+def host_of(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def timeout_for(url):
+    """
+    Return the ``(connect, read)`` timeout for an upstream URL.
+
+    The first entry of ``UPSTREAM_ENDPOINT_TIMEOUTS`` whose key is contained in
+    the URL wins; otherwise ``UPSTREAM_CONNECT_TIMEOUT`` and
+    ``UPSTREAM_READ_TIMEOUT`` apply.
+    """
+    for fragment, timeout in getattr(
+        settings, "UPSTREAM_ENDPOINT_TIMEOUTS", {}
+    ).items():
+        if fragment in url:
+            return tuple(timeout)
+    return (
+        getattr(settings, "UPSTREAM_CONNECT_TIMEOUT", 3.05),
+        getattr(settings, "UPSTREAM_READ_TIMEOUT", 10),
+    )
+
+
+def backoff_delay(attempt):
+    """
+    Full-jitter exponential backoff before retry number `attempt` (1-based).
+    """
+    base = getattr(settings, "UPSTREAM_RETRY_BACKOFF", 0.1)
+    cap = getattr(settings, "UPSTREAM_RETRY_BACKOFF_MAX", 2)
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class RetryBudget:
+    """
+    Bound retries to a fraction of the traffic.
+
+    Every request deposits ``UPSTREAM_RETRY_BUDGET_RATIO`` of a retry and every
+    retry withdraws a whole one, so during an outage retries add at most that
+    fraction to the upstream load instead of multiplying it. A reserve of
+    ``UPSTREAM_RETRY_BUDGET_MIN`` retries keeps low-traffic processes able to
+    retry at all.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._balance = None
+        register_cache(self)
+
+    def _reserve(self):
+        return getattr(settings, "UPSTREAM_RETRY_BUDGET_MIN", 10)
+
+    def deposit(self):
+        ratio = getattr(settings, "UPSTREAM_RETRY_BUDGET_RATIO", 0.1)
+        reserve = self._reserve()
+        with self._lock:
+            balance = reserve if self._balance is None else self._balance
+            self._balance = min(balance + ratio, reserve)
+
+    def withdraw(self):
+        with self._lock:
+            if self._balance is None:
+                self._balance = self._reserve()
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._balance = None
+
+
+class CircuitBreaker:
+    """
+    Fail fast while a host is down.
+
+    After ``UPSTREAM_BREAKER_FAILURES`` consecutive failures (connection errors,
+    timeouts or an `UNAVAILABLE_STATUSES` response) the breaker opens and calls
+    raise `UpstreamUnavailable` immediately. After
+    ``UPSTREAM_BREAKER_RESET_TIMEOUT`` seconds a single trial call is let
+    through; its success closes the breaker again, its failure reopens it. A
+    trial that ends without an outcome, e.g. because it was cancelled, is
+    `release`d so that the next call becomes the trial.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, host):
+        self.host = host
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        reset_timeout = getattr(settings, "UPSTREAM_BREAKER_RESET_TIMEOUT", 30)
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            remaining = self.opened_at + reset_timeout - time.monotonic()
+            if self.state == self.OPEN and remaining <= 0:
+                self.state = self.HALF_OPEN
+                return
+            raise UpstreamUnavailable(self.host, retry_after=max(1, round(remaining)))
+
+    def record(self, success):
+        with self._lock:
+            if success:
+                self.state = self.CLOSED
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= getattr(
+                settings, "UPSTREAM_BREAKER_FAILURES", 5
+            ):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
+
+class CircuitBreakers:
+    """
+    The circuit breakers of the process, one per upstream host.
+
+    Recording hosts come from client input, so at most
+    ``UPSTREAM_BREAKER_MAX_HOSTS`` breakers are kept. Beyond that, the least
+    recently used healthy breaker (closed, without failures) is dropped, or the
+    least recently used one if none is healthy.
+    """
+
+    def __init__(self):
+        self._breakers = collections.OrderedDict()
+        self._lock = threading.Lock()
+        register_cache(self)
+
+    def for_url(self, url):
+        host = host_of(url)
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(host)
+            self._breakers.move_to_end(host)
+            while len(self._breakers) > getattr(
+                settings, "UPSTREAM_BREAKER_MAX_HOSTS", 256
+            ):
+                evicted = next(
+                    (
+                        other
+                        for other, candidate in self._breakers.items()
+                        if other != host
+                        and candidate.state == CircuitBreaker.CLOSED
+                        and not candidate.failures
+                    ),
+                    next(iter(self._breakers)),
+                )
+                del self._breakers[evicted]
+            return breaker
+
+    def states(self):
+        with self._lock:
+            return {host: breaker.state for host, breaker in self._breakers.items()}
+
+    def clear(self):
+        with self._lock:
+            self._breakers.clear()
+
+
+breakers = CircuitBreakers()
+retry_budget = RetryBudget()
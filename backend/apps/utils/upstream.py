@@ -0,0 +1,345 @@
+import asyncio
+import threading
+import time
+import weakref
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from .cache import token_digest
+from .resilience import (
+    IDEMPOTENT_METHODS,
+    UNAVAILABLE_STATUSES,
+    UpstreamError,
+    UpstreamTimeout,
+    backoff_delay,
+    breakers,
+    host_of,
+    retry_budget,
+    timeout_for,
+)
+from .singleflight import SingleFlight
+
+
+def auth_headers(personal_access_token):
+    """
+    Build the Authorization header AngelCam expects for a Personal Access Token.
+    """
+    return {"Authorization": f"PersonalAccessToken {personal_access_token}"}
+
+
+class _HostPool:
+    """
+    A keep-alive session dedicated to a single upstream host.
+    """
+
+    def __init__(self, pool_maxsize):
+        self.session = requests.Session()
+        # The session is shared by every user of the process, so upstream cookies
+        # must never be stored and replayed on behalf of another token.
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.last_used = time.monotonic()
+
+    def close(self):
+        self.session.close()
+
+
+def should_retry(method, attempt, response):
+    """
+    Decide whether a failed attempt (`response` is None after a transport error)
+    is retried; a retry spends one unit of the retry budget.
+    """
+    if method not in IDEMPOTENT_METHODS:
+        return False
+    if response is not None and response.status_code not in UNAVAILABLE_STATUSES:
+        return False
+    if attempt >= getattr(settings, "UPSTREAM_MAX_RETRIES", 2):
+        return False
+    return retry_budget.withdraw()
+
+
+class UpstreamClient:
+    """
+    Shared HTTP client for AngelCam and the per-recording stream domains.
+
+    Every upstream host (``ANGEL_CAM_BASE_URL`` as well as each
+    ``https://{domain}/`` recording host) gets its own keep-alive connection
+    pool, so repeated calls reuse established TCP/TLS connections instead of
+    handshaking on every request. Pools that stay idle for longer than
+    ``pool_idle_timeout`` seconds are closed and evicted.
+
+    Identical GETs issued concurrently for the same token are coalesced: only
+    the first one reaches upstream and the others receive the same response
+    once it has been read.
+
+    Every request gets the connect and read timeout of its endpoint (see
+    `resilience.timeout_for`) unless the caller passes one. Idempotent requests
+    that fail to connect, time out or get a 502/503/504 are retried up to
+    ``UPSTREAM_MAX_RETRIES`` times with jittered exponential backoff, as long as
+    the process-wide `resilience.RetryBudget` allows. Each host has a
+    `resilience.CircuitBreaker`; while it is open, requests raise
+    `UpstreamUnavailable` without touching the network. Transport failures
+    that remain after retrying raise `UpstreamTimeout` or `UpstreamError`; any
+    other exception is not retried, but still counts as a breaker failure.
+
+    Settings:
+        - UPSTREAM_POOL_MAXSIZE (int): Connections kept alive per upstream host.
+        - UPSTREAM_POOL_IDLE_TIMEOUT (float): Seconds before an idle host pool is evicted.
+        - UPSTREAM_COALESCE_GETS (bool): Share in-flight responses between identical GETs.
+        - UPSTREAM_MAX_RETRIES (int): Retries of a failed idempotent request.
+    """
+
+    def __init__(self, pool_maxsize=None, pool_idle_timeout=None):
+        if pool_maxsize is None:
+            pool_maxsize = getattr(settings, "UPSTREAM_POOL_MAXSIZE", 10)
+        if pool_idle_timeout is None:
+            pool_idle_timeout = getattr(settings, "UPSTREAM_POOL_IDLE_TIMEOUT", 90)
+        self.pool_maxsize = pool_maxsize
+        self.pool_idle_timeout = pool_idle_timeout
+        self._pools = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._in_flight = SingleFlight()
+
+    def _pool_for(self, url):
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            pool = self._pools.get(host)
+            if pool is None:
+                pool = _HostPool(self.pool_maxsize)
+                self._pools[host] = pool
+                self._stats["misses"] += 1
+            else:
+                self._stats["hits"] += 1
+            pool.last_used = now
+            return pool
+
+    def _evict_idle(self, now):
+        expired = [
+            host
+            for host, pool in self._pools.items()
+            if now - pool.last_used > self.pool_idle_timeout
+        ]
+        for host in expired:
+            self._pools.pop(host).close()
+            self._stats["evictions"] += 1
+
+    def request(self, method, url, personal_access_token=None, headers=None, **kwargs):
+        """
+        Send a request through the keep-alive pool of the target host.
+
+        Parameters:
+            - method (str): The HTTP method.
+            - url (str): The absolute upstream URL.
+            - personal_access_token (str): Optional token used to build the Authorization header.
+            - headers (dict): Optional extra request headers.
+
+        Returns:
+            - requests.Response: The upstream response.
+        """
+        request_headers = {}
+        if personal_access_token is not None:
+            request_headers.update(auth_headers(personal_access_token))
+        if headers:
+            request_headers.update(headers)
+        key = self._coalescing_key(method, url, personal_access_token, headers, kwargs)
+        if key is None:
+            return self._send(method, url, request_headers, kwargs)
+        return self._in_flight.do(
+            key, lambda: self._send(method, url, request_headers, kwargs, read=True)
+        )
+
+    def _send(self, method, url, headers, kwargs, read=False):
+        kwargs = dict(kwargs)
+        kwargs.setdefault("timeout", timeout_for(url))
+        breaker = breakers.for_url(url)
+        retry_budget.deposit()
+        attempt = 0
+        while True:
+            breaker.before_call()
+            pool = self._pool_for(url)
+            try:
+                response = pool.session.request(method, url, headers=headers, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as error:
+                breaker.record(False)
+                response, failure = None, error
+            except Exception:
+                breaker.record(False)
+                raise
+            except BaseException:
+                breaker.release()
+                raise
+            else:
+                breaker.record(response.status_code not in UNAVAILABLE_STATUSES)
+                failure = None
+            if not should_retry(method, attempt, response):
+                break
+            attempt += 1
+            if response is not None:
+                response.close()
+            time.sleep(backoff_delay(attempt))
+
+        if failure is not None:
+            error_class = (
+                UpstreamTimeout
+                if isinstance(failure, requests.Timeout)
+                else UpstreamError
+            )
+            raise error_class(host_of(url)) from failure
+        if read:
+            # Load the body before the response is handed to other callers.
+            response.content
+        return response
+
+    @staticmethod
+    def _coalescing_key(method, url, personal_access_token, headers, kwargs):
+        """
+        Return the key identifying an upstream GET, or None if it must not be shared.
+        """
+        if method != "GET" or not getattr(settings, "UPSTREAM_COALESCE_GETS", True):
+            return None
+        if set(kwargs) - {"params"}:
+            return None
+        prepared_url = (
+            requests.Request(method, url, params=kwargs.get("params")).prepare().url
+        )
+        return (
+            token_digest(personal_access_token or ""),
+            method,
+            prepared_url,
+            tuple(sorted((headers or {}).items())),
+        )
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def stats(self):
+        """
+        Return the pool hit/miss/eviction counters, the number of GETs collapsed
+        into an in-flight request and the currently pooled hosts.
+        """
+        collapsed = self._in_flight.stats()["collapsed"]
+        with self._lock:
+            return dict(self._stats, collapsed=collapsed, hosts=sorted(self._pools))
+
+    def close(self):
+        with self._lock:
+            for pool in self._pools.values():
+                pool.close()
+            self._pools.clear()
+
+
+class AsyncUpstreamClient:
+    """
+    Non-blocking counterpart of `UpstreamClient` used by the async views.
+
+    Wraps one ``httpx.AsyncClient`` per running event loop; the httpx client keeps
+    its own per-host keep-alive pools, so a single process can hold thousands of
+    in-flight upstream calls without tying up a worker thread for each of them.
+
+    Settings:
+        - UPSTREAM_ASYNC_MAX_CONNECTIONS (int): Concurrent upstream connections per event loop.
+        - UPSTREAM_POOL_IDLE_TIMEOUT (float): Seconds an idle keep-alive connection is kept.
+    """
+
+    def __init__(self, max_connections=None, pool_idle_timeout=None):
+        if max_connections is None:
+            max_connections = getattr(settings, "UPSTREAM_ASYNC_MAX_CONNECTIONS", 1000)
+        if pool_idle_timeout is None:
+            pool_idle_timeout = getattr(settings, "UPSTREAM_POOL_IDLE_TIMEOUT", 90)
+        self.max_connections = max_connections
+        self.pool_idle_timeout = pool_idle_timeout
+        self._clients = weakref.WeakKeyDictionary()
+
+    def _client(self):
+        loop = asyncio.get_running_loop()
+        http_client = self._clients.get(loop)
+        if http_client is None:
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=self.pool_idle_timeout,
+            )
+            http_client = httpx.AsyncClient(
+                limits=limits,
+                timeout=None,
+                cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+            )
+            self._clients[loop] = http_client
+        return http_client
+
+    async def request(
+        self, method, url, personal_access_token=None, headers=None, **kwargs
+    ):
+        """
+        Send a request without blocking the event loop.
+
+        Accepts the same arguments as `UpstreamClient.request`, applies the same
+        timeouts, retries and circuit breakers, and returns an ``httpx.Response``,
+        which exposes the same `status_code` and `json()` API.
+        """
+        request_headers = {}
+        if personal_access_token is not None:
+            request_headers.update(auth_headers(personal_access_token))
+        if headers:
+            request_headers.update(headers)
+        if "timeout" not in kwargs:
+            connect, read = timeout_for(url)
+            kwargs["timeout"] = httpx.Timeout(read, connect=connect)
+        breaker = breakers.for_url(url)
+        retry_budget.deposit()
+        attempt = 0
+        while True:
+            breaker.before_call()
+            try:
+                response = await self._client().request(
+                    method, url, headers=request_headers, **kwargs
+                )
+            except httpx.TransportError as error:
+                breaker.record(False)
+                response, failure = None, error
+            except Exception:
+                breaker.record(False)
+                raise
+            except BaseException:
+                breaker.release()
+                raise
+            else:
+                breaker.record(response.status_code not in UNAVAILABLE_STATUSES)
+                failure = None
+            if not should_retry(method, attempt, response):
+                break
+            attempt += 1
+            await asyncio.sleep(backoff_delay(attempt))
+
+        if failure is not None:
+            error_class = (
+                UpstreamTimeout
+                if isinstance(failure, httpx.TimeoutException)
+                else UpstreamError
+            )
+            raise error_class(host_of(url)) from failure
+        return response
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+
+client = UpstreamClient()
+async_client = AsyncUpstreamClient()
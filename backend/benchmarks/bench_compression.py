@@ -0,0 +1,75 @@
+"""
+Show the CPU-versus-bytes tradeoff of the response codings offered by
+`apps.utils.compression.CompressionMiddleware` on the payloads the API returns:
+a camera list and a day of timeline segments in the regular and compact formats.
+
+Usage (from the backend directory):
+    python benchmarks/bench_compression.py [--cameras 200] [--segments 1440] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import django  # noqa: E402
+
+django.setup()
+
+from apps.cameras.timeline import compact_values, parse_upstream_timeline  # noqa: E402
+from apps.utils.compression import ENCODERS  # noqa: E402
+from payloads import camera_list, timeline  # noqa: E402
+
+LEVELS = {"gzip": (1, 6, 9), "br": (1, 4, 6, 11), "zstd": (1, 3, 9, 19)}
+
+
+def run(name, body, repeat):
+    print(f"{name}: {len(body):,} bytes uncompressed")
+    for coding, encoder in ENCODERS.items():
+        for level in LEVELS[coding]:
+            compressed = encoder.compress(body, level)
+            seconds = min(
+                timeit.repeat(
+                    lambda: encoder.compress(body, level), number=1, repeat=repeat
+                )
+            )
+            print(
+                f"  {coding:<5} level {level:>2}  {len(compressed):>9,} bytes  "
+                f"x{len(body) / len(compressed):5.1f}  {seconds * 1000:8.2f} ms  "
+                f"{len(body) / seconds / 1e6:8.1f} MB/s"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cameras", type=int, default=200)
+    parser.add_argument("--segments", type=int, default=1440)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    missing = sorted(set(LEVELS) - set(ENCODERS))
+    if missing:
+        print(f"Not installed, skipped: {', '.join(missing)}\n")
+
+    run(
+        f"camera list ({args.cameras})",
+        json.dumps(camera_list(args.cameras)).encode(),
+        args.repeat,
+    )
+    day = timeline(args.segments)
+    run(f"timeline ({args.segments})", json.dumps(day).encode(), args.repeat)
+    values = compact_values(parse_upstream_timeline(day))
+    compact = {"start": values[0], "end": values[1], "segments": values[2:]}
+    run(
+        f"compact timeline ({args.segments})",
+        json.dumps(compact).encode(),
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Measure the per-request overhead of the middleware stack on an `/api/` route,
+comparing the original full Django pipeline with the route-aware one from
+`apps.utils.middleware`.
+
+The request hits the timeline endpoint without parameters, so the view returns
+400 before any upstream call and the timing is dominated by the middleware.
+
+Usage (from the backend directory):
+    python benchmarks/bench_middleware.py [--requests 2000] [--repeat 5]
+"""
+import argparse
+import logging
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import django  # noqa: E402
+
+django.setup()
+
+import jwt  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+
+FULL_MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "apps.accounts.middleware.decode_token.DecodeTokenMiddleware",
+    "corsheaders.middleware.CorsMiddleware",
+    "django.middleware.common.CommonMiddleware",
+]
+
+
+def measure(middleware, path, headers, requests, repeat):
+    with override_settings(MIDDLEWARE=middleware, ALLOWED_HOSTS=["*"]):
+        client = Client()
+        assert client.get(path, headers=headers).status_code == 400
+        timings = timeit.repeat(
+            lambda: client.get(path, headers=headers), number=requests, repeat=repeat
+        )
+    return min(timings) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    app_token = jwt.encode(
+        {"personal_access_token": "benchmark"}, settings.SECRET_KEY, algorithm="HS256"
+    )
+    headers = {"Authorization": f"Bearer {app_token}"}
+    path = "/api/camera/1/recording/timeline/"
+
+    full = measure(FULL_MIDDLEWARE, path, headers, args.requests, args.repeat)
+    lean = measure(settings.MIDDLEWARE, path, headers, args.requests, args.repeat)
+    print(f"full pipeline   {full * 1e6:8.1f} us/request")
+    print(f"route-aware     {lean * 1e6:8.1f} us/request")
+    print(
+        f"saved           {(full - lean) * 1e6:8.1f} us/request ({1 - lean / full:.0%})"
+    )
+
+
+if __name__ == "__main__":
+    main()
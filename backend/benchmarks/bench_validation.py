@@ -0,0 +1,71 @@
+"""
+Compare DRF serializer validation with the compiled projections in
+`apps.cameras.fastpath` on representative upstream payloads.
+
+Usage (from the backend directory):
+    python benchmarks/bench_validation.py [--cameras 200] [--segments 1440] [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import django  # noqa: E402
+
+django.setup()
+
+from apps.cameras.serializers import (  # noqa: E402
+    CameraListResponseSerializer,
+    TimelineSerializer,
+)
+from apps.cameras.services import FAST_VALIDATORS  # noqa: E402
+from payloads import camera_list, fresh, timeline  # noqa: E402
+
+
+def drf(serializer_class, payload):
+    serializer = serializer_class(data=payload)
+    serializer.is_valid(raise_exception=True)
+    return serializer.data
+
+
+def run(name, serializer_class, payload, repeat):
+    fast = FAST_VALIDATORS[serializer_class]
+    assert fast(fresh(payload)) == drf(serializer_class, fresh(payload))
+
+    drf_time = min(
+        timeit.repeat(lambda: drf(serializer_class, payload), number=1, repeat=repeat)
+    )
+    fast_time = min(timeit.repeat(lambda: fast(payload), number=1, repeat=repeat))
+    print(
+        f"{name:<28} drf {drf_time * 1000:9.2f} ms   "
+        f"fast {fast_time * 1000:8.2f} ms   x{drf_time / fast_time:6.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cameras", type=int, default=200)
+    parser.add_argument("--segments", type=int, default=1440)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    run(
+        f"camera list ({args.cameras})",
+        CameraListResponseSerializer,
+        camera_list(args.cameras),
+        args.repeat,
+    )
+    run(
+        f"timeline ({args.segments})",
+        TimelineSerializer,
+        timeline(args.segments),
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
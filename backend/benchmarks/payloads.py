@@ -0,0 +1,95 @@
+"""
+Representative AngelCam payloads used by the benchmarks in this directory.
+"""
+import base64
+import copy
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+
+
+def signed(url, camera_id):
+    """
+    Append a signed-URL token shaped like AngelCam's: base64 JSON claims, a dot and
+    a per-URL signature, so that payload sizes and compressibility are realistic.
+    """
+    claims = json.dumps(
+        {
+            "camera_id": str(camera_id),
+            "device_id": str(camera_id),
+            "time": 1723369948105135 + camera_id,
+            "timeout": 120,
+        }
+    )
+    payload = base64.b64encode(claims.encode()).decode()
+    signature = hashlib.sha256(url.encode()).hexdigest()
+    return f"{url}?token={payload}%2E{signature}"
+
+
+def camera(camera_id):
+    host = f"https://m{camera_id % 7}-eu8.angelcam.com/cameras/{camera_id}"
+    return {
+        "id": camera_id,
+        "name": f"Camera {camera_id}",
+        "type": "h264",
+        "snapshot": {
+            "url": f"https://d1bkj0vwu8cp7q.cloudfront.net/snapshot/{camera_id}/20240811-092930.jpg",
+            "created_at": "2024-08-11T09:29:30Z",
+        },
+        "status": "online",
+        "live_snapshot": signed(f"{host}/snapshots/snapshot.jpg", camera_id),
+        "streams": [
+            {
+                "format": stream_format,
+                "url": signed(
+                    f"{host}/streams/{stream_format}/stream.{extension}", camera_id
+                ),
+            }
+            for stream_format, extension in (
+                ("mjpeg", "mjpeg"),
+                ("mp4", "mp4"),
+                ("mpegts", "ts"),
+                ("hls", "m3u8"),
+            )
+        ],
+        "applications": [{"code": "CRA"}],
+        "owner": {
+            "email": "hiring@angelcam.com",
+            "first_name": "Angelcam",
+            "last_name": "Hiring",
+        },
+        "has_recording": True,
+        "has_notifications": False,
+        "audio_enabled": True,
+        "low_latency_enabled": True,
+    }
+
+
+def camera_list(count):
+    return {
+        "count": count,
+        "next": None,
+        "previous": None,
+        "results": [camera(112000 + index) for index in range(count)],
+    }
+
+
+def timeline(segments, start=datetime(2024, 8, 9, tzinfo=timezone.utc)):
+    def iso(value):
+        return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    return {
+        "start": iso(start),
+        "end": iso(start + timedelta(minutes=segments)),
+        "segments": [
+            {
+                "start": iso(start + timedelta(minutes=index)),
+                "end": iso(start + timedelta(minutes=index, seconds=50)),
+            }
+            for index in range(segments)
+        ],
+    }
+
+
+def fresh(payload):
+    return copy.deepcopy(payload)
@@ -1,15 +1,35 @@
 import os
+import shutil
+import tempfile
 import pytest
 import django
 from django.conf import settings
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+# `clear_all_caches` empties the HLS segment cache directory, so never let the
+# tests point it at a real cache.
+os.environ["HLS_SEGMENT_CACHE_DIR"] = tempfile.mkdtemp(prefix="angelcam-hls-tests-")
 django.setup()
 
 
+@pytest.fixture(scope="session", autouse=True)
+def segment_cache_dir():
+    yield
+    shutil.rmtree(os.environ["HLS_SEGMENT_CACHE_DIR"], ignore_errors=True)
+
+
 @pytest.fixture(scope="session")
 def django_db_setup():
     settings.DATABASES["default"] = {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": ":memory:",
     }
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    from apps.utils.cache import clear_all_caches
+
+    clear_all_caches()
+    yield
+    clear_all_caches()
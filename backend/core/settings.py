@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 import os
+import tempfile
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -59,17 +60,23 @@ INSTALLED_APPS = [
     "apps.cameras",
 ]
 
+# The session/CSRF/auth/messages/clickjacking middleware are skipped for requests
+# under LEAN_MIDDLEWARE_PREFIXES; the token-authenticated API only needs CORS and
+# DecodeTokenMiddleware. See apps.utils.middleware.
+LEAN_MIDDLEWARE_PREFIXES = ["/api/"]
+
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
-    "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
-    "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "apps.accounts.middleware.decode_token.DecodeTokenMiddleware",
+    "apps.utils.compression.CompressionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "apps.utils.middleware.RouteAwareSessionMiddleware",
+    "apps.utils.middleware.RouteAwareCsrfViewMiddleware",
+    "apps.utils.middleware.RouteAwareAuthenticationMiddleware",
+    "apps.utils.middleware.RouteAwareMessageMiddleware",
+    "apps.utils.middleware.RouteAwareXFrameOptionsMiddleware",
+    "apps.accounts.middleware.decode_token.DecodeTokenMiddleware",
+    "apps.utils.middleware.UpstreamErrorMiddleware",
 ]
 
 ROOT_URLCONF = "core.urls"
@@ -155,3 +162,129 @@ STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 PERSONAL_ACCESS_TOKEN = os.getenv("PERSONAL_ACCESS_TOKEN")
 ANGEL_CAM_BASE_URL = os.getenv("ANGEL_CAM_BASE_URL")
+
+# Keep-alive connection pools used for every AngelCam / recording-domain call.
+UPSTREAM_POOL_MAXSIZE = int(os.getenv("UPSTREAM_POOL_MAXSIZE", 10))
+UPSTREAM_POOL_IDLE_TIMEOUT = float(os.getenv("UPSTREAM_POOL_IDLE_TIMEOUT", 90))
+UPSTREAM_ASYNC_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_ASYNC_MAX_CONNECTIONS", 1000))
+
+# Per-token cache of validated camera list / camera detail responses. Entries never
+# outlive the shortest signed URL they contain (minus SIGNED_URL_EXPIRY_MARGIN seconds).
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", 30))
+RESPONSE_CACHE_MAXSIZE = int(os.getenv("RESPONSE_CACHE_MAXSIZE", 1024))
+SIGNED_URL_EXPIRY_MARGIN = float(os.getenv("SIGNED_URL_EXPIRY_MARGIN", 15))
+
+# Incremental per-camera timeline cache. Segments newer than TIMELINE_MUTABLE_WINDOW
+# seconds are treated as still recording and always re-fetched.
+TIMELINE_CACHE_TTL = float(os.getenv("TIMELINE_CACHE_TTL", 3600))
+TIMELINE_CACHE_MAXSIZE = int(os.getenv("TIMELINE_CACHE_MAXSIZE", 512))
+TIMELINE_MUTABLE_WINDOW = float(os.getenv("TIMELINE_MUTABLE_WINDOW", 300))
+TIMELINE_MAX_MISSING_RANGES = int(os.getenv("TIMELINE_MAX_MISSING_RANGES", 4))
+
+# Validate hot upstream payloads with the compiled projections in apps.cameras.fastpath
+# before falling back to the DRF serializers.
+FAST_PATH_VALIDATION = os.getenv("FAST_PATH_VALIDATION", "true").lower() == "true"
+
+# Cache of verified application JWTs used by DecodeTokenMiddleware.
+JWT_CACHE_ENABLED = os.getenv("JWT_CACHE_ENABLED", "true").lower() == "true"
+JWT_CACHE_MAXSIZE = int(os.getenv("JWT_CACHE_MAXSIZE", 4096))
+JWT_CACHE_TTL = float(os.getenv("JWT_CACHE_TTL", 300))
+
+# Recently verified Personal Access Tokens accepted by LoginView without calling
+# /v1/me/ again. PAT_CACHE_TTL bounds how long a revoked token can still log in.
+PAT_CACHE_MAXSIZE = int(os.getenv("PAT_CACHE_MAXSIZE", 4096))
+PAT_CACHE_TTL = float(os.getenv("PAT_CACHE_TTL", 60))
+
+# Concurrent identical upstream GETs (same token, URL and params) share one request.
+UPSTREAM_COALESCE_GETS = os.getenv("UPSTREAM_COALESCE_GETS", "true").lower() == "true"
+
+# Worker threads fetching the remaining camera list pages for `?all=true`.
+CAMERA_LIST_MAX_WORKERS = int(os.getenv("CAMERA_LIST_MAX_WORKERS", 4))
+
+# /api/cameras/batch: maximum ids per request and concurrent upstream calls.
+CAMERA_BATCH_MAX_IDS = int(os.getenv("CAMERA_BATCH_MAX_IDS", 50))
+CAMERA_BATCH_MAX_WORKERS = int(os.getenv("CAMERA_BATCH_MAX_WORKERS", 8))
+
+# Timeline window (seconds before recording_end) returned by the camera page endpoint.
+CAMERA_PAGE_TIMELINE_WINDOW = float(os.getenv("CAMERA_PAGE_TIMELINE_WINDOW", 23 * 3600))
+
+# Negotiated response compression for API routes, see apps.utils.compression.
+# "br" and "zstd" are only offered when the brotli / zstandard packages are installed.
+COMPRESSION_PREFIXES = ["/api/"]
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 512))
+COMPRESSION_ENCODINGS = os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",")
+COMPRESSION_LEVELS = {
+    "gzip": int(os.getenv("COMPRESSION_GZIP_LEVEL", 6)),
+    "br": int(os.getenv("COMPRESSION_BROTLI_LEVEL", 4)),
+    "zstd": int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3)),
+}
+
+# Snapshot proxy: thumbnail widths, JPEG quality and the size-bounded memory / disk cache.
+SNAPSHOT_WIDTHS = [
+    int(width) for width in os.getenv("SNAPSHOT_WIDTHS", "160,320,640").split(",")
+]
+SNAPSHOT_JPEG_QUALITY = int(os.getenv("SNAPSHOT_JPEG_QUALITY", 80))
+SNAPSHOT_MAX_AGE = int(os.getenv("SNAPSHOT_MAX_AGE", 60))
+SNAPSHOT_CACHE_MEMORY_BYTES = int(
+    os.getenv("SNAPSHOT_CACHE_MEMORY_BYTES", 64 * 1024**2)
+)
+SNAPSHOT_CACHE_DIR = os.getenv("SNAPSHOT_CACHE_DIR")
+SNAPSHOT_CACHE_DISK_BYTES = int(os.getenv("SNAPSHOT_CACHE_DISK_BYTES", 512 * 1024**2))
+
+# MJPEG relay: frames buffered per camera, upstream read size and the time a viewer
+# waits for a new frame before the stream is ended.
+MJPEG_RING_SIZE = int(os.getenv("MJPEG_RING_SIZE", 8))
+MJPEG_CHUNK_SIZE = int(os.getenv("MJPEG_CHUNK_SIZE", 16384))
+MJPEG_FRAME_TIMEOUT = float(os.getenv("MJPEG_FRAME_TIMEOUT", 30))
+
+# HLS recording proxy: recording hosts that may be proxied, playlist cache lifetime and
+# the size-bounded on-disk cache of recorded segments.
+HLS_ALLOWED_DOMAINS = os.getenv("HLS_ALLOWED_DOMAINS", ".angelcam.com").split(",")
+HLS_PLAYLIST_TTL = float(os.getenv("HLS_PLAYLIST_TTL", 2))
+HLS_PLAYLIST_CACHE_MAXSIZE = int(os.getenv("HLS_PLAYLIST_CACHE_MAXSIZE", 256))
+HLS_SEGMENT_CACHE_DIR = os.getenv(
+    "HLS_SEGMENT_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "angelcam-hls-segments"),
+)
+HLS_SEGMENT_CACHE_BYTES = int(os.getenv("HLS_SEGMENT_CACHE_BYTES", 1024**3))
+HLS_SEGMENT_MAX_AGE = int(os.getenv("HLS_SEGMENT_MAX_AGE", 7 * 24 * 3600))
+HLS_CHUNK_SIZE = int(os.getenv("HLS_CHUNK_SIZE", 65536))
+
+# Read-ahead of recorded HLS segments into the segment cache, see apps.cameras.prefetch.
+HLS_PREFETCH_SEGMENTS = int(os.getenv("HLS_PREFETCH_SEGMENTS", 2))
+HLS_PREFETCH_MAX_SEGMENTS = int(os.getenv("HLS_PREFETCH_MAX_SEGMENTS", 8))
+HLS_PREFETCH_IDLE_TIMEOUT = float(os.getenv("HLS_PREFETCH_IDLE_TIMEOUT", 30))
+HLS_PREFETCH_MAX_SESSIONS = int(os.getenv("HLS_PREFETCH_MAX_SESSIONS", 1024))
+HLS_PREFETCH_WORKERS = int(os.getenv("HLS_PREFETCH_WORKERS", 4))
+
+# Camera status push (/api/cameras/events): upstream poll interval per token and the
+# keep-alive interval of idle event streams, in seconds.
+CAMERA_STATUS_POLL_INTERVAL = float(os.getenv("CAMERA_STATUS_POLL_INTERVAL", 15))
+CAMERA_STATUS_HEARTBEAT = float(os.getenv("CAMERA_STATUS_HEARTBEAT", 15))
+
+# In-process cache warmer: refreshes recently requested camera lists, cameras and recording
+# info before RESPONSE_CACHE_TTL expires, within a global upstream budget (requests/minute).
+CACHE_WARMER_ENABLED = os.getenv("CACHE_WARMER_ENABLED", "true").lower() == "true"
+CACHE_WARMER_INTERVAL = float(os.getenv("CACHE_WARMER_INTERVAL", 20))
+CACHE_WARMER_JITTER = float(os.getenv("CACHE_WARMER_JITTER", 0.2))
+CACHE_WARMER_ACTIVE_WINDOW = float(os.getenv("CACHE_WARMER_ACTIVE_WINDOW", 600))
+CACHE_WARMER_BUDGET = int(os.getenv("CACHE_WARMER_BUDGET", 120))
+CACHE_WARMER_MAX_ENTRIES = int(os.getenv("CACHE_WARMER_MAX_ENTRIES", 4096))
+
+# Upstream resilience, see apps.utils.resilience: default connect/read timeouts, per-endpoint
+# overrides keyed by URL fragment, retries of idempotent requests (limited to a fraction of
+# the traffic by the retry budget) and the per-host circuit breaker.
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", 3.05))
+UPSTREAM_READ_TIMEOUT = float(os.getenv("UPSTREAM_READ_TIMEOUT", 10))
+UPSTREAM_ENDPOINT_TIMEOUTS = {
+    "/recording/timeline/": (UPSTREAM_CONNECT_TIMEOUT, 20),
+    "/hls/": (UPSTREAM_CONNECT_TIMEOUT, 20),
+}
+UPSTREAM_MAX_RETRIES = int(os.getenv("UPSTREAM_MAX_RETRIES", 2))
+UPSTREAM_RETRY_BACKOFF = float(os.getenv("UPSTREAM_RETRY_BACKOFF", 0.1))
+UPSTREAM_RETRY_BACKOFF_MAX = float(os.getenv("UPSTREAM_RETRY_BACKOFF_MAX", 2))
+UPSTREAM_RETRY_BUDGET_RATIO = float(os.getenv("UPSTREAM_RETRY_BUDGET_RATIO", 0.1))
+UPSTREAM_RETRY_BUDGET_MIN = int(os.getenv("UPSTREAM_RETRY_BUDGET_MIN", 10))
+UPSTREAM_BREAKER_FAILURES = int(os.getenv("UPSTREAM_BREAKER_FAILURES", 5))
+UPSTREAM_BREAKER_RESET_TIMEOUT = float(os.getenv("UPSTREAM_BREAKER_RESET_TIMEOUT", 30))
+UPSTREAM_BREAKER_MAX_HOSTS = int(os.getenv("UPSTREAM_BREAKER_MAX_HOSTS", 256))
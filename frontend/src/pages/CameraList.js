@@ -39,6 +39,31 @@ const CameraList = () => {
     fetchCameras();
   }, []);
 
+  // Camera status changes are pushed by the backend instead of refetching the list.
+  useEffect(() => {
+    if (!accessToken) {
+      return undefined;
+    }
+    const events = new EventSource(
+      `http://127.0.0.1:8000/api/cameras/events?token=${encodeURIComponent(accessToken)}`
+    );
+    events.addEventListener("status", (event) => {
+      const statuses = new Map(
+        JSON.parse(event.data).map((change) => [change.id, change.status])
+      );
+      setCameras((current) =>
+        current
+          .filter((camera) => statuses.get(camera.id) !== "removed")
+          .map((camera) =>
+            statuses.has(camera.id)
+              ? { ...camera, status: statuses.get(camera.id) }
+              : camera
+          )
+      );
+    });
+    return () => events.close();
+  }, [accessToken]);
+
   return (
     <div className="flex flex-col min-h-screen">
       <Navbar />
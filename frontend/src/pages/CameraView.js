@@ -28,35 +28,16 @@ const CameraView = () => {
   useEffect(() => {
     const controller = new AbortController();
     const signal = controller.signal;
-    const fetchCamera = async () => {
-      try {
-        const response = await fetch(`http://127.0.0.1:8000/api/camera/${id}`, {
-          method: "GET",
-          headers: {
-            Authorization: `Bearer ${accessToken}`,
-          },
-        });
-
-        if (!response.ok) {
-          throw new Error(`HTTP error! Status: ${response.status}`);
-        }
-
-        const data = await response.json();
-        setCamera(data);
-      } catch (error) {
-        console.error("Error fetching cameras:", error);
-      }
-    };
-
-    const fetchCameraRecordingRecordingInfo = async () => {
+    const fetchCameraPage = async () => {
       try {
         const response = await fetch(
-          `http://127.0.0.1:8000/api/camera/${id}/recording/info`,
+          `http://127.0.0.1:8000/api/camera/${id}/page`,
           {
             method: "GET",
             headers: {
               Authorization: `Bearer ${accessToken}`,
             },
+            signal,
           }
         );
 
@@ -64,63 +45,26 @@ const CameraView = () => {
           throw new Error(`HTTP error! Status: ${response.status}`);
         }
 
+        // Camera details, recording info and the last 23 hours of the timeline
+        // are fetched server-side in one round trip.
         const data = await response.json();
-        setRecordingInfo(data);
+        setCamera(data.camera);
+        setRecordingInfo(data.recording);
+        setRecordingTimeline(data.timeline ? data.timeline.segments : null);
+        Object.entries(data.errors).forEach(([part, error]) =>
+          console.error(`Error fetching ${part}:`, error)
+        );
       } catch (error) {
-        console.error("Error fetching recording info:", error);
+        console.error("Error fetching camera page:", error);
       }
     };
 
-    fetchCamera();
-    fetchCameraRecordingRecordingInfo();
+    fetchCameraPage();
     return () => {
       controller.abort();
     };
   }, [id]);
 
-  useEffect(() => {
-    const fetchCameraRecordingTimelnes = async (start, end) => {
-      try {
-        const response = await fetch(
-          `http://127.0.0.1:8000/api/camera/${id}/recording/timeline/?start=${start}&end=${end}`,
-          {
-            method: "GET",
-            headers: {
-              Authorization: `Bearer ${accessToken}`,
-            },
-          }
-        );
-
-        if (!response.ok) {
-          throw new Error(`HTTP error! Status: ${response.status}`);
-        }
-
-        const data = await response.json();
-        setRecordingTimeline(data.segments);
-      } catch (error) {
-        console.error("Error fetching timeline:", error);
-      }
-    };
-    // Parse the recording_start timestamp
-    const recordingStartDate = new Date(
-      recordingInfo ? recordingInfo.recording_end : ""
-    );
-
-    if (recordingInfo) {
-      const previous24HoursDate = new Date(
-        recordingStartDate.getTime() - 23 * 60 * 60 * 1000
-      );
-
-      // Format the new timestamp as an ISO 8601 string
-      const formattedPrevious24Hours = previous24HoursDate.toISOString();
-
-      fetchCameraRecordingTimelnes(
-        formattedPrevious24Hours,
-        recordingInfo.recording_end
-      );
-    }
-  }, [recordingInfo]);
-
   const handleSegmentClick = (start, end) => {
     navigate(
       `/segment/${id}?start=${encodeURIComponent(
@@ -218,7 +162,7 @@ const CameraView = () => {
                     // Check if there's exactly one stream
                     camera.streams[0].format === "mjpeg" ? (
                       <img
-                        src={camera.streams[0].url}
+                        src={`http://127.0.0.1:8000/api/camera/${id}/mjpeg?token=${accessToken}`}
                         alt="MJPEG stream"
                         className="w-[1000px] h-[500px] rounded-lg"
                       />
@@ -26,7 +26,7 @@ const VideoSegmentView = () => {
       if (start && end) {
         try {
           const response = await fetch(
-            `http://127.0.0.1:8000/api/camera/${id}/recording/stream?start=${start}&end=${end}`,
+            `http://127.0.0.1:8000/api/camera/${id}/recording/stream?start=${start}&end=${end}&proxy=true`,
             {
               method: "GET",
               headers: {
@@ -56,7 +56,12 @@ const VideoSegmentView = () => {
       const videoElement = videoRef.current;
 
       if (Hls.isSupported()) {
-        const hls = new Hls({ debug: true });
+        const hls = new Hls({
+          debug: true,
+          xhrSetup: (xhr) => {
+            xhr.setRequestHeader("Authorization", `Bearer ${accessToken}`);
+          },
+        });
 
         hls.loadSource(hlsUrl);
         hls.attachMedia(videoElement);
@@ -95,7 +100,10 @@ const VideoSegmentView = () => {
           hls.destroy();
         };
       } else if (videoElement.canPlayType("application/vnd.apple.mpegurl")) {
-        videoElement.src = hlsUrl;
+        // Native players cannot send headers, so the token goes in the query string.
+        const nativeUrl = new URL(hlsUrl);
+        nativeUrl.searchParams.set("token", accessToken);
+        videoElement.src = nativeUrl.toString();
         videoElement.addEventListener("loadedmetadata", () => {
           videoElement.play().catch((error) => {
             console.error("Playback error:", error);